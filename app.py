@@ -5,6 +5,9 @@ from dash.dependencies import Input, Output
 
 # Importar o Sidebar
 from components.sidebar import criar_sidebar
+from utils.api_risco import registrar_api
+from utils.metricas import registrar_metricas
+from utils.perfilamento import registrar_perfilamento
 
 # Importar as Páginas
 from pages import (
@@ -24,6 +27,15 @@ from pages import (
 # Inicializar App
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP, dbc.icons.BOOTSTRAP], suppress_callback_exceptions=True)
 
+# API JSON de predição em lote (POST /api/risco)
+registrar_api(app.server)
+
+# Tempo por callback e por etapa, bytes e linhas (GET /metrics, formato Prometheus)
+registrar_metricas(app)
+
+# cProfile da próxima execução de um callback (GET /debug/perfilar, exige OUVIDORIA_TOKEN_PERFIL)
+registrar_perfilamento(app)
+
 # --- LAYOUT PRINCIPAL ---
 # Importante: Precisamos de um ID para o Sidebar também ('sidebar-container')
 app.layout = html.Div([
@@ -0,0 +1,431 @@
+"""
+Teste de carga do painel com N usuários simultâneos simulados.
+
+Cada usuário repete uma navegação realista contra /_dash-update-component, do jeito
+que o dash-renderer faz no navegador:
+  1. troca de rota (callback render_page_content com url.pathname);
+  2. carga inicial da página (todos os callbacks da página sem prevent_initial_call);
+  3. algumas trocas de filtro (dropdowns, abas, campos de busca), disparando só os
+     callbacks que têm aquele componente como Input.
+Em 2 e 3 as cadeias são seguidas: um callback cuja entrada é saída de outro (por exemplo
+os gráficos ligados ao dcc.Store de filtros) é chamado quando o anterior responde.
+
+Os callbacks e as páginas são descobertos no próprio servidor (/_dash-dependencies e os
+links do sidebar devolvidos pelo roteamento). Sem --url, um servidor de teste local é
+iniciado num processo separado (app.run com debug desligado) e encerrado no fim.
+
+Relatório: vazão, latência p50/p95/p99 e taxa de erro por callback, em
+benchmarks/resultados/carga_<data>.json (mais o /metrics do servidor, se houver).
+
+Uso:
+  python benchmarks/carga_usuarios.py --usuarios 20 --duracao 120
+  python benchmarks/carga_usuarios.py --url http://127.0.0.1:8050 --usuarios 5
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import requests
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PASTA_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+
+ROTA_CALLBACK = "/_dash-update-component"
+ROTA_DEPENDENCIAS = "/_dash-dependencies"
+SAIDA_ROTEAMENTO = "page-content.children"
+
+# --- CONFIGURAÇÃO PADRÃO ---
+USUARIOS = 10
+DURACAO_S = 60
+RAMPA_S = 5              # usuários entram espalhados nesse intervalo
+PAUSA_MEDIA_S = 1.0      # tempo de "leitura" entre ações (exponencial)
+TROCAS_POR_PAGINA = (2, 5)
+TIMEOUT_REQUISICAO_S = 60
+PROFUNDIDADE_CADEIA = 5  # callbacks encadeados (saída de um é entrada de outro) seguidos
+TIMEOUT_SUBIDA_S = 600   # o app carrega todos os parquets na importação
+SEED = 42
+
+# Termos usados nos campos de busca livre
+TERMOS_BUSCA = ["saúde", "benefício", "demora", "atendimento", "INSS", "vacina", ""]
+
+
+# =============================================================================
+# SERVIDOR LOCAL
+# =============================================================================
+
+def porta_livre():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def iniciar_servidor(pasta):
+    """Sobe o app num processo separado (cwd = pasta com data/) e espera responder."""
+    porta = porta_livre()
+    codigo = f"from app import app; app.run(host='127.0.0.1', port={porta}, debug=False, threaded=True)"
+    ambiente = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [RAIZ, os.environ.get("PYTHONPATH")]))}
+    processo = subprocess.Popen([sys.executable, "-c", codigo], cwd=pasta, env=ambiente,
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{porta}"
+
+    inicio = time.time()
+    while time.time() - inicio < TIMEOUT_SUBIDA_S:
+        if processo.poll() is not None:
+            raise RuntimeError(f"O servidor terminou ao iniciar (código {processo.returncode}).")
+        try:
+            if requests.get(url + ROTA_DEPENDENCIAS, timeout=2).ok:
+                print(f"   -> Servidor de teste pronto em {url} ({time.time() - inicio:.1f}s)")
+                return processo, url
+        except requests.RequestException:
+            pass
+        time.sleep(0.5)
+    processo.terminate()
+    raise RuntimeError(f"O servidor não respondeu em {TIMEOUT_SUBIDA_S}s.")
+
+
+# =============================================================================
+# MODELO DO APP (dependências e componentes)
+# =============================================================================
+
+def _saidas(dependencia):
+    """[(id, propriedade)] a partir da chave de saída do Dash ("..a.children...b.figure..")."""
+    chave = dependencia["output"]
+    partes = chave[2:-2].split("...") if chave.startswith("..") else [chave]
+    return [tuple(p.rsplit(".", 1)) for p in partes]
+
+
+def rotulo(dependencia):
+    saidas = _saidas(dependencia)
+    nome = f"{saidas[0][0]}.{saidas[0][1].split('@')[0]}"
+    return nome + (f" (+{len(saidas) - 1})" if len(saidas) > 1 else "")
+
+
+def componentes(arvore, encontrados=None):
+    """{id: (tipo, props)} de todos os componentes com id string numa árvore de layout serializada."""
+    encontrados = {} if encontrados is None else encontrados
+    if isinstance(arvore, list):
+        for item in arvore:
+            componentes(item, encontrados)
+    elif isinstance(arvore, dict):
+        props = arvore.get("props")
+        if isinstance(props, dict):
+            if isinstance(props.get("id"), str):
+                encontrados[props["id"]] = (arvore.get("type"), props)
+            for valor in props.values():
+                componentes(valor, encontrados)
+    return encontrados
+
+
+def componentes_sem_id(arvore):
+    """Gera (tipo, props) de todos os componentes, com ou sem id."""
+    if isinstance(arvore, list):
+        for item in arvore:
+            yield from componentes_sem_id(item)
+    elif isinstance(arvore, dict) and isinstance(arvore.get("props"), dict):
+        yield arvore.get("type"), arvore["props"]
+        for valor in arvore["props"].values():
+            yield from componentes_sem_id(valor)
+
+
+def _links(arvore):
+    return sorted({props["href"] for _, props in componentes_sem_id(arvore)
+                   if isinstance(props.get("href"), str) and props["href"].startswith("/")})
+
+
+def _valores_opcoes(opcoes):
+    return [o.get("value") if isinstance(o, dict) else o for o in (opcoes or [])]
+
+
+def novo_valor(rng, tipo, props, propriedade):
+    """Próximo valor de um filtro, como um usuário escolheria; None se o componente não é um filtro."""
+    if propriedade == "value" and tipo in ("Dropdown", "RadioItems", "Checklist", "Select"):
+        opcoes = _valores_opcoes(props.get("options"))
+        if not opcoes:
+            return None
+        if props.get("multi") or tipo == "Checklist":
+            # De vez em quando limpa o filtro ("Todos")
+            return [] if rng.random() < 0.15 else rng.sample(opcoes, rng.randint(1, min(3, len(opcoes))))
+        return rng.choice(opcoes)
+    if propriedade == "value" and tipo == "Tabs":
+        abas = [p.get("value") for t, p in componentes_sem_id(props.get("children")) if t == "Tab" and p.get("value")]
+        return rng.choice(abas) if abas else None
+    if propriedade == "value" and tipo in ("Input", "Textarea") and props.get("type", "text") == "text":
+        return rng.choice(TERMOS_BUSCA)
+    return None  # botões (downloads, predição) e demais entradas ficam de fora
+
+
+# =============================================================================
+# USUÁRIO SIMULADO
+# =============================================================================
+
+class Usuario:
+    def __init__(self, url, dependencias, paginas, seed, registrar, sessao=None):
+        self.url = url
+        self.dependencias = dependencias
+        self.paginas = paginas
+        self.rng = random.Random(seed)
+        self.registrar = registrar
+        self.sessao = sessao or requests.Session()
+        self.valores = {}       # (id, propriedade) -> valor atual
+        self.componentes = {}   # componentes da página atual
+
+    def _corpo(self, dep, disparados):
+        def entrada(e):
+            return {"id": e["id"], "property": e["property"], "value": self.valores.get((e["id"], e["property"]))}
+        saidas = [{"id": i, "property": p.split("@")[0]} for i, p in _saidas(dep)]
+        return {
+            "output": dep["output"],
+            "outputs": saidas if dep["output"].startswith("..") else saidas[0],
+            "inputs": [entrada(e) for e in dep["inputs"]],
+            "state": [entrada(e) for e in dep["state"]],
+            "changedPropIds": [f"{i}.{p}" for i, p in disparados],
+        }
+
+    def chamar(self, dep, disparados):
+        nome = rotulo(dep)
+        inicio = time.perf_counter()
+        try:
+            corpo = self._corpo(dep, disparados)
+            resposta = self.sessao.post(self.url + ROTA_CALLBACK, json=corpo, timeout=TIMEOUT_REQUISICAO_S)
+            tamanho = len(resposta.content)
+            # Callback em segundo plano: a primeira resposta só traz o job; o resultado vem
+            # consultando a mesma rota a cada `interval` ms, como o renderer faz
+            job = resposta.json() if resposta.status_code == 200 and dep.get("background") else {}
+            while "cacheKey" in job and "response" not in job:
+                if time.perf_counter() - inicio > TIMEOUT_REQUISICAO_S:
+                    raise TimeoutError(f"job {job.get('job')} sem resultado")
+                time.sleep(dep["background"].get("interval", 1000) / 1000)
+                consulta = f"?cacheKey={job['cacheKey']}&job={job['job']}"
+                resposta = self.sessao.post(self.url + ROTA_CALLBACK + consulta, json=corpo,
+                                            timeout=TIMEOUT_REQUISICAO_S)
+                tamanho += len(resposta.content)
+                if resposta.status_code != 200:
+                    # Job iniciado que termina sem "response" (ex.: 204 porque outra sessão
+                    # leu o resultado ou o job morreu): a tela ficaria em branco, conta como falha
+                    self.registrar(nome, time.perf_counter() - inicio, f"job_sem_resultado_{resposta.status_code}", tamanho)
+                    return None
+                job = {**job, **resposta.json()}
+            duracao = time.perf_counter() - inicio
+            self.registrar(nome, duracao, resposta.status_code, tamanho)
+            # 204 = PreventUpdate (resposta válida sem conteúdo)
+            return resposta.json() if resposta.status_code == 200 else None
+        except (requests.RequestException, ValueError, TimeoutError) as e:
+            self.registrar(nome, time.perf_counter() - inicio, type(e).__name__, 0)
+            return None
+
+    def _callbacks_da_pagina(self):
+        disponiveis = set(self.componentes) | {"url"}
+        return [d for d in self.dependencias
+                if not d.get("clientside_function")
+                and SAIDA_ROTEAMENTO not in d["output"]
+                and all(e["id"] in disponiveis for e in d["inputs"] + d["state"])
+                and all(i in disponiveis for i, _ in _saidas(d))]
+
+    def navegar(self, caminho):
+        self.valores[("url", "pathname")] = caminho
+        roteamento = next(d for d in self.dependencias if SAIDA_ROTEAMENTO in d["output"])
+        resposta = self.chamar(roteamento, [("url", "pathname")])
+        if not resposta:
+            return []
+        conteudo = resposta.get("response", {}).get("page-content", {}).get("children")
+        self.componentes = componentes(conteudo)
+        for id_, (_, props) in self.componentes.items():
+            for propriedade, valor in props.items():
+                self.valores[(id_, propriedade)] = valor
+        callbacks = self._callbacks_da_pagina()
+
+        # Carga inicial: o renderer dispara os callbacks sem prevent_initial_call cujas entradas
+        # não são saída de outro callback; os demais esperam a cadeia (ex.: Store de filtros)
+        saidas = {(i, p.split("@")[0]) for d in callbacks for i, p in _saidas(d)}
+        alterados = set()
+        for dep in callbacks:
+            entradas = [(e["id"], e["property"]) for e in dep["inputs"]]
+            if not dep.get("prevent_initial_call") and not saidas.intersection(entradas):
+                alterados |= self._aplicar(self.chamar(dep, entradas))
+        self._encadear(callbacks, alterados)
+        return callbacks
+
+    def _aplicar(self, resposta):
+        """Grava as saídas devolvidas pelo servidor e retorna as (id, propriedade) alteradas."""
+        alterados = set()
+        for id_, props in (resposta or {}).get("response", {}).items():
+            for propriedade, valor in props.items():
+                self.valores[(id_, propriedade)] = valor
+                alterados.add((id_, propriedade))
+        return alterados
+
+    def _encadear(self, callbacks, alterados):
+        """Chama, como o renderer, os callbacks cuja entrada é saída de outro que acabou de responder."""
+        for _ in range(PROFUNDIDADE_CADEIA):
+            proximos = set()
+            for dep in callbacks:
+                disparados = [(e["id"], e["property"]) for e in dep["inputs"]
+                              if (e["id"], e["property"]) in alterados]
+                if disparados:
+                    proximos |= self._aplicar(self.chamar(dep, disparados))
+            if not proximos:
+                return
+            alterados = proximos
+
+    def trocar_filtro(self, callbacks):
+        candidatos = sorted({(e["id"], e["property"]) for d in callbacks for e in d["inputs"]
+                             if e["id"] in self.componentes})
+        self.rng.shuffle(candidatos)
+        for id_, propriedade in candidatos:
+            tipo, props = self.componentes[id_]
+            valor = novo_valor(self.rng, tipo, props, propriedade)
+            if valor is None:
+                continue
+            self.valores[(id_, propriedade)] = valor
+            self._encadear(callbacks, {(id_, propriedade)})
+            return True
+        return False
+
+    def pausar(self, pausa_media, fim):
+        time.sleep(max(0.0, min(self.rng.expovariate(1 / pausa_media) if pausa_media else 0, fim - time.time())))
+
+    def rodar(self, fim, pausa_media):
+        while time.time() < fim:
+            callbacks = self.navegar(self.rng.choice(self.paginas))
+            for _ in range(self.rng.randint(*TROCAS_POR_PAGINA)):
+                self.pausar(pausa_media, fim)
+                if time.time() >= fim or not self.trocar_filtro(callbacks):
+                    break
+            self.pausar(pausa_media, fim)
+
+
+def descobrir_paginas(url, dependencias, sessao=None):
+    """Rotas do painel: links do sidebar devolvido pelo roteamento da página inicial."""
+    descoberta = Usuario(url, dependencias, ["/"], 0, lambda *a: None, sessao)
+    roteamento = next(d for d in dependencias if SAIDA_ROTEAMENTO in d["output"])
+    descoberta.valores[("url", "pathname")] = "/"
+    resposta = descoberta.chamar(roteamento, [("url", "pathname")]) or {}
+    return _links(resposta.get("response", {}).get("sidebar-container", {}).get("children")) or ["/"]
+
+
+# =============================================================================
+# EXECUÇÃO E RELATÓRIO
+# =============================================================================
+
+def resumir(amostras, duracao_total):
+    """Estatísticas por callback e gerais a partir de [(nome, duração, status, bytes)]."""
+    def estatisticas(lista):
+        tempos = np.array([a[1] for a in lista])
+        erros = sum(1 for a in lista if not (isinstance(a[2], int) and 200 <= a[2] < 300))
+        return {
+            "requisicoes": len(lista),
+            "vazao_rps": round(len(lista) / duracao_total, 2),
+            "erros": erros,
+            "taxa_erro": round(erros / len(lista), 4),
+            "p50_ms": round(float(np.percentile(tempos, 50)) * 1000, 1),
+            "p95_ms": round(float(np.percentile(tempos, 95)) * 1000, 1),
+            "p99_ms": round(float(np.percentile(tempos, 99)) * 1000, 1),
+            "max_ms": round(float(tempos.max()) * 1000, 1),
+            "kb_medio": round(float(np.mean([a[3] for a in lista])) / 1024, 1),
+        }
+
+    por_callback = {}
+    for amostra in amostras:
+        por_callback.setdefault(amostra[0], []).append(amostra)
+    status = {}
+    for amostra in amostras:
+        status[str(amostra[2])] = status.get(str(amostra[2]), 0) + 1
+    return {
+        "geral": {**estatisticas(amostras), "status": status} if amostras else {},
+        "callbacks": {nome: estatisticas(lista) for nome, lista in sorted(por_callback.items())},
+    }
+
+
+def imprimir_relatorio(resumo):
+    print(f"\n{'callback':<45} {'req':>6} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'erro%':>6}")
+    linhas = list(resumo["callbacks"].items()) + [("TOTAL", resumo["geral"])]
+    for nome, est in linhas:
+        print(f"{nome[:45]:<45} {est['requisicoes']:>6} {est['vazao_rps']:>7} {est['p50_ms']:>8} "
+              f"{est['p95_ms']:>8} {est['p99_ms']:>8} {est['taxa_erro'] * 100:>6.1f}")
+
+
+def rodar_carga(url=None, pasta=RAIZ, usuarios=USUARIOS, duracao=DURACAO_S, rampa=RAMPA_S,
+                pausa_media=PAUSA_MEDIA_S, paginas=None, seed=SEED):
+    print(f"👥 [CARGA] {usuarios} usuários simultâneos por {duracao}s...")
+    processo = None
+    if url is None:
+        processo, url = iniciar_servidor(pasta)
+
+    try:
+        dependencias = requests.get(url + ROTA_DEPENDENCIAS, timeout=TIMEOUT_REQUISICAO_S).json()
+        if not any(SAIDA_ROTEAMENTO in d["output"] for d in dependencias):
+            raise RuntimeError("Callback de roteamento (page-content.children) não encontrado.")
+
+        paginas = paginas or descobrir_paginas(url, dependencias)
+        print(f"   -> {len(paginas)} páginas: {', '.join(paginas)}")
+
+        amostras = []
+        lock = threading.Lock()
+
+        def registrar(nome, duracao_req, status, tamanho):
+            with lock:
+                amostras.append((nome, duracao_req, status, tamanho))
+
+        inicio = time.time()
+        fim = inicio + duracao
+        threads = []
+        for i in range(usuarios):
+            usuario = Usuario(url, dependencias, paginas, seed + i, registrar)
+            atraso = rampa * i / max(usuarios, 1)
+            t = threading.Thread(target=lambda u=usuario, a=atraso: (time.sleep(a), u.rodar(fim, pausa_media)), daemon=True)
+            t.start()
+            threads.append(t)
+        for t in threads:
+            t.join()
+        # Requisições em andamento no fim do prazo também contam
+        duracao_total = time.time() - inicio
+
+        resumo = resumir(amostras, duracao_total)
+        imprimir_relatorio(resumo)
+
+        try:
+            metricas = requests.get(url + "/metrics", timeout=10)
+            metricas_servidor = metricas.text if metricas.ok else None
+        except requests.RequestException:
+            metricas_servidor = None
+    finally:
+        if processo is not None:
+            processo.terminate()
+            processo.wait(timeout=30)
+
+    relatorio = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "config": {"url": url, "usuarios": usuarios, "duracao_s": duracao, "rampa_s": rampa,
+                   "pausa_media_s": pausa_media, "paginas": paginas, "seed": seed},
+        "duracao_real_s": round(duracao_total, 1),
+        **resumo,
+        "metricas_servidor": metricas_servidor,
+    }
+    os.makedirs(PASTA_RESULTADOS, exist_ok=True)
+    saida = os.path.join(PASTA_RESULTADOS, f"carga_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=1)
+    print(f"🏁 [CARGA] Relatório em {saida}")
+    return relatorio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga do painel com usuários simultâneos.")
+    parser.add_argument("--url", help="servidor já em execução (sem isso, sobe um servidor de teste local)")
+    parser.add_argument("--pasta", default=RAIZ, help="pasta com data/ para o servidor local")
+    parser.add_argument("--usuarios", type=int, default=USUARIOS)
+    parser.add_argument("--duracao", type=int, default=DURACAO_S, help="segundos de teste")
+    parser.add_argument("--rampa", type=float, default=RAMPA_S, help="segundos para todos os usuários entrarem")
+    parser.add_argument("--pausa", type=float, default=PAUSA_MEDIA_S, help="pausa média entre ações (0 = sem pausa)")
+    parser.add_argument("--paginas", nargs="+", help="rotas visitadas (padrão: links do sidebar)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+    rodar_carga(args.url, args.pasta, args.usuarios, args.duracao, args.rampa, args.pausa, args.paginas, args.seed)
@@ -0,0 +1,205 @@
+"""
+Perfil da inicialização do painel: importações, carga de dados das páginas e primeira resposta.
+
+Sobe o app num processo novo com `python -X importtime` e mede:
+  - tempo de importação de cada módulo (próprio e acumulado), agregado também por pacote;
+  - tempo de cada página (pages.*) no corpo do módulo, que é onde os dados são carregados;
+  - tempo até a primeira resposta HTTP (GET /) e até a primeira rota renderizada
+    (callback render_page_content), contados desde o início do processo.
+
+Com --orcamento <arquivo.json> os tempos são comparados com os limites do arquivo e o
+comando termina com código 1 se algum for ultrapassado. Formato (todas as chaves opcionais):
+  {"importacao_app_s": 45, "primeira_resposta_s": 60, "primeira_rota_s": 60,
+   "modulos_s": {"pages.ouvidoria": 10, "sklearn": 3}}     # tempo acumulado do módulo
+
+Uso:
+  python benchmarks/inicializacao.py
+  python benchmarks/inicializacao.py --orcamento benchmarks/orcamento_inicializacao.json --repeticoes 3
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import requests
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(os.path.join(RAIZ, "benchmarks"))
+
+from carga_usuarios import ROTA_DEPENDENCIAS, descobrir_paginas, porta_livre  # noqa: E402
+
+PASTA_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+ORCAMENTO_PADRAO = os.path.join(RAIZ, "benchmarks", "orcamento_inicializacao.json")
+
+TIMEOUT_SUBIDA_S = 600
+TOP_MODULOS = 20
+PADRAO_IMPORTTIME = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+# Pacotes do projeto são agregados pelo módulo inteiro (pages.ouvidoria), os demais pela raiz (pandas)
+PACOTES_DO_PROJETO = ("pages", "utils", "components")
+
+
+def ler_importtime(texto):
+    """{módulo: {"proprio_s", "acumulado_s"}} a partir da saída de -X importtime."""
+    modulos = {}
+    for proprio, acumulado, _, nome in PADRAO_IMPORTTIME.findall(texto):
+        atual = modulos.setdefault(nome, {"proprio_s": 0.0, "acumulado_s": 0.0})
+        atual["proprio_s"] += int(proprio) / 1e6
+        atual["acumulado_s"] = max(atual["acumulado_s"], int(acumulado) / 1e6)
+    return modulos
+
+
+def agrupar_por_pacote(modulos):
+    pacotes = {}
+    for nome, tempos in modulos.items():
+        raiz = nome.split(".")[0]
+        chave = nome if raiz in PACOTES_DO_PROJETO else raiz
+        pacotes[chave] = pacotes.get(chave, 0.0) + tempos["proprio_s"]
+    return pacotes
+
+
+def medir_uma_vez(pasta):
+    """Uma inicialização a frio: processo novo, importação perfilada e primeiras requisições."""
+    porta = porta_livre()
+    url = f"http://127.0.0.1:{porta}"
+    codigo = f"from app import app; app.run(host='127.0.0.1', port={porta}, debug=False, threaded=True)"
+    ambiente = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [RAIZ, os.environ.get("PYTHONPATH")]))}
+
+    with tempfile.TemporaryFile(mode="w+", encoding="utf-8", errors="replace") as saida_erro:
+        inicio = time.perf_counter()
+        processo = subprocess.Popen([sys.executable, "-X", "importtime", "-c", codigo], cwd=pasta, env=ambiente,
+                                    stdout=subprocess.DEVNULL, stderr=saida_erro)
+        try:
+            primeira_resposta = None
+            while time.perf_counter() - inicio < TIMEOUT_SUBIDA_S:
+                if processo.poll() is not None:
+                    saida_erro.seek(0)
+                    raise RuntimeError(f"O app terminou ao iniciar:\n{saida_erro.read()[-1500:]}")
+                try:
+                    if requests.get(url + "/", timeout=2).ok:
+                        primeira_resposta = time.perf_counter() - inicio
+                        break
+                except requests.RequestException:
+                    pass
+                time.sleep(0.05)
+            if primeira_resposta is None:
+                raise RuntimeError(f"O app não respondeu em {TIMEOUT_SUBIDA_S}s.")
+
+            dependencias = requests.get(url + ROTA_DEPENDENCIAS, timeout=60).json()
+            descobrir_paginas(url, dependencias)  # renderiza "/" pelo callback de roteamento
+            primeira_rota = time.perf_counter() - inicio
+        finally:
+            processo.terminate()
+            processo.wait(timeout=30)
+        saida_erro.seek(0)
+        modulos = ler_importtime(saida_erro.read())
+
+    return {
+        "importacao_app_s": modulos.get("app", {}).get("acumulado_s"),
+        "primeira_resposta_s": primeira_resposta,
+        "primeira_rota_s": primeira_rota,
+        "modulos": modulos,
+    }
+
+
+def _mediana(valores):
+    valores = [v for v in valores if v is not None]
+    return round(float(np.median(valores)), 4) if valores else None
+
+
+def consolidar(execucoes):
+    """Medianas entre as execuções (tempos gerais, módulos, páginas e pacotes)."""
+    nomes = set().union(*(e["modulos"] for e in execucoes))
+    modulos = {
+        nome: {campo: _mediana([e["modulos"].get(nome, {}).get(campo) for e in execucoes])
+               for campo in ("proprio_s", "acumulado_s")}
+        for nome in nomes
+    }
+    pacotes = {nome: _mediana([agrupar_por_pacote(e["modulos"]).get(nome) for e in execucoes])
+               for nome in agrupar_por_pacote(modulos)}
+    return {
+        "importacao_app_s": _mediana([e["importacao_app_s"] for e in execucoes]),
+        "primeira_resposta_s": _mediana([e["primeira_resposta_s"] for e in execucoes]),
+        "primeira_rota_s": _mediana([e["primeira_rota_s"] for e in execucoes]),
+        # Tempo no corpo do módulo da página (sem as importações dele): leitura e preparo dos dados
+        "paginas_s": dict(sorted(((n, t["proprio_s"]) for n, t in modulos.items() if n.startswith("pages.")),
+                                 key=lambda x: -x[1])),
+        "pacotes_s": dict(sorted(pacotes.items(), key=lambda x: -(x[1] or 0))),
+        "modulos_proprio_s": dict(sorted(((n, t["proprio_s"]) for n, t in modulos.items()),
+                                         key=lambda x: -x[1])[:TOP_MODULOS]),
+        "modulos": modulos,
+    }
+
+
+def verificar_orcamento(resultado, orcamento):
+    """Lista de estouros do orçamento."""
+    estouros = []
+    for chave in ("importacao_app_s", "primeira_resposta_s", "primeira_rota_s"):
+        limite, valor = orcamento.get(chave), resultado.get(chave)
+        if limite is not None and valor is not None and valor > limite:
+            estouros.append(f"{chave}: {valor:.2f}s > {limite}s")
+    for modulo, limite in orcamento.get("modulos_s", {}).items():
+        valor = resultado["modulos"].get(modulo, {}).get("acumulado_s")
+        if valor is not None and valor > limite:
+            estouros.append(f"{modulo}: {valor:.2f}s > {limite}s")
+    return estouros
+
+
+def imprimir_ranking(titulo, tempos, limite=10):
+    print(f"\n   {titulo}")
+    for nome, segundos in list(tempos.items())[:limite]:
+        print(f"   {segundos or 0:>8.3f}s  {nome}")
+
+
+def rodar_inicializacao(pasta=RAIZ, repeticoes=1, arquivo_orcamento=None):
+    print(f"🚀 [INICIALIZAÇÃO] Perfil de {repeticoes} inicialização(ões) a frio...")
+    execucoes = []
+    for i in range(repeticoes):
+        execucoes.append(medir_uma_vez(pasta))
+        print(f"   -> Execução {i + 1}: primeira resposta em {execucoes[-1]['primeira_resposta_s']:.2f}s")
+    resultado = consolidar(execucoes)
+
+    print(f"\n   Importação do app: {resultado['importacao_app_s']}s | primeira resposta: "
+          f"{resultado['primeira_resposta_s']}s | primeira rota: {resultado['primeira_rota_s']}s")
+    imprimir_ranking("Páginas (carga de dados na importação):", resultado["paginas_s"])
+    imprimir_ranking("Pacotes (tempo próprio somado):", resultado["pacotes_s"])
+    imprimir_ranking("Módulos (tempo próprio):", resultado["modulos_proprio_s"])
+
+    estouros = []
+    if arquivo_orcamento:
+        with open(arquivo_orcamento, encoding="utf-8") as f:
+            estouros = verificar_orcamento(resultado, json.load(f))
+        for estouro in estouros:
+            print(f"   ❌ Orçamento estourado: {estouro}")
+        if not estouros:
+            print(f"\n   ✅ Dentro do orçamento ({arquivo_orcamento})")
+
+    relatorio = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "config": {"pasta": pasta, "repeticoes": repeticoes, "orcamento": arquivo_orcamento},
+        **resultado,
+        "estouros": estouros,
+    }
+    os.makedirs(PASTA_RESULTADOS, exist_ok=True)
+    saida = os.path.join(PASTA_RESULTADOS, f"inicializacao_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=1)
+    print(f"🏁 [INICIALIZAÇÃO] Relatório em {saida}")
+    return relatorio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Perfil de importação e inicialização do painel.")
+    parser.add_argument("--pasta", default=RAIZ, help="pasta com data/ (padrão: raiz do projeto)")
+    parser.add_argument("--repeticoes", type=int, default=1, help="inicializações a frio (usa a mediana)")
+    parser.add_argument("--orcamento", nargs="?", const=ORCAMENTO_PADRAO,
+                        help=f"arquivo JSON com os limites (sem caminho: {os.path.relpath(ORCAMENTO_PADRAO, RAIZ)})")
+    args = parser.parse_args()
+    resultado = rodar_inicializacao(os.path.abspath(args.pasta), args.repeticoes, args.orcamento)
+    sys.exit(1 if resultado["estouros"] else 0)
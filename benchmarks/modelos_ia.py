@@ -0,0 +1,301 @@
+"""
+Benchmark de inferência dos modelos de risco (SLA).
+
+Para cada modelo mede, num processo novo (carga realmente a frio):
+  - tempo de importação do sklearn, de carga (unpickle) e da primeira predição
+  - latência de um único texto (vetorizar + predict_proba): média, p50, p95, p99
+  - vazão em lotes de vários tamanhos (textos/s)
+  - pico de memória alocada pelos artefatos e pela inferência (tracemalloc) e tamanho dos arquivos
+
+Modelos cobertos: o publicado no manifesto (Random Forest), o incremental (SGD)
+e qualquer outro passado em --modelo. Com --alternativas treina alguns tipos de
+modelo sobre o vetorizador atual e compara também a qualidade (AUC/F1) num holdout.
+
+Uso: python benchmarks/modelos_ia.py [--alternativas] [--modelo nome=modelo.pkl[,vetorizador.pkl]]
+"""
+import argparse
+import json
+import os
+import pickle
+import platform
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+# Permite rodar como "python benchmarks/modelos_ia.py" a partir da raiz do projeto
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+sys.path.append(os.path.join(RAIZ, "scripts"))
+from utils.modelos import ler_manifesto
+
+# Caminhos
+PATH_DATA = "data/processed/ouvidoria.parquet"
+PATH_MODELO_INCREMENTAL = "data/processed/modelo_ia_incremental.pkl"
+PASTA_RESULTADOS = "benchmarks/resultados"
+ARQUIVO_RESULTADO = os.path.join(PASTA_RESULTADOS, "modelos_ia.json")
+PASTA_ALTERNATIVAS = os.path.join(PASTA_RESULTADOS, "modelos")
+
+# --- CONFIGURAÇÃO PADRÃO ---
+N_TEXTOS = 2000                      # textos reais sorteados da base
+N_LATENCIA = 500                     # predições de um texto só
+TAMANHOS_LOTE = [1, 10, 100, 1000, 10000]
+TEMPO_MIN_LOTE_S = 1.0               # repete cada tamanho de lote até somar esse tempo
+AMOSTRA_ALTERNATIVAS = 30000         # linhas para treinar/avaliar as alternativas
+
+# Usados quando a base não está disponível
+TEXTOS_EXEMPLO = [
+    "Demora na análise do benefício previdenciário",
+    "Reclamação sobre atendimento no posto",
+    "Solicitação de informação sobre concurso público",
+    "Denúncia de irregularidade em licitação",
+    "Elogio ao atendimento da agência",
+]
+
+
+def ler_textos(n=N_TEXTOS, seed=42):
+    """Assuntos reais sorteados da base (com repetição, como chegam na prática)."""
+    if not os.path.exists(PATH_DATA):
+        print(f"⚠️ {PATH_DATA} não encontrado; usando textos de exemplo.")
+        return [TEXTOS_EXEMPLO[i % len(TEXTOS_EXEMPLO)] for i in range(n)]
+    arquivo = pq.ParquetFile(PATH_DATA)
+    coluna = next((c for c in arquivo.schema_arrow.names if c.upper() == "ASSUNTO"), None)
+    textos = arquivo.read(columns=[coluna]).column(0).to_pandas().dropna().astype(str)
+    return textos.sample(n, replace=len(textos) < n, random_state=seed).tolist()
+
+
+def _ler_pickle(caminho):
+    with open(caminho, "rb") as f: return pickle.load(f)
+
+
+def _percentis(amostras_ms):
+    a = np.asarray(amostras_ms)
+    return {
+        "media": round(float(a.mean()), 3),
+        "p50": round(float(np.percentile(a, 50)), 3),
+        "p95": round(float(np.percentile(a, 95)), 3),
+        "p99": round(float(np.percentile(a, 99)), 3),
+        "max": round(float(a.max()), 3),
+    }
+
+
+def descrever_modelo(modelo):
+    """Tipo e tamanho estrutural (árvores, nós, profundidade) do modelo."""
+    info = {"tipo": type(modelo).__name__, "n_jobs": getattr(modelo, "n_jobs", None)}
+    estimadores = getattr(modelo, "estimators_", None)
+    if estimadores is not None:
+        info["arvores"] = len(estimadores)
+        info["nos_total"] = int(sum(e.tree_.node_count for e in estimadores))
+        info["profundidade_max"] = int(max(e.tree_.max_depth for e in estimadores))
+    elif hasattr(modelo, "coef_"):
+        info["coeficientes"] = int(modelo.coef_.size)
+    return info
+
+
+def carregar_artefatos(caminho_modelo, caminho_vetorizador):
+    """(modelo, vetorizador); o incremental salva um dict com os dois num arquivo só."""
+    modelo = _ler_pickle(caminho_modelo)
+    if isinstance(modelo, dict):
+        return modelo["modelo"], modelo["vetorizador"]
+    return modelo, _ler_pickle(caminho_vetorizador)
+
+
+def medir_modelo(caminho_modelo, caminho_vetorizador, textos, tamanhos_lote=TAMANHOS_LOTE,
+                 n_latencia=N_LATENCIA, tempo_min_lote_s=TEMPO_MIN_LOTE_S):
+    """Roda dentro de um processo novo: carga a frio, latência, vazão e memória."""
+    # Importar o sklearn custa segundos e é igual para todos; fica separado da carga
+    inicio = time.perf_counter()
+    import sklearn.ensemble, sklearn.feature_extraction.text, sklearn.linear_model  # noqa: E401,F401
+    importacao_s = time.perf_counter() - inicio
+
+    # Memória medida a partir daqui: artefatos + inferência (sem as bibliotecas)
+    tracemalloc.start()
+
+    inicio = time.perf_counter()
+    modelo, vetorizador = carregar_artefatos(caminho_modelo, caminho_vetorizador)
+    carga_s = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    modelo.predict_proba(vetorizador.transform(textos[:1]))
+    primeira_ms = (time.perf_counter() - inicio) * 1000
+
+    # Latência de um texto por vez (caso da página de IA)
+    latencias = []
+    for texto in textos[:n_latencia]:
+        inicio = time.perf_counter()
+        modelo.predict_proba(vetorizador.transform([texto]))
+        latencias.append((time.perf_counter() - inicio) * 1000)
+
+    # Vazão em lotes (caso da API e do etl_risco)
+    lotes = []
+    for tamanho in tamanhos_lote:
+        lote = (textos * (tamanho // len(textos) + 1))[:tamanho]
+        execucoes, total = 0, 0.0
+        while total < tempo_min_lote_s or execucoes < 3:
+            inicio = time.perf_counter()
+            modelo.predict_proba(vetorizador.transform(lote))
+            total += time.perf_counter() - inicio
+            execucoes += 1
+        lotes.append({
+            "tamanho": tamanho,
+            "execucoes": execucoes,
+            "ms_por_lote": round(total / execucoes * 1000, 3),
+            "textos_por_s": round(tamanho * execucoes / total, 1),
+        })
+
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    arquivos = [c for c in (caminho_modelo, caminho_vetorizador) if c]
+    return {
+        **descrever_modelo(modelo),
+        "importacao_sklearn_s": round(importacao_s, 3),
+        "carga_fria_s": round(carga_s, 3),
+        "primeira_predicao_ms": round(primeira_ms, 3),
+        "latencia_unitaria_ms": _percentis(latencias),
+        "lotes": lotes,
+        "memoria_pico_mb": round(pico / 2 ** 20, 1),
+        "tamanho_arquivos_mb": round(sum(os.path.getsize(c) for c in arquivos) / 2 ** 20, 2),
+    }
+
+
+def modelos_disponiveis():
+    """{nome: (modelo, vetorizador)} dos modelos já treinados no projeto."""
+    candidatos = {}
+    manifesto = ler_manifesto()
+    if manifesto is not None:
+        candidatos[f"publicado_{manifesto['versao']}"] = (manifesto["modelo"], manifesto["vetorizador"])
+    if os.path.exists(PATH_MODELO_INCREMENTAL):
+        candidatos["incremental_sgd"] = (PATH_MODELO_INCREMENTAL, None)
+    return candidatos
+
+
+def treinar_alternativas(caminho_vetorizador, tamanho=AMOSTRA_ALTERNATIVAS, seed=42):
+    """
+    Treina tipos de modelo alternativos sobre o vetorizador atual (sem SMOTE,
+    com peso de classe). Devolve {nome: caminhos} e o holdout (textos, alvo).
+    """
+    from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.model_selection import train_test_split
+    from train_ml import ler_lotes
+
+    textos, alvo = [], []
+    for lote, y, _ in ler_lotes():
+        textos.append(lote.fillna("").astype(str))
+        alvo.append(y)
+    textos, alvo = pd.concat(textos).to_numpy(), np.concatenate(alvo)
+    if len(textos) > tamanho:
+        indices = np.random.default_rng(seed).choice(len(textos), tamanho, replace=False)
+        textos, alvo = textos[indices], alvo[indices]
+
+    t_treino, t_teste, y_treino, y_teste = train_test_split(textos, alvo, test_size=0.2, random_state=seed, stratify=alvo)
+    X_treino = _ler_pickle(caminho_vetorizador).transform(t_treino)
+
+    alternativas = {
+        "logistica": LogisticRegression(max_iter=1000, class_weight="balanced"),
+        "rf_raso": RandomForestClassifier(n_estimators=50, max_depth=20, class_weight="balanced", random_state=seed, n_jobs=-1),
+        "extra_trees": ExtraTreesClassifier(n_estimators=100, max_depth=20, class_weight="balanced", random_state=seed, n_jobs=-1),
+    }
+    os.makedirs(PASTA_ALTERNATIVAS, exist_ok=True)
+    caminhos = {}
+    for nome, modelo in alternativas.items():
+        inicio = time.time()
+        modelo.fit(X_treino, y_treino)
+        caminho = os.path.join(PASTA_ALTERNATIVAS, f"{nome}.pkl")
+        with open(caminho, "wb") as f: pickle.dump(modelo, f)
+        caminhos[nome] = (caminho, caminho_vetorizador)
+        print(f"   -> {nome} treinado em {round(time.time() - inicio, 1)}s.")
+    return caminhos, (list(t_teste), y_teste)
+
+
+def avaliar_qualidade(caminho_modelo, caminho_vetorizador, textos, alvo):
+    """AUC e F1 (classe atraso, corte 0.5) no holdout."""
+    from sklearn.metrics import f1_score, roc_auc_score
+
+    modelo, vetorizador = carregar_artefatos(caminho_modelo, caminho_vetorizador)
+    prob = modelo.predict_proba(vetorizador.transform(textos))[:, 1]
+    return {
+        "auc": round(float(roc_auc_score(alvo, prob)), 4),
+        "f1": round(float(f1_score(alvo, prob > 0.5)), 4),
+        "n_holdout": len(alvo),
+    }
+
+
+def rodar_benchmark(extras=None, alternativas=False, saida=ARQUIVO_RESULTADO, tamanhos_lote=TAMANHOS_LOTE):
+    print("⏱️ [BENCHMARK] Inferência dos modelos de risco...")
+
+    candidatos = modelos_disponiveis()
+    candidatos.update(extras or {})
+    if not candidatos and not alternativas:
+        print("❌ Nenhum modelo encontrado. Execute scripts/train_ml.py.")
+        return None
+
+    holdout = None
+    if alternativas:
+        manifesto = ler_manifesto()
+        if manifesto is None:
+            print("❌ As alternativas usam o vetorizador publicado. Execute scripts/train_ml.py.")
+            return None
+        treinadas, holdout = treinar_alternativas(manifesto["vetorizador"])
+        candidatos.update(treinadas)
+
+    textos = ler_textos()
+    resultados = []
+    for nome, (caminho_modelo, caminho_vetorizador) in candidatos.items():
+        print(f"   -> {nome}...")
+        # Um processo novo por modelo: carga a frio e pico de memória sem interferência
+        with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+            medida = executor.submit(medir_modelo, caminho_modelo, caminho_vetorizador, textos, tamanhos_lote).result()
+        medida = {"nome": nome, "arquivo": caminho_modelo, **medida}
+        if holdout is not None:
+            medida["qualidade"] = avaliar_qualidade(caminho_modelo, caminho_vetorizador, *holdout)
+            # Os modelos já treinados no projeto podem ter visto essas linhas no treino
+            medida["qualidade"]["holdout_independente"] = caminho_modelo.startswith(PASTA_ALTERNATIVAS)
+        lat = medida["latencia_unitaria_ms"]
+        print(f"      carga {medida['carga_fria_s']}s | p50 {lat['p50']}ms p99 {lat['p99']}ms | "
+              f"{medida['lotes'][-1]['textos_por_s']:,.0f} textos/s | {medida['memoria_pico_mb']} MB")
+        resultados.append(medida)
+
+    import sklearn
+    relatorio = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "ambiente": {
+            "python": platform.python_version(),
+            "sklearn": sklearn.__version__,
+            "sistema": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "config": {"n_textos": len(textos), "n_latencia": N_LATENCIA, "tamanhos_lote": list(tamanhos_lote)},
+        "modelos": resultados,
+    }
+    os.makedirs(os.path.dirname(saida) or ".", exist_ok=True)
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=1)
+    print(f"🏁 [BENCHMARK] Resultado salvo em {saida}")
+    return relatorio
+
+
+def _ler_extra(valor):
+    """'nome=modelo.pkl[,vetorizador.pkl]' -> (nome, (modelo, vetorizador))."""
+    nome, _, caminhos = valor.partition("=")
+    modelo, _, vetorizador = caminhos.partition(",")
+    if not nome or not modelo:
+        raise argparse.ArgumentTypeError("Use nome=modelo.pkl[,vetorizador.pkl]")
+    return nome, (modelo, vetorizador or None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de inferência dos modelos de risco.")
+    parser.add_argument("--modelo", type=_ler_extra, action="append", default=[], help="nome=modelo.pkl[,vetorizador.pkl]")
+    parser.add_argument("--alternativas", action="store_true", help="treina e compara outros tipos de modelo")
+    parser.add_argument("--lotes", type=int, nargs="+", default=TAMANHOS_LOTE, help="tamanhos de lote")
+    parser.add_argument("--saida", default=ARQUIVO_RESULTADO, help="arquivo JSON de saída")
+    args = parser.parse_args()
+    rodar_benchmark(dict(args.modelo), args.alternativas, args.saida, args.lotes)
@@ -0,0 +1,211 @@
+"""
+Teste de resistência (soak) de memória dos callbacks.
+
+Importa o app neste processo e repete, milhares de vezes, a navegação com filtros
+sorteados do teste de carga (benchmarks/carga_usuarios.py) pelo test_client do Flask:
+o caminho completo do Dash (decodificação, callback, serialização das figuras e os
+hooks de métricas), sem rede. A cada INTERVALO_AMOSTRA chamadas roda o GC e registra
+o RSS do processo e a quantidade de objetos Python.
+
+A inclinação (regressão linear após o aquecimento) é comparada com os limites: acima
+deles o comando termina com código 1. Os tipos de objeto que mais cresceram vão para o
+relatório (benchmarks/resultados/soak_<data>.json) para localizar o vazamento.
+
+Uso:
+  python benchmarks/soak_memoria.py --chamadas 5000 --limite-mb 2.0
+  python benchmarks/soak_memoria.py --pasta benchmarks/dados/1000000_s42 --chamadas 20000
+"""
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+sys.path.append(os.path.join(RAIZ, "benchmarks"))
+
+from carga_usuarios import ROTA_DEPENDENCIAS, TROCAS_POR_PAGINA, Usuario, descobrir_paginas  # noqa: E402
+
+try:
+    import resource  # indisponível no Windows
+except ImportError:
+    resource = None
+
+try:
+    import ctypes
+    _malloc_trim = ctypes.CDLL("libc.so.6").malloc_trim  # só glibc (Linux)
+except (OSError, AttributeError):
+    _malloc_trim = None
+
+PASTA_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+
+# --- CONFIGURAÇÃO PADRÃO ---
+CHAMADAS = 5000
+INTERVALO_AMOSTRA = 100      # chamadas entre amostras
+FRACAO_AQUECIMENTO = 0.2     # primeiras amostras fora da regressão (caches enchendo)
+LIMITE_MB_POR_MIL = 2.0      # crescimento de RSS aceito a cada 1000 chamadas
+LIMITE_OBJETOS_POR_MIL = 2000
+TOP_TIPOS = 15
+SEED = 42
+
+
+class _Resposta:
+    def __init__(self, resposta):
+        self.status_code = resposta.status_code
+        self.content = resposta.data
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class SessaoLocal:
+    """A parte de requests.Session usada pelo Usuario, sobre o test_client do Flask."""
+
+    def __init__(self, server):
+        self.cliente = server.test_client()
+
+    def post(self, url, json=None, timeout=None):
+        return _Resposta(self.cliente.post(url, json=json))
+
+
+def rss_atual_mb():
+    """RSS atual do processo (não o pico): /proc no Linux, pico do getrusage como último recurso."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError, AttributeError):
+        pass
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return pico / (2 ** 20 if sys.platform == "darwin" else 2 ** 10)
+    return None
+
+
+def contar_tipos():
+    return Counter(type(o).__name__ for o in gc.get_objects())
+
+
+def inclinacao_por_mil(amostras, campo, fracao_aquecimento=FRACAO_AQUECIMENTO):
+    """Crescimento de `campo` a cada 1000 chamadas (mínimos quadrados, após o aquecimento)."""
+    pontos = [(a["chamadas"], a[campo]) for a in amostras if a[campo] is not None]
+    pontos = pontos[int(len(pontos) * fracao_aquecimento):]
+    if len(pontos) < 3:
+        return None
+    x, y = np.array(pontos, dtype=float).T
+    return float(np.polyfit(x, y, 1)[0] * 1000)
+
+
+def rodar_soak(chamadas=CHAMADAS, intervalo=INTERVALO_AMOSTRA, limite_mb=LIMITE_MB_POR_MIL,
+               limite_objetos=LIMITE_OBJETOS_POR_MIL, pasta=RAIZ, seed=SEED):
+    print(f"🧪 [SOAK] {chamadas:,} chamadas de callback com filtros sorteados...")
+    os.chdir(pasta)  # os caminhos de dados do app são relativos à pasta de trabalho
+    from app import app
+
+    # Exceções dos callbacks entram na contagem de erros; o traceback de cada uma só polui a saída
+    app.server.logger.setLevel("CRITICAL")
+    sessao = SessaoLocal(app.server)
+    dependencias = json.loads(app.server.test_client().get(ROTA_DEPENDENCIAS).data)
+    paginas = descobrir_paginas("", dependencias, sessao)
+
+    contagem = Counter()
+    erros = Counter()
+
+    def registrar(nome, duracao, status, tamanho):
+        contagem[nome] += 1
+        if not (isinstance(status, int) and 200 <= status < 300):
+            erros[nome] += 1
+
+    usuario = Usuario("", dependencias, paginas, seed, registrar, sessao)
+    amostras = []
+
+    def amostrar():
+        gc.collect()
+        # Devolve ao SO a memória livre do malloc: o RSS passa a refletir o que está vivo,
+        # sem o serrilhado da fragmentação do heap
+        if _malloc_trim is not None:
+            _malloc_trim(0)
+        rss = rss_atual_mb()
+        amostras.append({
+            "chamadas": sum(contagem.values()),
+            "segundos": round(time.time() - inicio, 1),
+            "rss_mb": None if rss is None else round(rss, 2),
+            "objetos": len(gc.get_objects()),
+        })
+
+    inicio = time.time()
+    amostrar()
+    tipos_inicio = None
+    proxima = intervalo
+    while sum(contagem.values()) < chamadas:
+        callbacks = usuario.navegar(usuario.rng.choice(paginas))
+        for _ in range(usuario.rng.randint(*TROCAS_POR_PAGINA)):
+            if not usuario.trocar_filtro(callbacks):
+                break
+        while sum(contagem.values()) >= proxima:
+            amostrar()
+            proxima += intervalo
+            # Foto dos tipos depois do aquecimento, para comparar com o fim
+            if tipos_inicio is None and sum(contagem.values()) >= chamadas * FRACAO_AQUECIMENTO:
+                tipos_inicio = contar_tipos()
+            ultima = amostras[-1]
+            print(f"   {ultima['chamadas']:>7,} chamadas | RSS {ultima['rss_mb']} MB | {ultima['objetos']:,} objetos")
+    amostrar()
+
+    tipos_fim = contar_tipos()
+    crescimento_tipos = (tipos_fim - (tipos_inicio or Counter())).most_common(TOP_TIPOS)
+    inclinacao_mb = inclinacao_por_mil(amostras, "rss_mb")
+    inclinacao_objetos = inclinacao_por_mil(amostras, "objetos")
+
+    falhas = []
+    if inclinacao_mb is not None and limite_mb is not None and inclinacao_mb > limite_mb:
+        falhas.append(f"RSS cresce {inclinacao_mb:.2f} MB/1000 chamadas (limite {limite_mb})")
+    if inclinacao_objetos is not None and limite_objetos is not None and inclinacao_objetos > limite_objetos:
+        falhas.append(f"Objetos crescem {inclinacao_objetos:.0f}/1000 chamadas (limite {limite_objetos})")
+
+    relatorio = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "config": {"chamadas": chamadas, "intervalo": intervalo, "limite_mb_por_mil": limite_mb,
+                   "limite_objetos_por_mil": limite_objetos, "pasta": pasta, "seed": seed},
+        "duracao_s": round(time.time() - inicio, 1),
+        "inclinacao_mb_por_mil": inclinacao_mb,
+        "inclinacao_objetos_por_mil": inclinacao_objetos,
+        "falhas": falhas,
+        "tipos_que_mais_cresceram": crescimento_tipos,
+        "chamadas_por_callback": dict(contagem.most_common()),
+        "erros_por_callback": dict(erros),
+        "amostras": amostras,
+    }
+    os.makedirs(PASTA_RESULTADOS, exist_ok=True)
+    saida = os.path.join(PASTA_RESULTADOS, f"soak_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=1)
+
+    formatar = lambda v, casas: "n/d" if v is None else f"{v:.{casas}f}"
+    print(f"   -> RSS: {formatar(inclinacao_mb, 2)} MB/1000 chamadas | "
+          f"objetos: {formatar(inclinacao_objetos, 0)}/1000 chamadas")
+    print(f"   -> Tipos que mais cresceram: {crescimento_tipos[:5]}")
+    for falha in falhas:
+        print(f"   ❌ {falha}")
+    print(f"🏁 [SOAK] Relatório em {saida}")
+    return relatorio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Soak test de memória dos callbacks do painel.")
+    parser.add_argument("--chamadas", type=int, default=CHAMADAS, help="total de chamadas de callback")
+    parser.add_argument("--intervalo", type=int, default=INTERVALO_AMOSTRA, help="chamadas entre amostras")
+    parser.add_argument("--limite-mb", type=float, default=LIMITE_MB_POR_MIL, help="MB de RSS aceitos por 1000 chamadas")
+    parser.add_argument("--limite-objetos", type=float, default=LIMITE_OBJETOS_POR_MIL,
+                        help="objetos Python aceitos por 1000 chamadas")
+    parser.add_argument("--pasta", default=RAIZ, help="pasta com data/ (padrão: raiz do projeto)")
+    parser.add_argument("--seed", type=int, default=SEED)
+    args = parser.parse_args()
+    resultado = rodar_soak(args.chamadas, args.intervalo, args.limite_mb, args.limite_objetos,
+                           os.path.abspath(args.pasta), args.seed)
+    sys.exit(1 if resultado["falhas"] else 0)
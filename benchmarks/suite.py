@@ -0,0 +1,374 @@
+"""
+Suíte de benchmarks do painel: ETL, carregadores e callbacks em várias escalas de dados.
+
+Para cada escala (linhas da Ouvidoria) a suíte:
+  1. gera os CSVs sintéticos (scripts/gerar_dados_sinteticos.py) numa pasta própria;
+  2. roda cada etapa do ETL/NLP num processo novo (tempo e pico de RSS);
+  3. mede os carregadores (carregar_dados_ouvidoria / carregar_dados_lai), também a frio;
+  4. importa o app e chama cada callback com cenários de filtro representativos
+     (mediana de várias execuções + pico de memória alocada numa execução rastreada).
+
+O resultado vai para benchmarks/resultados/ e é comparado com a baseline da escala
+(benchmarks/baselines/suite_<linhas>.json). Regressões acima da tolerância fazem o
+comando terminar com código 1.
+
+Uso:
+  python benchmarks/suite.py --escalas 100000 1000000
+  python benchmarks/suite.py --escalas 100000 --salvar-baseline
+"""
+import argparse
+import importlib
+import json
+import os
+import platform
+import runpy
+import shutil
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+
+# Permite rodar como "python benchmarks/suite.py" a partir da raiz do projeto
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(RAIZ)
+sys.path.append(os.path.join(RAIZ, "scripts"))
+
+from utils.filtros import normalizar_filtros  # noqa: E402
+
+try:
+    import resource  # indisponível no Windows: o pico de RSS fica de fora
+except ImportError:
+    resource = None
+
+# Caminhos
+PASTA_DADOS = os.path.join(RAIZ, "benchmarks", "dados")
+PASTA_RESULTADOS = os.path.join(RAIZ, "benchmarks", "resultados")
+PASTA_BASELINES = os.path.join(RAIZ, "benchmarks", "baselines")
+PASTA_RECURSOS = os.path.join(RAIZ, "data", "resources")
+
+# --- CONFIGURAÇÃO PADRÃO ---
+ESCALAS = [100_000, 1_000_000]
+SEED = 42
+REPETICOES = 5               # execuções cronometradas de cada callback/cenário
+TOLERANCIA = 0.25            # +25% de tempo ou memória conta como regressão
+PISO_TEMPO_S = 0.05          # diferenças menores que isso são ruído
+PISO_MEMORIA_MB = 20
+
+# Etapas do ETL na ordem do pipeline ("modulo:funcao" ou "modulo" para scripts sem função)
+ETAPAS_ETL = [
+    "etl_ouvidoria:rodar_ouvidoria",
+    "etl_lai:rodar_lai",
+    "etl_nlp:rodar_nlp",
+    "etl_indice:rodar_indice",
+    "etl_duplicados:rodar_duplicados",
+    "etl_sentimento:rodar_sentimento",
+    "llm_lai",
+]
+
+CARREGADORES = {
+    "carregar_dados_ouvidoria": ("carregar_dados_ouvidoria", ()),
+    "carregar_dados_lai_pedidos": ("carregar_dados_lai", ("pedidos",)),
+    "carregar_dados_lai_recursos": ("carregar_dados_lai", ("recursos",)),
+}
+
+# callback -> (módulo, montagem dos argumentos a partir do cenário)
+# Páginas com filtros num dcc.Store (utils/filtros.py) recebem o dicionário normalizado do Store
+_store = lambda c, *nomes: (normalizar_filtros(**{n: c.get(n) for n in nomes}),)
+# Callbacks em segundo plano (utils/segundo_plano.py) recebem set_progress antes das entradas
+_sem_progresso = lambda *_: None
+CALLBACKS = {
+    "update_kpis_ouvidoria": ("pages.ouvidoria", lambda c: _store(c, "anos", "ufs", "busca")),
+    "update_combo_temporal": ("pages.ouvidoria", lambda c: (_sem_progresso, *_store(c, "anos", "ufs", "busca"))),
+    "update_top_assuntos": ("pages.ouvidoria", lambda c: _store(c, "anos", "ufs", "busca")),
+    "update_pareto_orgao": ("pages.ouvidoria", lambda c: _store(c, "anos", "ufs", "busca")),
+    "update_campanhas": ("pages.ouvidoria", lambda c: _store(c, "anos", "ufs")),
+    "update_sentimento_orgao": ("pages.ouvidoria", lambda c: _store(c, "anos", "ufs")),
+    "update_kpis_prazos": ("pages.prazos", lambda c: _store(c, "anos")),
+    "update_histograma_prazos": ("pages.prazos", lambda c: (_sem_progresso, *_store(c, "anos"))),
+    "update_evolucao_prazos": ("pages.prazos", lambda c: _store(c, "anos")),
+    "update_ranking_prazos": ("pages.prazos", lambda c: _store(c, "anos")),
+    "update_risco_prazos": ("pages.prazos", lambda c: _store(c, "anos")),
+    "update_kpis_volume": ("pages.resumo", lambda c: _store(c, "anos", "ufs")),
+    "update_kpis_qualidade": ("pages.resumo", lambda c: _store(c, "anos", "ufs")),
+    "update_evol_ouvidoria": ("pages.resumo", lambda c: _store(c, "anos", "ufs")),
+    "update_evol_lai": ("pages.resumo", lambda c: _store(c, "anos", "ufs")),
+    "update_barras_mistas": ("pages.resumo", lambda c: _store(c, "anos", "ufs")),
+    "update_home": ("pages.home", lambda c: (c["anos"], c["ufs"], None, None)),
+    "update_geo": ("pages.geo", lambda c: (c["anos"],)),
+    "update_perfil": ("pages.perfil", lambda c: (_sem_progresso, c["anos"])),
+    "update_qualidade": ("pages.qualidade", lambda c: (c["anos"],)),
+    "update_pedidos": ("pages.lai_pedidos", lambda c: (c["anos"], None)),
+    "update_temas": ("pages.lai_temas", lambda c: (c["anos"],)),
+    "update_recursos": ("pages.lai_recursos", lambda c: (None,)),
+}
+
+
+def cenarios(anos_disponiveis):
+    """Combinações de filtro típicas do uso do painel (anos como o dropdown da página envia)."""
+    anos = sorted(a.item() if hasattr(a, "item") else a for a in anos_disponiveis)
+    if not anos:  # página sem filtro de ano
+        return {"tudo": {"anos": None, "ufs": None}}
+    return {
+        "tudo": {"anos": None, "ufs": None},
+        "ultimo_ano": {"anos": anos[-1:], "ufs": None},
+        "ultimo_ano_sp": {"anos": anos[-1:], "ufs": ["SP"]},
+        "tres_anos_sudeste": {"anos": anos[-3:], "ufs": ["SP", "RJ", "MG", "ES"]},
+        "busca": {"anos": None, "ufs": None, "busca": "benefício"},
+    }
+
+
+# =============================================================================
+# EXECUÇÃO DENTRO DO PROCESSO FILHO (cwd = pasta de dados da escala)
+# =============================================================================
+
+def _rss_pico_mb():
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return round(pico / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+
+
+def _executar_etapa(alvo):
+    modulo, _, funcao = alvo.partition(":")
+    inicio = time.perf_counter()
+    if funcao:
+        getattr(importlib.import_module(modulo), funcao)()
+    else:
+        runpy.run_path(os.path.join(RAIZ, "scripts", f"{modulo}.py"), run_name="__main__")
+    return {"tempo_s": round(time.perf_counter() - inicio, 3), "rss_pico_mb": _rss_pico_mb()}
+
+
+def _executar_carregador(nome):
+    inicio = time.perf_counter()
+    import utils.preprocessamento as prep
+    importacao = time.perf_counter() - inicio
+
+    funcao, args = CARREGADORES[nome]
+    inicio = time.perf_counter()
+    df = getattr(prep, funcao)(*args)
+    return {
+        "tempo_s": round(time.perf_counter() - inicio, 3),
+        "importacao_s": round(importacao, 3),
+        "linhas": len(df),
+        "memoria_df_mb": round(df.memory_usage(deep=True).sum() / 2 ** 20, 1),
+        "rss_pico_mb": _rss_pico_mb(),
+    }
+
+
+def _medir_chamada(funcao, args, repeticoes, limpar=()):
+    funcao(*args)  # aquecimento (caches de plotly/pandas)
+    tempos = []
+    for _ in range(repeticoes):
+        # Linhas filtradas em cache (lru_cache da página) são descartadas: a medida inclui o filtro
+        for limpar_cache in limpar:
+            limpar_cache()
+        inicio = time.perf_counter()
+        funcao(*args)
+        tempos.append(time.perf_counter() - inicio)
+
+    for limpar_cache in limpar:
+        limpar_cache()
+    tracemalloc.start()
+    funcao(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "mediana_s": round(float(np.median(tempos)), 4),
+        "min_s": round(float(np.min(tempos)), 4),
+        "max_s": round(float(np.max(tempos)), 4),
+        "alocado_pico_mb": round(pico / 2 ** 20, 1),
+    }
+
+
+def _executar_callbacks(repeticoes):
+    inicio = time.perf_counter()
+    import app  # noqa: F401  (mesma ordem de carga das páginas do servidor)
+    carga_app = time.perf_counter() - inicio
+    from dash._callback_context import context_value
+    from dash._utils import AttributeDict
+
+    # Contexto de carga inicial (nenhuma entrada disparada) para callbacks que leem ctx.triggered
+    context_value.set(AttributeDict(triggered_inputs=[], inputs_list=[], states_list=[], outputs_list=[]))
+
+    resultados = {"_importacao_app_s": round(carga_app, 3)}
+    for nome, (modulo, montar) in CALLBACKS.items():
+        try:
+            pagina = importlib.import_module(modulo)
+            funcao = getattr(pagina, nome)
+            limpar = [f.cache_clear for n, f in vars(pagina).items() if n.startswith("linhas_") and hasattr(f, "cache_clear")]
+        except Exception as e:
+            resultados[nome] = {"erro": f"{type(e).__name__}: {e}"}
+            continue
+        vistos = set()
+        for cenario, filtros in cenarios(getattr(pagina, "opcoes_ano", [])).items():
+            # Cenários que viram os mesmos argumentos (página sem UF ou sem busca) rodam uma vez só
+            args = montar(filtros)
+            if repr(args) in vistos:
+                continue
+            vistos.add(repr(args))
+            chave = f"{nome}[{cenario}]"
+            try:
+                resultados[chave] = _medir_chamada(funcao, args, repeticoes, limpar)
+            except Exception as e:
+                resultados[chave] = {"erro": f"{type(e).__name__}: {e}"}
+    resultados["_rss_pico_mb"] = _rss_pico_mb()
+    return resultados
+
+
+def _modo_interno(tipo, alvo, repeticoes):
+    """Ponto de entrada do processo filho: imprime o resultado como JSON na última linha."""
+    try:
+        if tipo == "etl":
+            resultado = _executar_etapa(alvo)
+        elif tipo == "carga":
+            resultado = _executar_carregador(alvo)
+        else:
+            resultado = _executar_callbacks(repeticoes)
+    except Exception as e:
+        resultado = {"erro": f"{type(e).__name__}: {e}"}
+    print("\n@@RESULTADO@@" + json.dumps(resultado, ensure_ascii=False, default=str))
+
+
+# =============================================================================
+# ORQUESTRAÇÃO
+# =============================================================================
+
+def _rodar_filho(pasta, tipo, alvo="", repeticoes=REPETICOES, verbose=False):
+    comando = [sys.executable, os.path.abspath(__file__), "--interno", tipo, "--alvo", alvo, "--repeticoes", str(repeticoes)]
+    saida = subprocess.run(comando, cwd=pasta, capture_output=True, text=True, encoding="utf-8", errors="replace")
+    if verbose:
+        print(saida.stdout[-2000:])
+    for linha in reversed(saida.stdout.splitlines()):
+        if linha.startswith("@@RESULTADO@@"):
+            return json.loads(linha[len("@@RESULTADO@@"):])
+    return {"erro": (saida.stderr or saida.stdout)[-500:]}
+
+
+def preparar_dados(linhas, seed):
+    """Pasta isolada por escala, com os CSVs gerados e os recursos de NLP do projeto."""
+    from gerar_dados_sinteticos import rodar_geracao
+
+    pasta = os.path.join(PASTA_DADOS, f"{linhas}_s{seed}")
+    marcador = os.path.join(pasta, "gerado.json")
+    if not os.path.exists(marcador):
+        shutil.rmtree(pasta, ignore_errors=True)
+        rodar_geracao(linhas, seed, os.path.join(pasta, "data", "raw", "sintetico"))
+        with open(marcador, "w", encoding="utf-8") as f:
+            json.dump({"linhas": linhas, "seed": seed}, f)
+    shutil.copytree(PASTA_RECURSOS, os.path.join(pasta, "data", "resources"), dirs_exist_ok=True)
+    os.makedirs(os.path.join(pasta, "data", "processed"), exist_ok=True)
+    return pasta
+
+
+def medir_escala(linhas, seed=SEED, repeticoes=REPETICOES, verbose=False):
+    print(f"\n📏 Escala: {linhas:,} manifestações")
+    pasta = preparar_dados(linhas, seed)
+    resultado = {"etl": {}, "carga": {}, "callbacks": {}}
+
+    for etapa in ETAPAS_ETL:
+        nome = etapa.split(":")[0]
+        resultado["etl"][nome] = medida = _rodar_filho(pasta, "etl", etapa, verbose=verbose)
+        print(f"   ETL {nome}: {medida.get('tempo_s', medida.get('erro'))}")
+
+    for nome in CARREGADORES:
+        resultado["carga"][nome] = medida = _rodar_filho(pasta, "carga", nome, verbose=verbose)
+        print(f"   Carga {nome}: {medida.get('tempo_s', medida.get('erro'))}")
+
+    resultado["callbacks"] = _rodar_filho(pasta, "callbacks", repeticoes=repeticoes, verbose=verbose)
+    for chave, medida in resultado["callbacks"].items():
+        if isinstance(medida, dict):
+            print(f"   {chave}: {medida.get('mediana_s', medida.get('erro'))}")
+    return resultado
+
+
+def _metricas_comparaveis(resultado):
+    """{(grupo, nome, métrica): valor} dos tempos e memórias de uma escala."""
+    valores = {}
+    for grupo, itens in resultado.items():
+        for nome, medida in itens.items():
+            if not isinstance(medida, dict):
+                continue
+            for metrica in ("tempo_s", "mediana_s", "rss_pico_mb", "alocado_pico_mb"):
+                if isinstance(medida.get(metrica), (int, float)):
+                    valores[(grupo, nome, metrica)] = medida[metrica]
+    return valores
+
+
+def comparar(atual, baseline, tolerancia=TOLERANCIA):
+    """Lista de regressões (tempo ou memória acima da tolerância e do piso de ruído)."""
+    regressoes = []
+    anteriores = _metricas_comparaveis(baseline)
+    for chave, valor in _metricas_comparaveis(atual).items():
+        if chave not in anteriores:
+            continue
+        antes = anteriores[chave]
+        piso = PISO_MEMORIA_MB if chave[2].endswith("_mb") else PISO_TEMPO_S
+        if valor > antes * (1 + tolerancia) and valor - antes > piso:
+            regressoes.append({"item": f"{chave[0]}/{chave[1]}", "metrica": chave[2], "baseline": antes,
+                               "atual": valor, "variacao": f"{(valor / antes - 1) * 100:+.0f}%" if antes else "novo"})
+    return regressoes
+
+
+def rodar_suite(escalas=ESCALAS, seed=SEED, repeticoes=REPETICOES, salvar_baseline=False,
+                tolerancia=TOLERANCIA, verbose=False):
+    print("⏱️ [SUÍTE] Benchmarks de ETL, carregadores e callbacks...")
+    relatorio = {
+        "gerado_em": datetime.now().isoformat(timespec="seconds"),
+        "ambiente": {"python": platform.python_version(), "sistema": platform.platform(), "cpus": os.cpu_count()},
+        "config": {"seed": seed, "repeticoes": repeticoes},
+        "escalas": {},
+    }
+    regressoes = {}
+
+    for linhas in escalas:
+        resultado = medir_escala(linhas, seed, repeticoes, verbose)
+        relatorio["escalas"][str(linhas)] = resultado
+
+        arquivo_baseline = os.path.join(PASTA_BASELINES, f"suite_{linhas}.json")
+        if salvar_baseline:
+            os.makedirs(PASTA_BASELINES, exist_ok=True)
+            with open(arquivo_baseline, "w", encoding="utf-8") as f:
+                json.dump({"gerado_em": relatorio["gerado_em"], "ambiente": relatorio["ambiente"], **resultado},
+                          f, ensure_ascii=False, indent=1)
+            print(f"   💾 Baseline salva em {arquivo_baseline}")
+        elif os.path.exists(arquivo_baseline):
+            with open(arquivo_baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+            regressoes[str(linhas)] = comparar(resultado, {k: baseline.get(k, {}) for k in resultado}, tolerancia)
+
+    relatorio["regressoes"] = regressoes
+    os.makedirs(PASTA_RESULTADOS, exist_ok=True)
+    saida = os.path.join(PASTA_RESULTADOS, f"suite_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=1)
+
+    total = sum(len(r) for r in regressoes.values())
+    for linhas, lista in regressoes.items():
+        for r in lista:
+            print(f"   🔺 [{linhas}] {r['item']} {r['metrica']}: {r['baseline']} -> {r['atual']} ({r['variacao']})")
+    print(f"🏁 [SUÍTE] Resultado em {saida}" + (f" | ❌ {total} regressões" if total else ""))
+    return relatorio, total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks de ETL, carregadores e callbacks em várias escalas.")
+    parser.add_argument("--escalas", type=int, nargs="+", default=ESCALAS, help="linhas da Ouvidoria por escala")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--repeticoes", type=int, default=REPETICOES)
+    parser.add_argument("--tolerancia", type=float, default=TOLERANCIA, help="variação aceita antes de acusar regressão")
+    parser.add_argument("--salvar-baseline", action="store_true", help="grava o resultado como nova baseline")
+    parser.add_argument("--verbose", action="store_true", help="mostra a saída dos processos filhos")
+    parser.add_argument("--interno", choices=["etl", "carga", "callbacks"], help=argparse.SUPPRESS)
+    parser.add_argument("--alvo", default="", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.interno:
+        _modo_interno(args.interno, args.alvo, args.repeticoes)
+    else:
+        _, regressoes = rodar_suite(args.escalas, args.seed, args.repeticoes, args.salvar_baseline,
+                                    args.tolerancia, args.verbose)
+        sys.exit(1 if regressoes else 0)
@@ -0,0 +1,30 @@
+"""
+Configuração do gunicorn para o painel (gunicorn -c gunicorn.conf.py wsgi:server).
+
+Variáveis de ambiente:
+  OUVIDORIA_HOST / OUVIDORIA_PORTA   endereço (padrão 0.0.0.0:8050)
+  OUVIDORIA_WORKERS                  processos (padrão: núcleos da máquina, até 8)
+  OUVIDORIA_THREADS                  threads por processo (padrão 4)
+  OUVIDORIA_TIMEOUT                  segundos até matar um worker travado (padrão 120)
+  OUVIDORIA_MAX_REQUESTS             recicla o worker após N requisições (padrão 0 = nunca)
+"""
+import multiprocessing
+import os
+
+bind = f"{os.environ.get('OUVIDORIA_HOST', '0.0.0.0')}:{os.environ.get('OUVIDORIA_PORTA', '8050')}"
+workers = int(os.environ.get("OUVIDORIA_WORKERS", min(multiprocessing.cpu_count(), 8)))
+threads = int(os.environ.get("OUVIDORIA_THREADS", 4))
+worker_class = "gthread"
+
+# Dados carregados uma vez no mestre e compartilhados com os workers (copy-on-write)
+preload_app = True
+
+timeout = int(os.environ.get("OUVIDORIA_TIMEOUT", 120))
+graceful_timeout = 30
+keepalive = 5
+max_requests = int(os.environ.get("OUVIDORIA_MAX_REQUESTS", 0))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("OUVIDORIA_LOG", "info")
@@ -1,18 +1,24 @@
 import dash_bootstrap_components as dbc
-from dash import html, dcc, callback, Input, Output, State
+from dash import html, dcc, callback, Input, Output, State, no_update
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go # Adicionado para o gráfico de medidor
-import pickle
 import os
-import numpy as np
-import re
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from functools import lru_cache
+from utils.modelos import obter_modelo
+from utils.sentimento import pontuar_sentimento
+from utils.explicacao import META_LATENCIA_MS, shap_linha
 
 # --- CONFIGURAÇÕES DE CAMINHOS ---
-PATH_MODEL = "data/processed/modelo_ia.pkl"
-PATH_VECTORIZER = "data/processed/vectorizer.pkl"
 PATH_SHAP_GLOBAL = "data/processed/explica_shap.parquet"
 
+# --- ANÁLISE AO DIGITAR ---
+DEBOUNCE_MS = 400           # espera o usuário parar de digitar
+ORCAMENTO_AO_VIVO_MS = 150  # acima disso a tela mantém o último resultado
+_executor_ao_vivo = ThreadPoolExecutor(max_workers=2)
+
 # --- ESTILO GERAL ---
 ESTILO_PAGINA = {
     "padding": "25px", 
@@ -21,17 +27,59 @@ ESTILO_PAGINA = {
     "overflowY": "auto"    
 }
 
-# --- FUNÇÃO AUXILIAR: ESTIMATIVA DE SATISFAÇÃO (Acréscimo) ---
-def estimar_satisfacao_cidadao(texto):
-    positivas = ['agradeço', 'elogio', 'parabéns', 'eficiente', 'resolvido', 'bom', 'ótimo', 'concessão', 'obrigado']
-    negativas = ['atraso', 'absurdo', 'ruim', 'demora', 'falta', 'erro', 'problema', 'reclamação', 'indeferido', 'péssimo']
+# --- FUNÇÕES AUXILIARES: RESULTADO E MEDIDOR DE SATISFAÇÃO ---
+def montar_resultado(probabilidade):
+    status = "ALTO RISCO DE ATRASO" if probabilidade > 0.5 else "DENTRO DO PRAZO"
+    cor = "danger" if probabilidade > 0.5 else "success"
+    
+    return dbc.Alert([
+        html.H4(status, className="fw-bold m-0"),
+        html.P(f"Probabilidade calculada: {probabilidade*100:.1f}%", className="mb-0 small")
+    ], color=cor, className="border-0 shadow-sm")
+
+def montar_medidor_satisfacao(score):
+    cor_medidor = "#ef4444" if score < 40 else "#f59e0b" if score < 70 else "#10b981"
     
-    score = 50 # Neutro
-    palavras = re.findall(r"\w+", texto.lower())
-    for p in palavras:
-        if p in positivas: score += 12
-        if p in negativas: score -= 12
-    return max(0, min(100, score))
+    fig_sat = go.Figure(go.Indicator(
+        mode = "gauge+number",
+        value = score,
+        number = {'suffix': "%", 'font': {'size': 18}},
+        gauge = {
+            'axis': {'range': [0, 100], 'tickwidth': 1},
+            'bar': {'color': cor_medidor},
+            'steps': [
+                {'range': [0, 40], 'color': "#fee2e2"},
+                {'range': [40, 70], 'color': "#fef3c7"},
+                {'range': [70, 100], 'color': "#d1fae5"}
+            ],
+        }
+    ))
+    fig_sat.update_layout(height=150, margin=dict(l=25, r=25, t=30, b=10), paper_bgcolor='rgba(0,0,0,0)')
+    return fig_sat
+
+def _pontuar(texto, artefatos):
+    probabilidade = artefatos["modelo"].predict_proba(artefatos["vetorizador"].transform([texto]))[0][1]
+    return float(probabilidade), pontuar_sentimento(texto)
+
+@lru_cache(maxsize=512)
+def _pontuar_em_cache(texto, versao):
+    artefatos = obter_modelo()
+    if artefatos is None or artefatos["versao"] != versao:
+        raise LookupError(versao)  # o lru_cache não guarda exceções
+    return _pontuar(texto, artefatos)
+
+def pontuar_texto(texto, artefatos):
+    """
+    (probabilidade, satisfação) de um texto com os artefatos do chamador, em cache por
+    (texto, versão). Se outra versão foi publicada no meio, calcula sem passar pelo cache.
+    """
+    try:
+        return _pontuar_em_cache(texto, artefatos["versao"])
+    except LookupError:
+        return _pontuar(texto, artefatos)
+
+# Carrega e aquece o modelo junto com a página (e não no primeiro clique)
+obter_modelo()
 
 # --- LAYOUT ---
 layout = html.Div(style=ESTILO_PAGINA, children=[
@@ -52,8 +100,10 @@ layout = html.Div(style=ESTILO_PAGINA, children=[
                     dbc.Textarea(
                         id="input-texto-ia",
                         placeholder="Ex: Reclamação sobre a demora excessiva na análise do recurso...",
+                        debounce=DEBOUNCE_MS,
                         style={"height": "120px", "borderRadius": "8px", "fontSize": "14px"}
                     ),
+                    dbc.Switch(id="ia-ao-vivo", label="Analisar enquanto digito", value=True, className="mt-2 small"),
                     dbc.Button("🚀 Analisar Manifestação", id="btn-ia", color="primary", className="mt-3 w-100 fw-bold"),
                     html.Div(id="resultado-ia-container", className="mt-4")
                 ])
@@ -72,8 +122,8 @@ layout = html.Div(style=ESTILO_PAGINA, children=[
                 dbc.CardBody([
                     html.H6("DETALHES DO PIPELINE", className="fw-bold text-muted small"),
                     html.Div([
-                        html.P([html.B("Equilíbrio: "), "SMOTEN (Sintético)"], className="mb-1 small"),
-                        html.P([html.B("Busca: "), "GridSearch CV"], className="mb-1 small"),
+                        html.P([html.B("Equilíbrio: "), "SMOTE (Sintético)"], className="mb-1 small"),
+                        html.P([html.B("Busca: "), "Successive Halving (CV 2-fold, orçamento de 10 min)"], className="mb-1 small"),
                         html.P([html.B("Acurácia: "), html.Span("84%", className="text-success fw-bold")], className="mb-0 small"),
                     ])
                 ])
@@ -118,78 +168,85 @@ def realizar_predicao(n, texto):
     if not texto or len(texto.strip()) < 5:
         return dbc.Alert("⚠️ Por favor, descreva melhor a manifestação.", color="warning"), {}, {"display": "none"}, go.Figure()
     
-    if not os.path.exists(PATH_MODEL) or not os.path.exists(PATH_VECTORIZER):
+    # 1. Artefatos já carregados em memória (registro do modelo)
+    artefatos = obter_modelo()
+    if artefatos is None:
         return dbc.Alert("❌ Arquivos de IA (.pkl) não encontrados!", color="danger"), {}, {"display": "none"}, go.Figure()
-
-    # 1. Carregar artefatos
-    with open(PATH_MODEL, 'rb') as f: model = pickle.load(f)
-    with open(PATH_VECTORIZER, 'rb') as f: tfidf = pickle.load(f)
+    model, tfidf = artefatos["modelo"], artefatos["vetorizador"]
 
     # 2. Processar e Prever
     vec_texto = tfidf.transform([texto])
     probabilidade = model.predict_proba(vec_texto)[0][1]
-    
-    status = "ALTO RISCO DE ATRASO" if probabilidade > 0.5 else "DENTRO DO PRAZO"
-    cor = "danger" if probabilidade > 0.5 else "success"
-    
-    res_html = dbc.Alert([
-        html.H4(status, className="fw-bold m-0"),
-        html.P(f"Probabilidade calculada: {probabilidade*100:.1f}%", className="mb-0 small")
-    ], color=cor, className="border-0 shadow-sm")
+    res_html = montar_resultado(probabilidade)
 
     # --- GERAR GRÁFICO DE SATISFAÇÃO (Acréscimo) ---
-    score = estimar_satisfacao_cidadao(texto)
-    cor_medidor = "#ef4444" if score < 40 else "#f59e0b" if score < 70 else "#10b981"
-    
-    fig_sat = go.Figure(go.Indicator(
-        mode = "gauge+number",
-        value = score,
-        number = {'suffix': "%", 'font': {'size': 18}},
-        gauge = {
-            'axis': {'range': [0, 100], 'tickwidth': 1},
-            'bar': {'color': cor_medidor},
-            'steps': [
-                {'range': [0, 40], 'color': "#fee2e2"},
-                {'range': [40, 70], 'color': "#fef3c7"},
-                {'range': [70, 100], 'color': "#d1fae5"}
-            ],
-        }
-    ))
-    fig_sat.update_layout(height=150, margin=dict(l=25, r=25, t=30, b=10), paper_bgcolor='rgba(0,0,0,0)')
+    fig_sat = montar_medidor_satisfacao(pontuar_sentimento(texto))
 
-    # 3. Gerar Explicação Local
-    feature_names = tfidf.get_feature_names_out()
-    termos_limpos = re.findall(r"(?u)\b[a-zA-Záéíóúâêîôûãõç]{3,}\b", texto.lower())
-    termos_encontrados = [w for w in termos_limpos if w in feature_names]
-    
-    if not termos_encontrados:
+    # 3. Gerar Explicação Local (TreeSHAP exato, só nos termos presentes no texto)
+    linha = vec_texto.tocsr()
+    explicador = artefatos["explicador"]
+    if explicador is not None:
+        inicio = time.perf_counter()
+        valores = shap_linha(explicador, linha)
+        ms = (time.perf_counter() - inicio) * 1000
+        if ms > META_LATENCIA_MS: print(f"⚠️ SHAP local levou {ms:.0f} ms (meta {META_LATENCIA_MS} ms)")
+        titulo_x = f"Contribuição SHAP para o risco (texto vazio = {explicador['base']*100:.0f}%)"
+    else:
+        # Modelo sem árvores: cai para a importância global dos termos presentes
+        valores = {c: model.feature_importances_[c] for c in linha.indices}
+        titulo_x = "Impacto Individual"
+
+    if not valores:
         fig_local = px.bar(title="Nenhum termo técnico identificado no texto.")
         fig_local.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
     else:
-        pesos = []
-        importancias = model.feature_importances_
-        for w in set(termos_encontrados):
-            idx = np.where(feature_names == w)[0][0]
-            pesos.append({'Termo': w, 'Peso': importancias[idx]})
-        
-        df_local = pd.DataFrame(pesos).sort_values('Peso', ascending=True)
-        
-        fig_local = px.bar(
-            df_local, x='Peso', y='Termo', 
-            orientation='h', 
-            color_discrete_sequence=['#7c3aed']
-        )
+        df_local = pd.DataFrame({
+            'Termo': [artefatos["termos"][c] for c in valores],
+            'Peso': list(valores.values()),
+        }).sort_values('Peso', ascending=True)
+        # Vermelho aumenta o risco de atraso, verde reduz
+        cores = ['#dc2626' if p > 0 else '#10b981' for p in df_local['Peso']] if explicador else '#7c3aed'
+
+        fig_local = px.bar(df_local, x='Peso', y='Termo', orientation='h')
+        fig_local.update_traces(marker_color=cores)
         fig_local.update_layout(
             margin=dict(l=20, r=20, t=30, b=20),
             plot_bgcolor='rgba(0,0,0,0)',
             paper_bgcolor='rgba(0,0,0,0)',
-            xaxis={'title': 'Impacto Individual', 'showgrid': True},
+            xaxis={'title': titulo_x, 'showgrid': True},
             yaxis={'automargin': True}
         )
 
     return res_html, fig_local, {"display": "block"}, fig_sat
 
 
+@callback(
+    [Output("resultado-ia-container", "children", allow_duplicate=True),
+     Output("grafico-satisfacao", "figure", allow_duplicate=True)],
+    [Input("input-texto-ia", "value")],
+    [State("ia-ao-vivo", "value")],
+    prevent_initial_call=True
+)
+def predicao_ao_vivo(texto, ao_vivo):
+    """Probabilidade e satisfação enquanto o usuário digita (a explicação SHAP fica no botão)."""
+    if not ao_vivo or not texto or len(texto.strip()) < 5:
+        return no_update, no_update
+
+    artefatos = obter_modelo()
+    if artefatos is None:
+        return no_update, no_update
+
+    # Orçamento de latência: se estourar, mantém o último resultado na tela.
+    # A tarefa continua e o resultado entra no cache para a próxima digitação.
+    tarefa = _executor_ao_vivo.submit(pontuar_texto, texto.strip(), artefatos)
+    try:
+        probabilidade, score = tarefa.result(timeout=ORCAMENTO_AO_VIVO_MS / 1000)
+    except TimeoutError:
+        return no_update, no_update
+
+    return montar_resultado(probabilidade), montar_medidor_satisfacao(score)
+
+
 @callback(
     Output("grafico-ia-global", "figure"),
     Input("btn-ia", "id") 
@@ -201,9 +258,15 @@ def update_global_shap(_):
     df_s = pd.read_parquet(PATH_SHAP_GLOBAL)
     df_s = df_s.dropna().query("Impacto > 0.001").head(12) 
 
+    # Intervalo de confiança (95%) da média de |SHAP|, quando o arquivo tiver
+    erros = {}
+    if {'IC_Inferior', 'IC_Superior'}.issubset(df_s.columns):
+        df_s = df_s.assign(ErroMais=df_s['IC_Superior'] - df_s['Impacto'], ErroMenos=df_s['Impacto'] - df_s['IC_Inferior'])
+        erros = {'error_x': 'ErroMais', 'error_x_minus': 'ErroMenos'}
+
     fig = px.bar(
         df_s, x='Impacto', y='Termo', orientation='h',
-        color='Impacto', color_continuous_scale='Purples'
+        color='Impacto', color_continuous_scale='Purples', **erros
     )
     
     fig.update_layout(
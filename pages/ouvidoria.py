@@ -1,10 +1,17 @@
+from functools import lru_cache
+
 import dash
-from dash import html, dcc, callback, Input, Output
+from dash import html, dcc, callback, Input, Output, State
 import dash_bootstrap_components as dbc
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-from utils.preprocessamento import carregar_dados_ouvidoria, UFS_BRASIL
+import numpy as np
+from utils.preprocessamento import carregar_dados_ouvidoria, carregar_duplicados, UFS_BRASIL
+from utils.busca import carregar_indice, mascara_busca
+from utils.metricas import marcar_etapa, registrar_linhas
+from utils.filtros import TAMANHO_CACHE_RECORTES, chave, normalizar_filtros, posicoes, recortar
+from utils.segundo_plano import barra_progresso, callback_pesado
 
 # --- PALETA DE CORES ---
 COR_SUCESSO = "#16a34a"  # Verde
@@ -14,6 +21,14 @@ COR_NEUTRA = "#475569"  # Cinza Escuro
 COR_DESTAQUE = "#7c3aed"  # Roxo
 COR_BARRAS = "#cbd5e1"  # Cinza Claro
 
+# Órgãos exibidos na tendência de satisfação
+TOP_ORGAOS_SENTIMENTO = 5
+
+# Picos de assunto (campanhas sem texto livre)
+LIMIAR_PICO = 2.0          # mês com pelo menos 2x a média mensal do assunto no órgão
+MIN_REGISTROS_PICO = 20    # ignora picos pequenos (3 registros contra média 1)
+MIN_MESES_PICO = 3
+
 # --- CARGA E TRATAMENTO DE DADOS (BLINDADO) ---
 print(">>> CARREGANDO OUVIDORIA (DEBUG)...")
 
@@ -140,7 +155,7 @@ layout = html.Div(
                                 multi=True,
                                 placeholder="Filtrar Anos",
                             ),
-                            md=3,
+                            md=2,
                         ),
                         dbc.Col(
                             dcc.Dropdown(
@@ -149,6 +164,18 @@ layout = html.Div(
                                 multi=True,
                                 placeholder="Filtrar UF",
                             ),
+                            md=2,
+                        ),
+                        dbc.Col(
+                            [
+                                dbc.Input(
+                                    id="ouv-busca",
+                                    type="search",
+                                    debounce=True,
+                                    placeholder='Buscar termos (ex: aposentadoria "auxilio emergencial")',
+                                ),
+                                html.Small(id="ouv-aviso-busca", className="text-danger"),
+                            ],
                             md=3,
                         ),
                         dbc.Col(
@@ -162,9 +189,10 @@ layout = html.Div(
                                 outline=True,
                                 className="w-100",
                             ),
-                            md=3,
+                            md=2,
                         ),
                         dcc.Download(id="ouv-download"),
+                        dcc.Store(id="ouv-filtros"),
                     ],
                     className="align-items-center g-3",
                 )
@@ -225,6 +253,7 @@ layout = html.Div(
                                         "Volume x Tempo de Resposta (Mensal)",
                                         className="fw-bold text-secondary mb-3",
                                     ),
+                                    barra_progresso("ouv-progresso"),
                                     dcc.Graph(
                                         id="fig-combo-temporal",
                                         style={"height": "350px"},
@@ -276,6 +305,52 @@ layout = html.Div(
                             md=12,
                         ),
                     ],
+                    className="g-3 mb-4",
+                ),
+                # LINHA 4: POSSÍVEIS CAMPANHAS (MinHash LSH)
+                dbc.Row(
+                    [
+                        dbc.Col(
+                            html.Div(
+                                className="custom-card p-3 bg-white rounded shadow-sm",
+                                children=[
+                                    html.H6(
+                                        "Possíveis Campanhas",
+                                        className="fw-bold text-secondary mb-1",
+                                    ),
+                                    html.Div(id="tabela-campanhas"),
+                                ],
+                            ),
+                            md=12,
+                        ),
+                    ],
+                    className="g-3 mb-4",
+                ),
+                # LINHA 5: SATISFAÇÃO ESTIMADA POR ÓRGÃO (léxico de sentimento)
+                dbc.Row(
+                    [
+                        dbc.Col(
+                            html.Div(
+                                className="custom-card p-3 bg-white rounded shadow-sm",
+                                children=[
+                                    html.H6(
+                                        "Satisfação Estimada por Órgão (Mensal)",
+                                        className="fw-bold text-secondary mb-1",
+                                    ),
+                                    html.Small(
+                                        "Escore médio do léxico de sentimento (0 a 100) dos órgãos com mais manifestações",
+                                        className="text-muted d-block mb-3",
+                                    ),
+                                    dcc.Graph(
+                                        id="fig-sentimento-orgao",
+                                        style={"height": "380px"},
+                                        config={"displayModeBar": False},
+                                    ),
+                                ],
+                            ),
+                            md=12,
+                        ),
+                    ],
                     className="g-3 mb-5",
                 ),  # Padding extra no final
             ],
@@ -284,59 +359,88 @@ layout = html.Div(
 )
 
 
+@lru_cache(maxsize=TAMANHO_CACHE_RECORTES)
+def linhas_ouvidoria(anos=None, ufs=None, busca=None):
+    """Posições das manifestações filtradas (None = todas), em cache por combinação de filtros."""
+    if df_ouv.empty:
+        return None
+    mascaras = []
+    if anos:
+        mascaras.append(df_ouv["ANO"].isin(anos).to_numpy())
+    if ufs and "UF" in df_ouv.columns:
+        mascaras.append(df_ouv["UF"].isin(ufs).to_numpy())
+    # Busca textual (índice invertido) combinada com os filtros acima
+    if busca:
+        mascara = mascara_busca(df_ouv, busca)
+        if mascara is not None:
+            mascaras.append(mascara)
+    return posicoes(np.logical_and.reduce(mascaras)) if mascaras else None
+
+
+def _recorte(filtros, com_busca=True):
+    dff = recortar(df_ouv, linhas_ouvidoria(
+        chave(filtros, "anos"), chave(filtros, "ufs"), chave(filtros, "busca") if com_busca else None
+    ))
+    marcar_etapa("filtro")
+    registrar_linhas(len(dff))
+    return dff
+
+
+# --- KPI Helper (Visual estilo Qlik/PowerBI) ---
+def criar_kpi_qlik(valor_atual, titulo, sulfixo="", cor=COR_NEUTRA):
+    fig = go.Figure()
+    fig.add_trace(
+        go.Indicator(
+            mode="number",
+            value=valor_atual,
+            number={
+                "suffix": sulfixo,
+                "font": {"size": 40, "color": cor, "family": "Inter, sans-serif"},
+            },
+            title={
+                "text": titulo.upper(),
+                "font": {"size": 12, "color": "#64748b"},
+            },
+            domain={"x": [0, 1], "y": [0, 1]},
+        )
+    )
+    fig.update_layout(
+        paper_bgcolor="white", height=120, margin=dict(l=10, r=10, t=30, b=10)
+    )
+    return fig
+
+
+@callback(
+    Output("ouv-filtros", "data"),
+    [
+        Input("ouv-ano", "value"),
+        Input("ouv-uf", "value"),
+        Input("ouv-busca", "value"),
+    ],
+)
+def atualizar_filtros_ouvidoria(anos, ufs, busca):
+    return normalizar_filtros(anos=anos, ufs=ufs, busca=busca)
+
+
+@callback(Output("ouv-aviso-busca", "children"), Input("ouv-busca", "value"))
+def aviso_busca(busca):
+    # Sem índice (ou com índice de outra versão dos dados) a busca não filtra nada
+    if busca and busca.strip() and carregar_indice() is None:
+        return "⚠️ Índice de busca ausente ou desatualizado: execute o etl_indice.py."
+    return ""
+
+
 @callback(
     [
         Output("kpi-qlik-vol", "figure"),
         Output("kpi-qlik-tempo", "figure"),
         Output("kpi-qlik-sla", "figure"),
         Output("kpi-qlik-pendencia", "figure"),
-        Output("fig-combo-temporal", "figure"),
-        Output("fig-top-assuntos", "figure"),
-        Output("fig-pareto-orgao", "figure"),
-        Output("ouv-download", "data"),
-    ],
-    [
-        Input("ouv-ano", "value"),
-        Input("ouv-uf", "value"),
-        Input("ouv-btn-download", "n_clicks"),
     ],
+    Input("ouv-filtros", "data"),
 )
-def update_ouvidoria(anos, ufs, n_clicks):
-    dff = df_ouv.copy()
-
-    # Filtros
-    if not dff.empty:
-        if anos:
-            dff = dff[dff["ANO"].isin(anos if isinstance(anos, list) else [anos])]
-        if ufs:
-            dff = (
-                dff[dff["UF"].isin(ufs if isinstance(ufs, list) else [ufs])]
-                if "UF" in dff.columns
-                else dff
-            )
-
-    # --- KPI Helper (Visual estilo Qlik/PowerBI) ---
-    def criar_kpi_qlik(valor_atual, titulo, sulfixo="", cor=COR_NEUTRA):
-        fig = go.Figure()
-        fig.add_trace(
-            go.Indicator(
-                mode="number",
-                value=valor_atual,
-                number={
-                    "suffix": sulfixo,
-                    "font": {"size": 40, "color": cor, "family": "Inter, sans-serif"},
-                },
-                title={
-                    "text": titulo.upper(),
-                    "font": {"size": 12, "color": "#64748b"},
-                },
-                domain={"x": [0, 1], "y": [0, 1]},
-            )
-        )
-        fig.update_layout(
-            paper_bgcolor="white", height=120, margin=dict(l=10, r=10, t=30, b=10)
-        )
-        return fig
+def update_kpis_ouvidoria(filtros):
+    dff = _recorte(filtros)
 
     # --- CÁLCULOS ---
     total = len(dff)
@@ -364,6 +468,8 @@ def update_ouvidoria(anos, ufs, n_clicks):
             ]
         )
 
+    marcar_etapa("agregacao")
+
     # Geração dos KPIs
     kpi1 = criar_kpi_qlik(total, "Total Manifestações", "", COR_NEUTRA)
     kpi2 = criar_kpi_qlik(
@@ -379,7 +485,25 @@ def update_ouvidoria(anos, ufs, n_clicks):
         pendentes, "Em Aberto", "", COR_ERRO if pendentes > 0 else COR_SUCESSO
     )
 
-    # 2. COMBO CHART (VOLUME x TEMPO)
+    marcar_etapa("figura")
+    return kpi1, kpi2, kpi3, kpi4
+
+
+# 2. COMBO CHART (VOLUME x TEMPO)
+# Histórico completo (todos os anos e UFs) leva segundos: roda em segundo plano e é
+# cancelado quando o usuário mexe nos filtros de novo. O filtro também roda no job; as
+# linhas_ouvidoria do worker já vêm dos KPIs (mesmos filtros, callback comum).
+@callback_pesado(
+    Output("fig-combo-temporal", "figure"),
+    Input("ouv-filtros", "data"),
+    barra="ouv-progresso",
+    cancelar=[Input("ouv-ano", "value"), Input("ouv-uf", "value"), Input("ouv-busca", "value")],
+)
+def update_combo_temporal(set_progress, filtros):
+    set_progress((10, "Filtrando..."))
+    dff = _recorte(filtros)
+    set_progress((40, "Agregando por mês..."))
+
     fig_combo = go.Figure()
     if "DATA" in dff.columns:
         # Agrupa por Mês (usando DATA padronizada)
@@ -396,6 +520,8 @@ def update_ouvidoria(anos, ufs, n_clicks):
             .reset_index()
         )
         df_g.rename(columns={"DATA": "Mes"}, inplace=True)
+        marcar_etapa("agregacao")
+        set_progress((80, "Montando o gráfico..."))
 
         # Barras (Volume)
         fig_combo.add_trace(
@@ -429,7 +555,15 @@ def update_ouvidoria(anos, ufs, n_clicks):
             text="Sem dados Temporais", showarrow=False
         )
 
-    # 3. TOP ASSUNTOS
+    marcar_etapa("figura")
+    return fig_combo
+
+
+# 3. TOP ASSUNTOS
+@callback(Output("fig-top-assuntos", "figure"), Input("ouv-filtros", "data"))
+def update_top_assuntos(filtros):
+    dff = _recorte(filtros)
+
     if "ASSUNTO" in dff.columns:
         df_ass = dff["ASSUNTO"].value_counts().head(5).reset_index()
         df_ass.columns = ["Assunto", "Qtd"]
@@ -437,6 +571,7 @@ def update_ouvidoria(anos, ufs, n_clicks):
             lambda x: str(x)[:25] + "..." if len(str(x)) > 25 else str(x)
         )
         df_ass = df_ass.sort_values("Qtd", ascending=True)
+        marcar_etapa("agregacao")
 
         fig_top = px.bar(df_ass, x="Qtd", y="Assunto", orientation="h", text="Qtd")
         fig_top.update_traces(marker_color=COR_DESTAQUE, textposition="inside")
@@ -449,7 +584,15 @@ def update_ouvidoria(anos, ufs, n_clicks):
     else:
         fig_top = go.Figure()
 
-    # 4. PARETO ORGÃOS (HORIZONTAL - RIGOR ESTATÍSTICO 80/20)
+    marcar_etapa("figura")
+    return fig_top
+
+
+# 4. PARETO ORGÃOS (HORIZONTAL - RIGOR ESTATÍSTICO 80/20)
+@callback(Output("fig-pareto-orgao", "figure"), Input("ouv-filtros", "data"))
+def update_pareto_orgao(filtros):
+    dff = _recorte(filtros)
+
     if "ORGAO" in dff.columns:
         # 1. Contagem e Ordenação Inicial
         df_org_base = dff["ORGAO"].value_counts().reset_index()
@@ -483,6 +626,7 @@ def update_ouvidoria(anos, ufs, n_clicks):
         # 6. Recalcular a linha de Pareto (Acumulado do gráfico)
         # O cálculo precisa ser feito de cima para baixo no visual
         df_final["Acum_Graph"] = (df_final["Qtd"][::-1].cumsum()[::-1] / total_demandas) * 100
+        marcar_etapa("agregacao")
 
         fig_pareto = go.Figure()
 
@@ -532,10 +676,148 @@ def update_ouvidoria(anos, ufs, n_clicks):
         fig_pareto = go.Figure()
 
 
-    dl = (
-        dcc.send_data_frame(dff.to_csv, "monitoramento_ouvidoria.csv", index=False)
-        if n_clicks
-        else None
+    marcar_etapa("figura")
+    return fig_pareto
+
+
+@callback(
+    Output("ouv-download", "data"),
+    Input("ouv-btn-download", "n_clicks"),
+    State("ouv-filtros", "data"),
+    prevent_initial_call=True,
+)
+def exportar_ouvidoria(n_clicks, filtros):
+    dff = _recorte(filtros)
+    dl = dcc.send_data_frame(dff.to_csv, "monitoramento_ouvidoria.csv", index=False)
+    marcar_etapa("exportacao")
+    return dl
+
+
+@callback(
+    Output("tabela-campanhas", "children"),
+    Input("ouv-filtros", "data"),
+)
+def update_campanhas(filtros):
+    # Mesmo recorte dos gráficos, sem a busca textual
+    dff = _recorte(filtros, com_busca=False)
+    # (outras páginas podem ter renomeado DATA -> DATA_REGISTRO no cache compartilhado)
+    col_data = next((c for c in ["DATA", "DATA_REGISTRO"] if c in dff.columns), None)
+
+    # Clusters de texto quase idêntico só existem quando a base tem texto livre (etl_duplicados.py)
+    df_dup = carregar_duplicados()
+    if df_dup.empty or len(df_dup) != len(df_ouv):
+        return picos_de_assunto(dff, col_data)
+
+    # Alinha pelo id de linha e mantém só clusters com mais de um registro
+    dup = df_dup.loc[dff.index]
+    dff = dff[dup["CLUSTER_TAM"].to_numpy() > 1]
+    if dff.empty or "ORGAO" not in dff.columns:
+        return html.Small("Nenhum grupo de manifestações repetidas.", className="text-muted")
+
+    grupos = pd.DataFrame({
+        "Cluster": df_dup.loc[dff.index, "CLUSTER_ID"].to_numpy(),
+        "Órgão": dff["ORGAO"].astype(str).to_numpy(),
+        "Mês": pd.to_datetime(dff[col_data], errors="coerce").dt.strftime("%Y-%m").fillna("-").to_numpy() if col_data else "-",
+        "Exemplo": dff["ASSUNTO"].astype(str).str[:60].to_numpy() if "ASSUNTO" in dff.columns else "-",
+    })
+    top = (
+        grupos.groupby(["Cluster", "Órgão", "Mês"])
+        .agg(Exemplo=("Exemplo", "first"), Registros=("Exemplo", "size"))
+        .reset_index()
+        .sort_values("Registros", ascending=False)
+        .head(10)
+    )
+    top["Tamanho do Cluster"] = df_dup.groupby("CLUSTER_ID")["CLUSTER_TAM"].first().reindex(top["Cluster"]).to_numpy()
+    top = top[["Órgão", "Mês", "Exemplo", "Registros", "Tamanho do Cluster"]]
+
+    return [
+        html.Small("Maiores grupos de textos quase idênticos por órgão e mês", className="text-muted d-block mb-3"),
+        dbc.Table.from_dataframe(top, striped=True, hover=True, size="sm", className="mb-0 small"),
+    ]
+
+
+def picos_de_assunto(dff, col_data):
+    """
+    Meses em que um assunto (por órgão) teve pelo menos LIMIAR_PICO vezes a sua média
+    mensal no período filtrado. Sinal de campanha sem olhar o texto: a base pública só
+    traz rótulos de categoria.
+    """
+    chaves = [c for c in ("ORGAO", "ASSUNTO") if c in dff.columns]
+    if "ASSUNTO" not in chaves or col_data is None or dff.empty:
+        return html.Small("Sem ASSUNTO/data para procurar picos.", className="text-muted")
+
+    mes = pd.to_datetime(dff[col_data], errors="coerce").dt.to_period("M").rename("MES")
+    n_meses = mes.nunique()
+    if n_meses < MIN_MESES_PICO:
+        return html.Small(f"Selecione um período com pelo menos {MIN_MESES_PICO} meses.", className="text-muted")
+
+    contagem = dff.groupby([dff[c] for c in chaves] + [mes], observed=True).size()
+    contagem = contagem[contagem > 0]
+    # Média mensal do par no período (meses sem registro contam como zero)
+    media = contagem.groupby(level=chaves, observed=True).transform("sum") / n_meses
+    picos = pd.DataFrame({"Registros": contagem, "Média mensal": media}).reset_index()
+    picos = picos[(picos["Registros"] >= MIN_REGISTROS_PICO) & (picos["Registros"] >= LIMIAR_PICO * picos["Média mensal"])]
+    if picos.empty:
+        return html.Small("Nenhum pico de assunto no período.", className="text-muted")
+
+    picos["Excesso"] = picos["Registros"] - picos["Média mensal"]
+    picos = picos.sort_values("Excesso", ascending=False).head(10)
+    tabela = pd.DataFrame({
+        **({"Órgão": picos["ORGAO"].astype(str)} if "ORGAO" in chaves else {}),
+        "Assunto": picos["ASSUNTO"].astype(str).str[:60],
+        "Mês": picos["MES"].astype(str),
+        "Registros": picos["Registros"],
+        "Média mensal": picos["Média mensal"].round(1),
+        "Pico (x média)": (picos["Registros"] / picos["Média mensal"]).round(1),
+    })
+    return [
+        html.Small(
+            f"Meses com {LIMIAR_PICO:g}x ou mais a média mensal do assunto no órgão (picos de categoria)",
+            className="text-muted d-block mb-3",
+        ),
+        dbc.Table.from_dataframe(tabela, striped=True, hover=True, size="sm", className="mb-0 small"),
+    ]
+
+
+@callback(
+    Output("fig-sentimento-orgao", "figure"),
+    Input("ouv-filtros", "data"),
+)
+def update_sentimento_orgao(filtros):
+    fig = go.Figure()
+    fig.update_layout(template="plotly_white", margin=dict(l=20, r=20, t=10, b=20))
+
+    # (outras páginas podem ter renomeado DATA -> DATA_REGISTRO no cache compartilhado)
+    col_data = next((c for c in ["DATA", "DATA_REGISTRO"] if c in df_ouv.columns), None)
+    if "SENTIMENTO" not in df_ouv.columns or "ORGAO" not in df_ouv.columns or col_data is None:
+        fig.add_annotation(text="Execute o etl_sentimento.py para gerar o escore", showarrow=False)
+        return fig
+
+    # Mesmo recorte dos gráficos, sem a busca textual
+    dff = _recorte(filtros, com_busca=False)
+    if dff.empty:
+        return fig
+
+    top_orgaos = dff["ORGAO"].value_counts().head(TOP_ORGAOS_SENTIMENTO).index
+    dff = dff[dff["ORGAO"].isin(top_orgaos)]
+    df_tend = (
+        pd.DataFrame({
+            "Órgão": dff["ORGAO"].astype(str).to_numpy(),
+            "Mês": pd.to_datetime(dff[col_data], errors="coerce").dt.to_period("M").dt.to_timestamp().to_numpy(),
+            "Satisfação": dff["SENTIMENTO"].to_numpy(),
+        })
+        .dropna(subset=["Mês"])
+        .groupby(["Órgão", "Mês"])["Satisfação"]
+        .mean()
+        .reset_index()
     )
 
-    return kpi1, kpi2, kpi3, kpi4, fig_combo, fig_top, fig_pareto, dl
+    fig = px.line(df_tend, x="Mês", y="Satisfação", color="Órgão", markers=True)
+    fig.update_layout(
+        template="plotly_white",
+        margin=dict(l=20, r=20, t=10, b=20),
+        yaxis_title="Satisfação média",
+        xaxis_title=None,
+        legend=dict(orientation="h", y=-0.2, font=dict(size=10)),
+    )
+    return fig
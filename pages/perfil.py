@@ -1,11 +1,12 @@
 import dash
-from dash import html, dcc, callback, Input, Output
+from dash import html, dcc, Input, Output
 import dash_bootstrap_components as dbc
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 from utils.preprocessamento import carregar_dados_ouvidoria
+from utils.segundo_plano import barra_progresso, callback_pesado
 
 # ==============================================================================
 # 1. CONFIGURAÇÕES VISUAIS
@@ -90,7 +91,8 @@ layout = html.Div(
                     dbc.Col([html.H5("Perfil do Cidadão", className="fw-bold m-0 text-dark"), html.Small("Demografia e Equidade", className="text-muted")], md=4),
                     dbc.Col(dcc.Dropdown(id="perfil-ano", options=[{"label": i, "value": i} for i in opcoes_ano], multi=True, placeholder="Filtrar Ano"), md=4),
                     dbc.Col(html.Div(id="kpi-total-cidadaos", className="text-end fw-bold text-primary"), md=4),
-                ], className="align-items-center")
+                ], className="align-items-center"),
+                barra_progresso("perfil-progresso"),
             ]
         ),
         
@@ -135,13 +137,16 @@ layout = html.Div(
 # ==============================================================================
 # 5. CALLBACK
 # ==============================================================================
-@callback(
+# Em segundo plano: ao trocar o ano de novo o renderer encerra o job anterior
+@callback_pesado(
     [Output("kpi-total-cidadaos", "children"),
      Output("fig-faixa-etaria", "figure"), Output("fig-raca", "figure"),
      Output("fig-genero-sat", "figure"), Output("fig-raca-assunto", "figure")],
-    [Input("perfil-ano", "value")]
+    [Input("perfil-ano", "value")],
+    barra="perfil-progresso",
 )
-def update_perfil(anos):
+def update_perfil(set_progress, anos):
+    set_progress((5, "Filtrando..."))
     dff = df_perfil.copy()
     if anos: dff = dff[dff["ANO"].isin(anos if isinstance(anos, list) else [anos])]
     
@@ -150,6 +155,7 @@ def update_perfil(anos):
     if dff.empty: return "-", vazio, vazio, vazio, vazio
 
     # --- 1. FAIXA ETÁRIA ---
+    set_progress((20, "Faixa etária..."))
     if "FAIXA_ETARIA" in dff.columns:
         df_faixa = dff[~dff["FAIXA_ETARIA"].isin(["Não Informado", "NI", "NaN"])]
         df_faixa = df_faixa["FAIXA_ETARIA"].value_counts().reset_index()
@@ -163,6 +169,7 @@ def update_perfil(anos):
     else: fig_etaria = vazio
 
     # --- 2. RAÇA/COR ---
+    set_progress((40, "Raça/cor..."))
     if "RACA" in dff.columns:
         df_raca = dff["RACA"].value_counts().reset_index()
         df_raca.columns = ["Raca", "Qtd"]
@@ -172,6 +179,7 @@ def update_perfil(anos):
     else: fig_raca = vazio
 
     # --- 3. GÊNERO x SATISFAÇÃO ---
+    set_progress((60, "Satisfação por gênero..."))
     if "GENERO" in dff.columns and "NOTA" in dff.columns:
         df_gen = dff.dropna(subset=["GENERO", "NOTA"])
         df_gen = df_gen[~df_gen["GENERO"].isin(["Não Informado", "NI"])]
@@ -184,6 +192,7 @@ def update_perfil(anos):
     else: fig_gen = vazio
 
     # --- 4. RAÇA x ASSUNTO (CORREÇÃO AQUI) ---
+    set_progress((80, "Assuntos por raça/cor..."))
     if "RACA" in dff.columns and "ASSUNTO" in dff.columns:
         df_cross = dff.dropna(subset=["RACA", "ASSUNTO"])
         top_racas = df_cross["RACA"].value_counts().head(4).index
@@ -1,3 +1,5 @@
+from functools import lru_cache
+
 import dash
 from dash import html, dcc, callback, Input, Output
 import dash_bootstrap_components as dbc
@@ -6,6 +8,8 @@ import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 from utils.preprocessamento import carregar_dados_ouvidoria
+from utils.filtros import TAMANHO_CACHE_RECORTES, chave, normalizar_filtros, posicoes, recortar
+from utils.segundo_plano import barra_progresso, callback_pesado
 
 # ==============================================================================
 # 1. CONFIGURAÇÕES VISUAIS (Importante: Definir no topo)
@@ -30,7 +34,8 @@ LAYOUT_CLEAN = {
 # ==============================================================================
 print(">>> CARREGANDO DADOS DE PRAZOS...")
 # --- CARGA E TRATAMENTO DE DADOS ---
-df_prazo = carregar_dados_ouvidoria()
+# Cópia rasa: os renames e colunas convertidas abaixo não alteram a base compartilhada com as outras páginas
+df_prazo = carregar_dados_ouvidoria().copy(deep=False)
 
 if not df_prazo.empty:
     # Padronização de nomes
@@ -58,6 +63,8 @@ if not df_prazo.empty:
         ]
         if cols_tempo:
             df_prazo.rename(columns={cols_tempo[0]: "TEMPO_RESOLUCAO"}, inplace=True)
+        else:
+            df_prazo["TEMPO_RESOLUCAO"] = 0  # evita KeyError nos callbacks
 
     # Conversão Numérica (Tratando vírgulas e erros)
     for col in ["TEMPO_RESOLUCAO", "DIAS_ATRASO"]:
@@ -180,6 +187,7 @@ layout = html.Div(
                             ),
                             md=4,
                         ),
+                        dcc.Store(id="prazo-filtros"),
                         dbc.Col(
                             html.Div(
                                 id="resumo-prazo",
@@ -195,7 +203,7 @@ layout = html.Div(
         # Conteúdo Principal
         html.Div(
             className="flex-grow-1 p-3",
-            style={"overflow": "hidden", "display": "flex", "flexDirection": "column"},
+            style={"overflowY": "auto", "display": "flex", "flexDirection": "column"},
             children=[
                 # Linha 1: KPIs
                 dbc.Row(
@@ -246,6 +254,7 @@ layout = html.Div(
                                         "Distribuição",
                                         className="fw-bold text-secondary mb-2",
                                     ),
+                                    barra_progresso("prazo-progresso"),
                                     dcc.Graph(
                                         id="fig-hist-prazo",
                                         style={"height": "calc(100vh - 280px)"},
@@ -292,6 +301,28 @@ layout = html.Div(
                     ],
                     className="g-2 h-100",
                 ),
+                # Linha 3: Risco previsto pelo modelo x atraso real
+                dbc.Row(
+                    [
+                        dbc.Col(
+                            html.Div(
+                                className="custom-card p-3 bg-white shadow-sm",
+                                children=[
+                                    html.H6(
+                                        "Risco Previsto x Atraso Real (por Órgão)",
+                                        className="fw-bold text-secondary mb-2",
+                                    ),
+                                    dcc.Graph(
+                                        id="fig-risco-real",
+                                        style={"height": "420px"},
+                                    ),
+                                ],
+                            ),
+                            md=12,
+                        ),
+                    ],
+                    className="g-2 mt-2",
+                ),
             ],
         ),
     ],
@@ -299,63 +330,62 @@ layout = html.Div(
 
 
 # ==============================================================================
-# 5. CALLBACK
+# 5. CALLBACKS
 # ==============================================================================
+@lru_cache(maxsize=TAMANHO_CACHE_RECORTES)
+def linhas_prazos(anos=None):
+    """Posições das manifestações do(s) ano(s) (None = todas), em cache por combinação de filtros."""
+    if not anos:
+        return None
+    return posicoes(df_prazo["ANO"].isin(anos))
+
+
+def _recorte(filtros):
+    """(recorte, None) ou (None, figura de aviso) quando não há dados."""
+    if df_prazo.empty:
+        return None, go.Figure().add_annotation(text="Sem Dados", showarrow=False)
+    # TEMPO_RESOLUCAO já é numérico (convertido na carga)
+    dff = recortar(df_prazo, linhas_prazos(chave(filtros, "anos")))
+    if dff.empty:
+        return None, go.Figure().add_annotation(text="Nenhum dado", showarrow=False)
+    return dff, None
+
+
+def _mascara_atraso(dff):
+    """Coluna usada para atraso e máscara das manifestações atrasadas."""
+    col_atraso = "DIAS_ATRASO" if "DIAS_ATRASO" in dff.columns else "TEMPO_RESOLUCAO"
+    return col_atraso, dff[col_atraso] > (30 if col_atraso == "TEMPO_RESOLUCAO" else 0)
+
+
+@callback(Output("prazo-filtros", "data"), [Input("prazo-ano", "value")])
+def atualizar_filtros_prazos(anos):
+    return normalizar_filtros(anos=anos)
+
+
 @callback(
     [
         Output("kpi-tempo-medio", "figure"),
         Output("kpi-sla-pct", "figure"),
         Output("kpi-atraso-medio", "figure"),
         Output("kpi-orgao-lento", "figure"),
-        Output("fig-hist-prazo", "figure"),
-        Output("fig-evolucao-tempo", "figure"),
-        Output("fig-ranking-tempo", "figure"),
     ],
-    [Input("prazo-ano", "value")],
+    Input("prazo-filtros", "data"),
 )
-def update_prazos(anos):
-    if df_prazo.empty:
-        empty_fig = go.Figure().add_annotation(text="Sem Dados", showarrow=False)
-        return [empty_fig] * 7
-
-    dff = df_prazo.copy()
-
-    # --- PROTEÇÃO CONTRA KEYERROR ---
-    # Se por algum motivo o mapeamento falhou, garantimos que a coluna exista, mesmo que zerada
-    if "TEMPO_RESOLUCAO" not in dff.columns:
-        # Tenta procurar qualquer coluna que tenha 'DIAS' ou 'TEMPO' no nome
-        cols_possiveis = [c for c in dff.columns if 'DIAS' in str(c).upper() or 'TEMPO' in str(c).upper()]
-        if cols_possiveis:
-            dff["TEMPO_RESOLUCAO"] = dff[cols_possiveis[0]]
-        else:
-            dff["TEMPO_RESOLUCAO"] = 0 # Cria a coluna com zero para evitar o erro de KeyError
-    
-    # Garante que seja numérico (se houver strings, o mean() quebra)
-    dff["TEMPO_RESOLUCAO"] = pd.to_numeric(dff["TEMPO_RESOLUCAO"], errors='coerce').fillna(0)
-    # --------------------------------
-
-    # Filtro de Ano
-    if anos:
-        lista_anos = anos if isinstance(anos, list) else [anos]
-        dff = dff[dff["ANO"].isin(lista_anos)]
-    
-    if dff.empty:
-        empty_fig = go.Figure().add_annotation(text="Nenhum dado", showarrow=False)
-        return [empty_fig] * 7
+def update_kpis_prazos(filtros):
+    dff, aviso = _recorte(filtros)
+    if aviso is not None:
+        return [aviso] * 4
 
     # Agora o cálculo não vai mais dar KeyError
     tempo_medio = float(dff["TEMPO_RESOLUCAO"].mean())
-    
-    # ... resto do código
-    
+
     # Cálculo de Atrasos
-    col_atraso = "DIAS_ATRASO" if "DIAS_ATRASO" in dff.columns else "TEMPO_RESOLUCAO"
-    mask_atraso = dff[col_atraso] > (30 if col_atraso == "TEMPO_RESOLUCAO" else 0)
-    
+    col_atraso, mask_atraso = _mascara_atraso(dff)
+
     total_atrasados = len(dff[mask_atraso])
     atraso_medio = dff.loc[mask_atraso, col_atraso].mean()
     atraso_medio = float(atraso_medio) if pd.notnull(atraso_medio) else 0
-    
+
     sla_pct = ((len(dff) - total_atrasados) / len(dff) * 100) if len(dff) > 0 else 0
 
     # 4. KPI de Órgão Lento
@@ -367,44 +397,104 @@ def update_prazos(anos):
             pior_val = resumo_orgao.max()
             pior_nome = str(pior_nome)[:15] + "..." if len(str(pior_nome)) > 15 else str(pior_nome)
 
-    # 5. Gráfico de Evolução (Correção do Erro de Period)
+    return (
+        criar_kpi(tempo_medio, "Tempo Médio", " d"),
+        criar_kpi(sla_pct, "No Prazo", "%", CORES["azul"] if sla_pct > 80 else CORES["laranja"]),
+        criar_kpi(atraso_medio, "Atraso Médio", " d", CORES["vermelho"]),
+        criar_kpi_texto(pior_nome, f"{pior_val:.0f} dias"),
+    )
+
+
+# 5. Gráfico de Evolução (Correção do Erro de Period)
+@callback(Output("fig-evolucao-tempo", "figure"), Input("prazo-filtros", "data"))
+def update_evolucao_prazos(filtros):
+    dff, aviso = _recorte(filtros)
+    if aviso is not None:
+        return aviso
+
     if "DATA_REGISTRO" in dff.columns and not dff["DATA_REGISTRO"].isnull().all():
-        df_ev = dff.copy()
         # Converte para String para evitar erro de serialização JSON
-        df_ev["MES_REF"] = df_ev["DATA_REGISTRO"].dt.strftime("%Y-%m")
-        df_ev = df_ev.groupby("MES_REF")["TEMPO_RESOLUCAO"].mean().reset_index()
-        
+        mes_ref = dff["DATA_REGISTRO"].dt.strftime("%Y-%m").rename("MES_REF")
+        df_ev = dff["TEMPO_RESOLUCAO"].groupby(mes_ref).mean().reset_index()
+
         fig_ev = px.line(df_ev, x="MES_REF", y="TEMPO_RESOLUCAO", markers=True)
         fig_ev.update_traces(line_color=CORES["azul"], line_width=3)
     else:
         fig_ev = go.Figure().add_annotation(text="Datas ausentes", showarrow=False)
 
-    # 6. Gráfico de Ranking (Pareto-like)
+    return fig_ev.update_layout(LAYOUT_CLEAN)
+
+
+# 6. Gráfico de Ranking (Pareto-like)
+@callback(Output("fig-ranking-tempo", "figure"), Input("prazo-filtros", "data"))
+def update_ranking_prazos(filtros):
+    dff, aviso = _recorte(filtros)
+    if aviso is not None:
+        return aviso
+
     if "ORGAO" in dff.columns:
         df_rank = dff.groupby("ORGAO")["TEMPO_RESOLUCAO"].mean().reset_index()
         df_rank = df_rank.sort_values("TEMPO_RESOLUCAO", ascending=True).tail(10)
-        
+
         fig_rank = px.bar(
-            df_rank, x="TEMPO_RESOLUCAO", y="ORGAO", 
+            df_rank, x="TEMPO_RESOLUCAO", y="ORGAO",
             orientation="h", text_auto=".0f"
         )
         fig_rank.update_traces(marker_color=CORES["laranja"])
     else:
         fig_rank = go.Figure()
 
-    # 7. Histograma
+    return fig_rank.update_layout(LAYOUT_CLEAN)
+
+
+# 7. Histograma (todas as manifestações vão para o navegador: em segundo plano,
+# cancelado quando o filtro de ano muda de novo). O filtro também roda no job; as
+# linhas_prazos do worker já vêm dos KPIs (mesmos filtros, callback comum).
+@callback_pesado(
+    Output("fig-hist-prazo", "figure"),
+    Input("prazo-filtros", "data"),
+    barra="prazo-progresso",
+    cancelar=[Input("prazo-ano", "value")],
+)
+def update_histograma_prazos(set_progress, filtros):
+    set_progress((10, "Filtrando..."))
+    dff, aviso = _recorte(filtros)
+    if aviso is not None:
+        return aviso
+
+    set_progress((50, "Montando o histograma..."))
     fig_hist = px.histogram(dff, x="TEMPO_RESOLUCAO", color_discrete_sequence=[CORES["roxo"]])
+    return fig_hist.update_layout(LAYOUT_CLEAN)
 
-    # Aplicar Layout Clean em todos
-    for f in [fig_ev, fig_rank, fig_hist]:
-        f.update_layout(LAYOUT_CLEAN)
 
-    return (
-        criar_kpi(tempo_medio, "Tempo Médio", " d"),
-        criar_kpi(sla_pct, "No Prazo", "%", CORES["azul"] if sla_pct > 80 else CORES["laranja"]),
-        criar_kpi(atraso_medio, "Atraso Médio", " d", CORES["vermelho"]),
-        criar_kpi_texto(pior_nome, f"{pior_val:.0f} dias"),
-        fig_hist,
-        fig_ev,
-        fig_rank,
-    )
\ No newline at end of file
+# 8. Risco previsto (etl_risco.py) x atraso real por órgão
+@callback(Output("fig-risco-real", "figure"), Input("prazo-filtros", "data"))
+def update_risco_prazos(filtros):
+    dff, aviso = _recorte(filtros)
+    if aviso is not None:
+        return aviso
+
+    if "RISCO" in dff.columns and "ORGAO" in dff.columns:
+        _, mask_atraso = _mascara_atraso(dff)
+        df_risco = (
+            dff.assign(ATRASADO=mask_atraso.astype("float32"), RISCO=dff["RISCO"].astype("float32"))
+            .groupby("ORGAO", observed=True)
+            .agg(RISCO=("RISCO", "mean"), ATRASADO=("ATRASADO", "mean"), QTD=("RISCO", "size"))
+            .reset_index()
+        )
+        df_risco = df_risco.sort_values("QTD", ascending=False).head(40)
+        df_risco[["RISCO", "ATRASADO"]] *= 100
+
+        fig_risco = px.scatter(
+            df_risco, x="RISCO", y="ATRASADO", size="QTD", hover_name="ORGAO",
+            labels={"RISCO": "Risco previsto médio (%)", "ATRASADO": "Atrasadas (%)", "QTD": "Manifestações"},
+            color_discrete_sequence=[CORES["roxo"]],
+        )
+        # Diagonal: órgãos acima dela atrasam mais do que o modelo prevê
+        fig_risco.add_shape(type="line", x0=0, y0=0, x1=100, y1=100, line=dict(color=CORES["cinza"], dash="dash"))
+    else:
+        fig_risco = go.Figure().add_annotation(
+            text="Risco previsto indisponível (execute scripts/etl_risco.py)", showarrow=False
+        )
+
+    return fig_risco.update_layout(LAYOUT_CLEAN)
@@ -1,10 +1,14 @@
+from functools import lru_cache
+
 import dash
 from dash import html, dcc, callback, Input, Output
 import dash_bootstrap_components as dbc
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
+import numpy as np
 from utils.preprocessamento import carregar_dados_ouvidoria, carregar_dados_lai, UFS_BRASIL
+from utils.filtros import TAMANHO_CACHE_RECORTES, chave, normalizar_filtros, posicoes, recortar
 
 # --- CONFIGURAÇÕES VISUAIS ---
 CORES = {
@@ -134,6 +138,7 @@ layout = html.Div(
                     ], md=4),
                     dbc.Col(dcc.Dropdown(id="resumo-ano", options=[{"label": i, "value": i} for i in opcoes_ano], value=[], multi=True, placeholder="📅 Todos os Anos"), md=4),
                     dbc.Col(dcc.Dropdown(id="resumo-uf", options=[{"label": i, "value": i} for i in opcoes_uf], multi=True, placeholder="📍 Todos os Estados"), md=4),
+                    dcc.Store(id="resumo-filtros"),
                 ], className="align-items-center")
             ],
         ),
@@ -167,103 +172,130 @@ layout = html.Div(
 )
 
 # --- CALLBACK ---
-@callback(
-    [Output("kpis-linha-1", "children"), Output("kpis-linha-qualidade", "children"),
-     Output("fig-evol-ouv-int", "figure"), Output("fig-evol-lai-int", "figure"), Output("fig-barras-mistas", "figure")],
-    [Input("resumo-ano", "value"), Input("resumo-uf", "value")]
-)
-def update_integrado(anos, ufs):
-    dff_ouv = df_ouv.copy()
-    dff_lai = df_lai.copy()
-    
-    # Filtros
-    if anos:
-        lista_anos = anos if isinstance(anos, list) else [anos]
-        if "ANO" in dff_ouv.columns: dff_ouv = dff_ouv[dff_ouv["ANO"].isin(lista_anos)]
-        if "ANO" in dff_lai.columns: dff_lai = dff_lai[dff_lai["ANO"].isin(lista_anos)]
-    if ufs:
-        lista_ufs = ufs if isinstance(ufs, list) else [ufs]
-        if "UF" in dff_ouv.columns: dff_ouv = dff_ouv[dff_ouv["UF"].isin(lista_ufs)]
-        if "UF" in dff_lai.columns: dff_lai = dff_lai[dff_lai["UF"].isin(lista_ufs)]
+def _posicoes_filtradas(df, anos, ufs):
+    mascaras = []
+    if anos and "ANO" in df.columns: mascaras.append(df["ANO"].isin(anos).to_numpy())
+    if ufs and "UF" in df.columns: mascaras.append(df["UF"].isin(ufs).to_numpy())
+    return posicoes(np.logical_and.reduce(mascaras)) if mascaras else None
+
+
+@lru_cache(maxsize=TAMANHO_CACHE_RECORTES)
+def linhas_integradas(anos=None, ufs=None):
+    """Posições (ouvidoria, lai) filtradas (None = todas), em cache por combinação de filtros."""
+    return _posicoes_filtradas(df_ouv, anos, ufs), _posicoes_filtradas(df_lai, anos, ufs)
+
+
+def _recortes(filtros):
+    linhas_ouv, linhas_lai = linhas_integradas(chave(filtros, "anos"), chave(filtros, "ufs"))
+    return recortar(df_ouv, linhas_ouv), recortar(df_lai, linhas_lai)
+
+
+@callback(Output("resumo-filtros", "data"), [Input("resumo-ano", "value"), Input("resumo-uf", "value")])
+def atualizar_filtros_resumo(anos, ufs):
+    return normalizar_filtros(anos=anos, ufs=ufs)
+
+
+@callback(Output("kpis-linha-1", "children"), Input("resumo-filtros", "data"))
+def update_kpis_volume(filtros):
+    dff_ouv, dff_lai = _recortes(filtros)
 
     # --- CÁLCULOS OUVIDORIA ---
     vol_ouv = len(dff_ouv)
     prazo_ouv = dff_ouv[dff_ouv["PRAZO"] > 0]["PRAZO"].mean() if "PRAZO" in dff_ouv.columns else 0
-    # Correção: Adicionamos "" dentro do fillna para não dar erro de Valor
-   # Primeiro astype(str), depois fazemos a busca. Isso mata o erro de Categoria.
-    resolvidos = len(dff_ouv[dff_ouv["STATUS"].astype(str).str.contains("Concluída|Encerrada|Respondida", case=False, na=False)]) if "STATUS" in dff_ouv.columns else 0
-    pct_resolv = (resolvidos / vol_ouv * 100) if vol_ouv > 0 else 0
-    pendentes_ouv = vol_ouv - resolvidos
 
-    # --- CÁLCULOS LAI (CORREÇÃO DO ERRO DE MEMÓRIA) ---
+    # --- CÁLCULOS LAI ---
     vol_lai = len(dff_lai)
     prazo_lai = 0
     if "PRAZO_CALC" in dff_lai.columns:
         prazo_lai = dff_lai[dff_lai["PRAZO_CALC"] >= 0]["PRAZO_CALC"].mean()
     if pd.isna(prazo_lai): prazo_lai = 0
 
+    # KPIs Linha 1
+    return [
+        card_kpi_novo("Total Ouvidoria", f"{vol_ouv:,}".replace(",", "."), "bi bi-megaphone-fill", CORES["roxo"], "Manifestações"),
+        card_kpi_novo("Total LAI", f"{vol_lai:,}".replace(",", "."), "bi bi-file-earmark-lock2-fill", CORES["azul"], "Pedidos de Acesso"),
+        card_kpi_novo("Tempo Ouvidoria", f"{prazo_ouv:.0f} dias", "bi bi-clock-history", CORES["laranja"], "Média Resolução"),
+        card_kpi_novo("Tempo LAI", f"{prazo_lai:.0f} dias", "bi bi-hourglass-split", CORES["laranja"], "Média Resposta"),
+    ]
+
+
+# KPIs Qualidade
+def card_mini(titulo, valor, cor):
+    return dbc.Col(html.Div(className="p-3 bg-white shadow-sm border rounded", children=[
+        html.Small(titulo, className="text-muted fw-bold d-block mb-1"),
+        html.H4(valor, className="fw-bold m-0", style={"color": cor})
+    ]), md=6, className="mb-3")
+
+
+@callback(Output("kpis-linha-qualidade", "children"), Input("resumo-filtros", "data"))
+def update_kpis_qualidade(filtros):
+    dff_ouv, dff_lai = _recortes(filtros)
+
+    vol_ouv = len(dff_ouv)
+    # Primeiro astype(str), depois fazemos a busca. Isso mata o erro de Categoria.
+    resolvidos = len(dff_ouv[dff_ouv["STATUS"].astype(str).str.contains("Concluída|Encerrada|Respondida", case=False, na=False)]) if "STATUS" in dff_ouv.columns else 0
+    pct_resolv = (resolvidos / vol_ouv * 100) if vol_ouv > 0 else 0
+    pendentes_ouv = vol_ouv - resolvidos
+
     # CORREÇÃO CRÍTICA:
     # 1. Removemos .astype(str) para não explodir a memória
     # 2. Usamos na=False para tratar nulos sem converter
+    vol_lai = len(dff_lai)
     concedidos = 0
     if "RESULTADO" in dff_lai.columns:
         concedidos = len(dff_lai[dff_lai["RESULTADO"].str.contains("Concedido|Deferido|Acesso Concedido", case=False, na=False)])
-        
+
     pct_transp = (concedidos / vol_lai * 100) if vol_lai > 0 else 0
     negados_lai = vol_lai - concedidos
 
-    # KPIs Linha 1
-    kpis_1 = [
-        card_kpi_novo("Total Ouvidoria", f"{vol_ouv:,}".replace(",", "."), "bi bi-megaphone-fill", CORES["roxo"], "Manifestações"),
-        card_kpi_novo("Total LAI", f"{vol_lai:,}".replace(",", "."), "bi bi-file-earmark-lock2-fill", CORES["azul"], "Pedidos de Acesso"),
-        card_kpi_novo("Tempo Ouvidoria", f"{prazo_ouv:.0f} dias", "bi bi-clock-history", CORES["laranja"], "Média Resolução"),
-        card_kpi_novo("Tempo LAI", f"{prazo_lai:.0f} dias", "bi bi-hourglass-split", CORES["laranja"], "Média Resposta"),
-    ]
-
-    # KPIs Qualidade
-    def card_mini(titulo, valor, cor):
-        return dbc.Col(html.Div(className="p-3 bg-white shadow-sm border rounded", children=[
-            html.Small(titulo, className="text-muted fw-bold d-block mb-1"),
-            html.H4(valor, className="fw-bold m-0", style={"color": cor})
-        ]), md=6, className="mb-3")
-
-    kpis_qualidade = [
+    return [
         card_mini("Resolutividade (Ouv)", f"{pct_resolv:.1f}%", CORES["verde"]),
         card_mini("Transparência (LAI)", f"{pct_transp:.1f}%", CORES["verde"]),
         card_mini("Pendentes (Ouv)", f"{pendentes_ouv}", CORES["vermelho"]),
         card_mini("Negados (LAI)", f"{negados_lai}", CORES["vermelho"]),
     ]
 
-    # Gráficos Evolução (Anual)
-    def plot_evol_anual(df, cor, nome):
-        fig = go.Figure()
-        if "DATA" in df.columns and not df.empty:
-            ts = df.groupby(df["DATA"].dt.year).size().reset_index(name="Qtd")
-            ts.columns = ["Ano", "Qtd"]
-            fig.add_trace(go.Scatter(x=ts["Ano"], y=ts["Qtd"], fill='tozeroy', mode='lines+markers', line=dict(color=cor, width=3), marker=dict(size=8)))
-            fig.update_layout(LAYOUT_CLEAN, xaxis_title=None, yaxis_title=None, margin=dict(l=0,r=0,t=10,b=20), xaxis=dict(tickmode='linear', dtick=1))
-        else: fig.add_annotation(text="Sem dados", showarrow=False)
-        return fig
-
-    fig_evol_ouv = plot_evol_anual(dff_ouv, CORES["roxo"], "Ouvidoria")
-    fig_evol_lai = plot_evol_anual(dff_lai, CORES["azul"], "LAI")
-
-    # Gráfico Barras Misto
+
+# Gráficos Evolução (Anual)
+def plot_evol_anual(df, cor, nome):
+    fig = go.Figure()
+    if "DATA" in df.columns and not df.empty:
+        ts = df.groupby(df["DATA"].dt.year).size().reset_index(name="Qtd")
+        ts.columns = ["Ano", "Qtd"]
+        fig.add_trace(go.Scatter(x=ts["Ano"], y=ts["Qtd"], fill='tozeroy', mode='lines+markers', line=dict(color=cor, width=3), marker=dict(size=8)))
+        fig.update_layout(LAYOUT_CLEAN, xaxis_title=None, yaxis_title=None, margin=dict(l=0,r=0,t=10,b=20), xaxis=dict(tickmode='linear', dtick=1))
+    else: fig.add_annotation(text="Sem dados", showarrow=False)
+    return fig
+
+
+@callback(Output("fig-evol-ouv-int", "figure"), Input("resumo-filtros", "data"))
+def update_evol_ouvidoria(filtros):
+    return plot_evol_anual(_recortes(filtros)[0], CORES["roxo"], "Ouvidoria")
+
+
+@callback(Output("fig-evol-lai-int", "figure"), Input("resumo-filtros", "data"))
+def update_evol_lai(filtros):
+    return plot_evol_anual(_recortes(filtros)[1], CORES["azul"], "LAI")
+
+
+# Gráfico Barras Misto
+@callback(Output("fig-barras-mistas", "figure"), Input("resumo-filtros", "data"))
+def update_barras_mistas(filtros):
+    dff_ouv, dff_lai = _recortes(filtros)
+
     fig_misto = go.Figure()
+    # astype(str) antes de concatenar: em coluna Categorical o "+" falha
     if "ASSUNTO" in dff_ouv.columns:
         top_o = dff_ouv["ASSUNTO"].value_counts().head(3).reset_index()
         top_o.columns = ["Item", "Qtd"]
-        top_o["Item"] = "OUV: " + top_o["Item"].apply(lambda x: str(x)[:15])
+        top_o["Item"] = "OUV: " + top_o["Item"].astype(str).str[:15]
         fig_misto.add_trace(go.Bar(y=top_o["Item"], x=top_o["Qtd"], orientation='h', name="Ouvidoria", marker_color=CORES["roxo"]))
 
     if "ORGAO" in dff_lai.columns:
         top_l = dff_lai["ORGAO"].value_counts().head(3).reset_index()
         top_l.columns = ["Item", "Qtd"]
-        top_l["Item"] = "LAI: " + top_l["Item"].apply(lambda x: str(x)[:15])
+        top_l["Item"] = "LAI: " + top_l["Item"].astype(str).str[:15]
         fig_misto.add_trace(go.Bar(y=top_l["Item"], x=top_l["Qtd"], orientation='h', name="LAI", marker_color=CORES["azul"]))
-    
-    fig_misto.update_layout(LAYOUT_CLEAN, barmode="group", legend=dict(orientation="h", y=-0.2))
-
-    return kpis_1, kpis_qualidade, fig_evol_ouv, fig_evol_lai, fig_misto
-
 
+    fig_misto.update_layout(LAYOUT_CLEAN, barmode="group", legend=dict(orientation="h", y=-0.2))
+    return fig_misto
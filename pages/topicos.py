@@ -2,17 +2,36 @@ import dash_bootstrap_components as dbc
 from dash import html, dcc, callback, Input, Output
 import os
 import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from utils.preprocessamento import carregar_frequencia_termos, carregar_dados_ouvidoria, UFS_BRASIL
+from utils.busca import buscar
 
-# Caminhos das imagens e dados gerados pelo script NLP
-IMG_WORDCLOUD = "assets/wordcloud_assuntos.png"
-IMG_WORDCLOUD_TOPICOS = "assets/wordcloud_topicos_lda.png"
-IMG_PARETO = "assets/pareto_palavras.png"
+# Dados gerados pelo script NLP
 ARQUIVO_TOPICOS = "data/processed/topicos_nlp.parquet"
 
+LAYOUT_CLEAN = {
+    "plot_bgcolor": "rgba(0,0,0,0)",
+    "paper_bgcolor": "rgba(0,0,0,0)",
+    "font": {"family": "Inter, sans-serif", "color": "#64748b"},
+    "margin": {"l": 10, "r": 10, "t": 30, "b": 10},
+}
+
+# --- CARGA (Tabela esparsa de termos: ANO x MES x UF x ORGAO x TERMO) ---
+print(">>> CARREGANDO FREQUÊNCIA DE TERMOS...")
+df_termos = carregar_frequencia_termos()
+
+if not df_termos.empty:
+    opcoes_ano = sorted([a for a in df_termos["ANO"].cat.categories if a != "NI"], reverse=True)
+    opcoes_orgao = sorted(df_termos["ORGAO"].cat.categories)
+else:
+    opcoes_ano, opcoes_orgao = [], []
+opcoes_uf = sorted(UFS_BRASIL)
+
 # --- LAYOUT FULL SCREEN ---
 layout = html.Div(style={
     "height": "100vh",
-    "display": "flex", 
+    "display": "flex",
     "flexDirection": "column",
     "backgroundColor": "#f8f9fa",
     "overflow": "hidden"
@@ -24,23 +43,37 @@ layout = html.Div(style={
             "backgroundColor": "white", "padding": "15px", "borderRadius": "10px",
             "boxShadow": "0 2px 4px rgba(0,0,0,0.05)", "borderLeft": "5px solid #6c5ce7"
         }, children=[
-            html.H3("🧠 Inteligência de Texto & Tópicos (NLP)", className="text-primary m-0"),
-            html.Small("Análise semântica automática e distribuição de Pareto", className="text-muted")
+            dbc.Row([
+                dbc.Col([
+                    html.H3("🧠 Inteligência de Texto & Tópicos (NLP)", className="text-primary m-0"),
+                    html.Small("Análise semântica automática e distribuição de Pareto", className="text-muted")
+                ], md=4),
+                dbc.Col(dcc.Dropdown(id="nlp-ano", options=[{"label": i, "value": i} for i in opcoes_ano], multi=True, placeholder="Filtrar Anos"), md=2),
+                dbc.Col(dcc.Dropdown(id="nlp-uf", options=[{"label": i, "value": i} for i in opcoes_uf], multi=True, placeholder="Filtrar UF"), md=2),
+                dbc.Col(dcc.Dropdown(id="nlp-orgao", options=[{"label": i, "value": i} for i in opcoes_orgao], multi=True, placeholder="Filtrar Órgão"), md=4),
+            ], className="align-items-center g-2")
         ]),
-        
+
         html.Div(className="mt-3", children=[
-            dbc.Tabs(id="abas-nlp", active_tab="tab-nuvem", children=[
-                dbc.Tab(label="Nuvem de Termos", tab_id="tab-nuvem"),
-                dbc.Tab(label="Nuvem de Tópicos (IA)", tab_id="tab-nuvem-topicos"),
+            dbc.Tabs(id="abas-nlp", active_tab="tab-pareto", children=[
                 dbc.Tab(label="Distribuição de Pareto", tab_id="tab-pareto"),
+                dbc.Tab(label="Mapa de Termos", tab_id="tab-treemap"),
+                dbc.Tab(label="Mapa de Tópicos (IA)", tab_id="tab-treemap-topicos"),
                 dbc.Tab(label="Cards de Tópicos", tab_id="tab-topicos"),
+                dbc.Tab(label="Busca de Termos", tab_id="tab-busca"),
             ]),
         ])
     ]),
 
     # 2. ÁREA DE CONTEÚDO DINÂMICO
+    html.Div(id="container-busca-nlp", style={"display": "none", "padding": "0 25px 10px 25px", "flexShrink": "0"}, children=[
+        dbc.Input(
+            id="nlp-busca", type="search", debounce=True,
+            placeholder='Ex: aposentadoria  |  "auxilio emergencial"  (todos os termos são obrigatórios)'
+        )
+    ]),
     html.Div(
-        id="conteudo-principal-nlp", 
+        id="conteudo-principal-nlp",
         style={
             "flexGrow": "1",
             "overflowY": "auto",
@@ -49,62 +82,191 @@ layout = html.Div(style={
     )
 ])
 
-# --- CALLBACK PARA CONTEÚDO RESPONSIVO (TAMANHO AJUSTADO) ---
+
+# --- HELPERS ---
+def filtrar_termos(anos, ufs, orgaos):
+    """Soma as frequências dos termos para a combinação de filtros."""
+    dff = df_termos
+    if anos: dff = dff[dff["ANO"].isin(anos if isinstance(anos, list) else [anos])]
+    if ufs: dff = dff[dff["UF"].isin(ufs if isinstance(ufs, list) else [ufs])]
+    if orgaos: dff = dff[dff["ORGAO"].isin(orgaos if isinstance(orgaos, list) else [orgaos])]
+    freq = dff.groupby("TERMO", observed=True)["QTD"].sum()
+    freq = freq[freq > 0].sort_values(ascending=False)
+    return freq.reset_index().rename(columns={"TERMO": "Termo", "QTD": "Frequencia"})
+
+
+def grafico_pareto(freq, n_limite=25):
+    total = freq["Frequencia"].sum()
+    freq = freq.copy()
+    freq["Acumulado"] = freq["Frequencia"].cumsum() / total
+
+    # Top N + agrupamento do restante até 80% e da cauda longa
+    df_top = freq.head(n_limite)
+    df_meio = freq.iloc[n_limite:]
+    df_meio_80 = df_meio[df_meio["Acumulado"] <= 0.81]
+    soma_cauda = freq.iloc[len(df_top) + len(df_meio_80):]["Frequencia"].sum()
+
+    linhas = [df_top[["Termo", "Frequencia"]]]
+    if len(df_meio_80):
+        linhas.append(pd.DataFrame([{"Termo": f"Outros {len(df_meio_80)} termos (até 80%)", "Frequencia": df_meio_80["Frequencia"].sum()}]))
+    if soma_cauda > 0:
+        linhas.append(pd.DataFrame([{"Termo": "Demais termos (100%)", "Frequencia": soma_cauda}]))
+    df_final = pd.concat(linhas, ignore_index=True)
+    df_final["Acum_Graph"] = df_final["Frequencia"].cumsum() / total * 100
+    df_final = df_final.iloc[::-1].reset_index(drop=True)
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        y=df_final["Termo"], x=df_final["Frequencia"], orientation="h",
+        name="Frequência", marker_color="#9370DB", opacity=0.8
+    ))
+    fig.add_trace(go.Scatter(
+        y=df_final["Termo"], x=df_final["Acum_Graph"], name="% Acumulado",
+        mode="lines+markers", line=dict(color="#6A0DAD", width=3), xaxis="x2"
+    ))
+    fig.add_vline(x=80, line_dash="dash", line_color="red", xref="x2")
+    fig.update_layout(
+        LAYOUT_CLEAN,
+        xaxis=dict(title="Frequência Absoluta"),
+        xaxis2=dict(title="Percentual Acumulado (%)", overlaying="x", side="top", range=[0, 105], ticksuffix="%"),
+        yaxis=dict(automargin=True),
+        legend=dict(orientation="h", y=-0.1),
+        height=max(450, 22 * len(df_final)),
+        margin=dict(l=10, r=30, t=60, b=40),
+    )
+    return fig
+
+
+def contagem_busca(consulta, anos, ufs, orgaos):
+    """Manifestações que citam a consulta, por órgão e por mês (ids do índice ∩ filtros)."""
+    linhas = buscar(consulta)
+    if linhas is None: return None
+
+    df_ouv = carregar_dados_ouvidoria()
+    cols = {c.upper(): c for c in df_ouv.columns}
+    col_data = cols.get("DATA") or cols.get("DATA_REGISTRO")
+    dff = df_ouv.loc[df_ouv.index.intersection(linhas)]
+
+    if anos and "ANO" in cols: dff = dff[pd.to_numeric(dff[cols["ANO"]], errors="coerce").isin([int(a) for a in anos])]
+    if ufs and "UF" in cols: dff = dff[dff[cols["UF"]].isin(ufs)]
+    if orgaos and "ORGAO" in cols: dff = dff[dff[cols["ORGAO"]].isin(orgaos)]
+
+    por_orgao = dff[cols["ORGAO"]].value_counts().head(15) if "ORGAO" in cols else pd.Series(dtype=int)
+    por_mes = (
+        dff.groupby(pd.to_datetime(dff[col_data], errors="coerce").dt.strftime("%Y-%m")).size()
+        if col_data else pd.Series(dtype=int)
+    )
+    return len(dff), por_orgao, por_mes
+
+
+def card_grafico(titulo, fig):
+    return dbc.Card([
+        dbc.CardHeader(html.H5(titulo, className="m-0")),
+        dbc.CardBody(dcc.Graph(figure=fig, config={"displayModeBar": False}), style={"padding": "10px"})
+    ], className="shadow-sm border-0")
+
+
+# --- CALLBACK PARA CONTEÚDO RESPONSIVO ---
 @callback(
-    Output("conteudo-principal-nlp", "children"),
+    Output("container-busca-nlp", "style"),
     Input("abas-nlp", "active_tab")
 )
-def render_content(tab):
-    mapa_imagens = {
-        "tab-nuvem": (IMG_WORDCLOUD, "Nuvem de Assuntos Gerais"),
-        "tab-nuvem-topicos": (IMG_WORDCLOUD_TOPICOS, "Nuvem de Tópicos Semânticos (LDA)"),
-        "tab-pareto": (IMG_PARETO, "Diagrama de Pareto (Visão 100%)")
-    }
-
-    if tab in mapa_imagens:
-        caminho_img, titulo = mapa_imagens[tab]
-        
-        return dbc.Card([
-            dbc.CardHeader(html.H5(titulo, className="m-0")),
-            dbc.CardBody(style={
-                "padding": "10px", 
-                "display": "flex", 
-                "justifyContent": "center"
-            }, children=[
-                html.Img(
-                    src=caminho_img, 
-                    style={
-                        # O segredo está aqui:
-                        "width": "100%",          # Força a largura a caber no card
-                        "maxWidth": "850px",      # Impede que fique gigante em telas largas
-                        "height": "auto",         # Mantém a proporção
-                        "maxHeight": "60vh",      # Limita a altura para não cobrir o menu
-                        "objectFit": "contain",   # Garante que a imagem inteira apareça
-                        "borderRadius": "5px"
-                    }
-                ) if os.path.exists(caminho_img) else 
-                html.Div("⚠️ Arquivo não encontrado.", className="alert alert-warning")
-            ])
-        ], className="shadow-sm border-0")
-
-    elif tab == "tab-topicos":
+def mostrar_busca(tab):
+    estilo = {"padding": "0 25px 10px 25px", "flexShrink": "0"}
+    return estilo if tab == "tab-busca" else {**estilo, "display": "none"}
+
+
+@callback(
+    Output("conteudo-principal-nlp", "children"),
+    [Input("abas-nlp", "active_tab"),
+     Input("nlp-ano", "value"),
+     Input("nlp-uf", "value"),
+     Input("nlp-orgao", "value"),
+     Input("nlp-busca", "value")]
+)
+def render_content(tab, anos, ufs, orgaos, busca):
+    if tab == "tab-busca":
+        if not busca:
+            return html.Div("Digite um termo ou uma frase entre aspas para buscar nas manifestações.", className="alert alert-light")
+
+        resultado = contagem_busca(busca, anos, ufs, orgaos)
+        if resultado is None:
+            return html.Div("⚠️ Índice de busca não encontrado ou desatualizado. Execute o etl_indice.py.", className="alert alert-warning")
+
+        total, por_orgao, por_mes = resultado
+        if total == 0:
+            return html.Div(f"Nenhuma manifestação encontrada para: {busca}", className="alert alert-light")
+
+        df_org = por_orgao.sort_values().reset_index()
+        df_org.columns = ["Orgao", "Qtd"]
+        fig_org = px.bar(df_org, x="Qtd", y="Orgao", orientation="h", text="Qtd", color_discrete_sequence=["#9370DB"])
+        fig_org.update_layout(LAYOUT_CLEAN, height=450, yaxis=dict(automargin=True, title=None))
+
+        df_mes = por_mes.reset_index()
+        df_mes.columns = ["Mes", "Qtd"]
+        fig_mes = px.line(df_mes, x="Mes", y="Qtd", markers=True)
+        fig_mes.update_traces(line_color="#6A0DAD", line_width=3)
+        fig_mes.update_layout(LAYOUT_CLEAN, height=450, xaxis_title=None)
+
+        return html.Div([
+            html.H5(f"{total:,} manifestações citam: {busca}".replace(",", "."), className="fw-bold text-primary mb-3"),
+            dbc.Row([
+                dbc.Col(card_grafico("Por Órgão (Top 15)", fig_org), md=6),
+                dbc.Col(card_grafico("Por Mês", fig_mes), md=6),
+            ], className="g-3")
+        ])
+
+    if tab in ("tab-pareto", "tab-treemap"):
+        if df_termos.empty:
+            return html.Div("⚠️ Frequência de termos não encontrada. Execute o etl_nlp.py.", className="alert alert-warning mt-3")
+
+        freq = filtrar_termos(anos, ufs, orgaos)
+        if freq.empty:
+            return html.Div("Nenhum termo para os filtros selecionados.", className="alert alert-light mt-3")
+
+        if tab == "tab-pareto":
+            return card_grafico("Diagrama de Pareto (Visão 100%)", grafico_pareto(freq))
+
+        fig = px.treemap(
+            freq.head(60), path=[px.Constant("Termos"), "Termo"], values="Frequencia",
+            color="Frequencia", color_continuous_scale="Purples"
+        )
+        fig.update_layout(LAYOUT_CLEAN, height=600, coloraxis_showscale=False)
+        return card_grafico("Mapa de Termos (Top 60)", fig)
+
+    elif tab in ("tab-treemap-topicos", "tab-topicos"):
         if not os.path.exists(ARQUIVO_TOPICOS):
             return html.Div("⚠️ Dados de tópicos não encontrados.", className="text-danger mt-3")
-        
+
         try:
             df = pd.read_parquet(ARQUIVO_TOPICOS)
-            return dbc.Row([
-                dbc.Col(
-                    dbc.Card([
-                        dbc.CardBody([
-                            html.H5(f"Tópico #{row['topico']}", className="card-title text-primary fw-bold"),
-                            html.P(row['palavras'], className="card-text", style={"fontSize": "0.9rem"}),
-                            dbc.Progress(value=row['peso'], max=df['peso'].max(), color="info", style={"height": "4px"}),
-                            html.Small(f"Peso Total: {row['peso']}", className="text-muted")
-                        ])
-                    ], className="mb-3 shadow-sm border-0"), 
-                    xs=12, md=6, lg=4
-                ) for _, row in df.iterrows()
-            ], className="mt-3")
         except Exception as e:
-            return html.Div(f"Erro ao processar tópicos: {e}", className="text-danger")
\ No newline at end of file
+            return html.Div(f"Erro ao processar tópicos: {e}", className="text-danger")
+
+        if tab == "tab-treemap-topicos":
+            # Distribui o peso de cada tópico entre os seus termos
+            pesos = df.assign(Termo=df["palavras"].str.split(",")).explode("Termo")
+            pesos["Termo"] = pesos["Termo"].str.strip()
+            pesos["Peso"] = pesos["peso"] / pesos.groupby("topico")["Termo"].transform("size")
+            pesos["Topico"] = "Tópico #" + pesos["topico"].astype(str)
+
+            fig = px.treemap(
+                pesos, path=[px.Constant("Tópicos"), "Topico", "Termo"], values="Peso",
+                color="Peso", color_continuous_scale="Purples"
+            )
+            fig.update_layout(LAYOUT_CLEAN, height=600, coloraxis_showscale=False)
+            return card_grafico("Mapa de Tópicos Semânticos (LDA)", fig)
+
+        return dbc.Row([
+            dbc.Col(
+                dbc.Card([
+                    dbc.CardBody([
+                        html.H5(f"Tópico #{row['topico']}", className="card-title text-primary fw-bold"),
+                        html.P(row['palavras'], className="card-text", style={"fontSize": "0.9rem"}),
+                        dbc.Progress(value=row['peso'], max=df['peso'].max(), color="info", style={"height": "4px"}),
+                        html.Small(f"Peso Total: {row['peso']}", className="text-muted")
+                    ])
+                ], className="mb-3 shadow-sm border-0"),
+                xs=12, md=6, lg=4
+            ) for _, row in df.iterrows()
+        ], className="mt-3")
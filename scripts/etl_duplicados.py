@@ -0,0 +1,152 @@
+import pandas as pd
+import numpy as np
+import os
+import sys
+import time
+import zlib
+import pyarrow.parquet as pq
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+# Permite rodar como "python scripts/etl_duplicados.py" a partir da raiz do projeto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.texto import COLUNAS_TEXTO_LIVRE, limpar_serie
+
+# Caminhos
+ARQUIVO_DADOS = "data/processed/ouvidoria.parquet"
+ARQUIVO_DUPLICADOS = "data/processed/duplicados.parquet"
+# Só campos de texto livre (COLUNAS_TEXTO_LIVRE). ASSUNTO/SERVICO são rótulos de
+# categoria: todos os registros do mesmo par de rótulos viravam um "cluster".
+
+# --- PARÂMETROS DO MINHASH / LSH ---
+# 16 bandas x 8 linhas: pares com Jaccard ~0.7+ caem no mesmo balde com alta probabilidade
+NUM_BANDAS = 16
+LINHAS_POR_BANDA = 8
+NUM_PERMUTACOES = NUM_BANDAS * LINHAS_POR_BANDA
+TAM_SHINGLE = 5          # n-gramas de caracteres
+LIMIAR_SIMILARIDADE = 0.8  # Jaccard estimado mínimo para confirmar o par candidato
+PRIMO = np.uint64((1 << 31) - 1)
+
+
+def shingles(texto, k=TAM_SHINGLE):
+    """Hashes (crc32) dos n-gramas de caracteres do texto."""
+    if len(texto) <= k:
+        return np.array([zlib.crc32(texto.encode())], dtype=np.uint64)
+    return np.fromiter(
+        (zlib.crc32(texto[i:i + k].encode()) for i in range(len(texto) - k + 1)),
+        dtype=np.uint64,
+    )
+
+
+def assinaturas_minhash(textos, seed=42):
+    """Matriz (n_textos x NUM_PERMUTACOES) de assinaturas MinHash."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, int(PRIMO), NUM_PERMUTACOES, dtype=np.uint64)
+    b = rng.integers(0, int(PRIMO), NUM_PERMUTACOES, dtype=np.uint64)
+
+    assinaturas = np.empty((len(textos), NUM_PERMUTACOES), dtype=np.uint32)
+    for i, texto in enumerate(textos):
+        h = shingles(texto) % PRIMO
+        # (a*h + b) mod p para todas as permutações de uma vez (cabe em uint64)
+        assinaturas[i] = ((a[:, None] * h[None, :] + b[:, None]) % PRIMO).min(axis=1)
+    return assinaturas
+
+
+def agrupar_lsh(assinaturas):
+    """
+    Agrupa textos que colidem em alguma banda (LSH) e confirma pela similaridade
+    estimada das assinaturas. Retorna o id de cluster de cada texto.
+    """
+    n = len(assinaturas)
+    origens, destinos = [], []
+
+    for banda in range(NUM_BANDAS):
+        fatia = assinaturas[:, banda * LINHAS_POR_BANDA:(banda + 1) * LINHAS_POR_BANDA].astype(np.uint64)
+        # Chave do balde: combinação polinomial das linhas da banda (overflow de uint64 é proposital)
+        chaves = np.zeros(n, dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for col in fatia.T:
+                chaves = chaves * np.uint64(1000003) + col
+
+        # Liga cada texto ao primeiro texto do seu balde (sem comparar todos os pares)
+        ordem = np.argsort(chaves, kind="stable")
+        chaves_ord = chaves[ordem]
+        inicio_balde = np.r_[True, chaves_ord[1:] != chaves_ord[:-1]]
+        representante = ordem[np.maximum.accumulate(np.where(inicio_balde, np.arange(n), 0))]
+
+        candidatos = representante != ordem
+        origens.append(ordem[candidatos])
+        destinos.append(representante[candidatos])
+
+    origens = np.concatenate(origens) if origens else np.empty(0, dtype=np.int64)
+    destinos = np.concatenate(destinos) if destinos else np.empty(0, dtype=np.int64)
+
+    # Confirma os pares candidatos (fração de permutações iguais ~ Jaccard)
+    if len(origens):
+        similaridade = (assinaturas[origens] == assinaturas[destinos]).mean(axis=1)
+        confirmados = similaridade >= LIMIAR_SIMILARIDADE
+        origens, destinos = origens[confirmados], destinos[confirmados]
+
+    grafo = coo_matrix((np.ones(len(origens), dtype=np.int8), (origens, destinos)), shape=(n, n))
+    _, rotulos = connected_components(grafo, directed=False)
+    return rotulos
+
+
+def rodar_duplicados():
+    print("🧬 [DUPLICADOS] Detectando manifestações quase idênticas (MinHash LSH)...")
+
+    if not os.path.exists(ARQUIVO_DADOS):
+        print(f"❌ Arquivo {ARQUIVO_DADOS} não encontrado.")
+        return
+
+    colunas = [c for c in pq.read_schema(ARQUIVO_DADOS).names if str(c).upper() in COLUNAS_TEXTO_LIVRE]
+    if not colunas:
+        # Sem texto livre não há como falar em manifestações quase idênticas; um arquivo
+        # antigo (gerado sobre os rótulos) faria o painel mostrar clusters falsos
+        if os.path.exists(ARQUIVO_DUPLICADOS):
+            os.remove(ARQUIVO_DUPLICADOS)
+        print(f"⚠️ Nenhum campo de texto livre ({', '.join(COLUNAS_TEXTO_LIVRE)}) na base. "
+              "O painel mostra os picos de assunto por órgão no lugar das campanhas.")
+        return
+
+    inicio = time.time()
+    df = pd.read_parquet(ARQUIVO_DADOS, columns=colunas)
+
+    # 1. Texto livre de cada registro; registros iguais viram um único texto distinto
+    texto = df[colunas[0]].fillna("").astype(str)
+    for c in colunas[1:]:
+        texto = texto + " " + df[c].fillna("").astype(str)
+    codigos, distintos = pd.factorize(texto)
+
+    # 2. Limpeza (mesma do NLP) apenas nos textos distintos
+    limpos = limpar_serie(pd.Series(distintos)).astype(str)
+    validos = (limpos.str.len() > 0).to_numpy()
+    print(f"   -> {len(df):,} registros, {len(distintos):,} textos distintos.")
+
+    # 3. Assinaturas + LSH
+    assinaturas = assinaturas_minhash(limpos[validos].tolist())
+    rotulos_validos = agrupar_lsh(assinaturas)
+
+    rotulos = np.full(len(distintos), -1, dtype=np.int64)
+    rotulos[validos] = rotulos_validos
+
+    # 4. Mapeia de volta para cada registro e conta o tamanho dos clusters
+    cluster = rotulos[codigos]
+    cluster[codigos < 0] = -1
+    tamanhos = np.bincount(cluster[cluster >= 0], minlength=rotulos.max() + 1 if len(rotulos) else 0)
+    tamanho = np.where(cluster >= 0, tamanhos[np.maximum(cluster, 0)], 0)
+
+    df_dup = pd.DataFrame({
+        "CLUSTER_ID": cluster.astype("int32"),
+        "CLUSTER_TAM": tamanho.astype("int32"),
+    })
+    os.makedirs(os.path.dirname(ARQUIVO_DUPLICADOS), exist_ok=True)
+    df_dup.to_parquet(ARQUIVO_DUPLICADOS, index=False)
+
+    n_clusters = int((tamanhos > 1).sum())
+    print(f"   -> {n_clusters:,} clusters com mais de um registro ({round(time.time() - inicio, 2)}s).")
+    print(f"🏁 [DUPLICADOS] Salvo em {ARQUIVO_DUPLICADOS}")
+
+
+if __name__ == "__main__":
+    rodar_duplicados()
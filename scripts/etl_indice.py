@@ -0,0 +1,77 @@
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import os
+import sys
+
+# Permite rodar como "python scripts/etl_indice.py" a partir da raiz do projeto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.busca import ARQUIVO_INDICE, termos_indexaveis
+from utils.texto import PADRAO_TOKEN, normalizar_serie
+
+# CONFIGURAÇÃO
+ARQUIVO_DADOS = "data/processed/ouvidoria.parquet"
+COLUNAS_TEXTO = ["ASSUNTO", "SERVICO", "RESULTADO"]
+
+
+def rodar_indice():
+    print("🔎 [ÍNDICE] Construindo índice invertido de textos...")
+
+    if not os.path.exists(ARQUIVO_DADOS):
+        print(f"❌ Arquivo {ARQUIVO_DADOS} não encontrado.")
+        return
+
+    colunas = [c for c in pq.read_schema(ARQUIVO_DADOS).names if c.upper() in COLUNAS_TEXTO]
+    if not colunas:
+        print(f"❌ Nenhuma coluna de texto ({COLUNAS_TEXTO}) encontrada.")
+        return
+
+    df = pd.read_parquet(ARQUIVO_DADOS, columns=colunas)
+    n_linhas = len(df)
+
+    postings = {}
+    for col in colunas:
+        print(f"   -> Indexando {col}...", end="")
+        cat = df[col].astype("category")
+        codigos = cat.cat.codes.to_numpy()
+
+        # Agrupa as linhas por valor distinto (cada texto é tokenizado uma única vez)
+        ordem = np.argsort(codigos, kind="stable")
+        limites = np.searchsorted(codigos[ordem], np.arange(len(cat.cat.categories) + 1))
+
+        tokens_por_texto = normalizar_serie(pd.Series(cat.cat.categories)).astype(str).str.findall(PADRAO_TOKEN)
+
+        for k, tokens in enumerate(tokens_por_texto):
+            linhas = ordem[limites[k]:limites[k + 1]]
+            if linhas.size == 0: continue
+            for termo in termos_indexaveis(tokens):
+                postings.setdefault(termo, []).append(linhas)
+        print(f" ✅ {len(cat.cat.categories):,} textos distintos")
+
+    # Lista ordenada de linhas -> deltas (ids pequenos comprimem muito melhor)
+    termos = sorted(postings)
+    listas = []
+    for t in termos:
+        linhas = np.unique(np.concatenate(postings[t]))
+        listas.append(np.diff(linhas, prepend=0).astype(np.uint32))
+
+    tamanhos = np.array([len(l) for l in listas], dtype=np.int32)
+    offsets = np.concatenate([[0], np.cumsum(tamanhos)]).astype(np.int32)
+    valores = np.concatenate(listas) if listas else np.empty(0, dtype=np.uint32)
+
+    tabela = pa.table({
+        "TERMO": pa.array(termos, type=pa.string()),
+        "N_LINHAS": pa.array(tamanhos),
+        "POSTINGS": pa.ListArray.from_arrays(pa.array(offsets), pa.array(valores, type=pa.uint32())),
+    }).replace_schema_metadata({"n_linhas": str(n_linhas), "colunas": ",".join(colunas)})
+
+    os.makedirs(os.path.dirname(ARQUIVO_INDICE), exist_ok=True)
+    pq.write_table(tabela, ARQUIVO_INDICE, compression="zstd")
+
+    tamanho_mb = os.path.getsize(ARQUIVO_INDICE) / (1024 * 1024)
+    print(f"🏁 [ÍNDICE] {len(termos):,} termos sobre {n_linhas:,} linhas ({tamanho_mb:.1f} MB).")
+
+
+if __name__ == "__main__":
+    rodar_indice()
@@ -1,58 +1,74 @@
 import pandas as pd
 import os
-from wordcloud import WordCloud
+import sys
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.decomposition import LatentDirichletAllocation
-import re
+
+# Permite rodar como "python scripts/etl_nlp.py" a partir da raiz do projeto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.recursos_nlp import carregar_stopwords, carregar_vocabulario
+from utils.texto import limpar_serie
 
 # Caminhos
 ARQUIVO_DADOS = "data/processed/ouvidoria.parquet"
-IMG_WORDCLOUD = "assets/wordcloud_assuntos.png"
 ARQUIVO_TOPICOS = "data/processed/topicos_nlp.parquet"
+ARQUIVO_FREQ_TERMOS = "data/processed/termos_freq.parquet"
+
 
+# Parâmetros do vetorizador do LDA (também usados para ajustar o vocabulário do pacote)
+PARAMS_LDA = dict(
+    max_features=1000,
+    ngram_range=(1, 2),  # <--- Isso faz o LDA entender "Assédio Moral" como um termo único
+    max_df=0.8,  # Ignora palavras que aparecem em mais de 80% dos textos (muito comuns)
+    min_df=105,
+)
 
-# --- 1. EXPANSÃO DA LISTA DE RUÍDOS (STOPWORDS) ---
-# Adicionamos palavras que dominam a nuvem mas não informam nada útil
-STOPWORDS_PERSONALIZADAS = [
-    "nao",
-    "informado",
-    "servico",
-    "servicos",
-    "assunto",
-    "outros",
-    "geral",
-    "sobre",
-    "portal",
-    "outras",
-    "informada",
-    "brasil",
-    "sistema",
-    "federal",
-    "unidade",
-    "brasileira",
-    "beneficios",
-    "sociais",
-    "programa",
-    "programas",
-    "governo",
-    "nacional",
-    "partir",
-    "referente",
-    "area",
-    "municipio",
-    "informacao",
-]
-
-
-def limpar_texto(texto):
-    if not texto:
-        return ""
-    texto = str(texto).lower()
-    # Remove "não informado" e variações antes de remover pontuação
-    texto = re.sub(r"não informado|nao informado|n/a|vazio", "", texto)
-    # Remove caracteres especiais
-    texto = re.sub(r"[^\w\s]", "", texto)
-    return texto.strip()
+
+def preparar_textos(df, coluna_assunto, limite=50000):
+    """Últimos `limite` assuntos limpos e não vazios (entrada do LDA)."""
+    textos = limpar_serie(df[coluna_assunto].tail(limite).dropna()).astype(str)
+    # Remove strings vazias que sobraram após a limpeza
+    return textos[textos != ""]
+
+
+def gerar_frequencia_termos(df, coluna_assunto, stopwords, tamanho_min=4):
+    """
+    Tabela esparsa de frequência de termos por ANO-MÊS x UF x ÓRGÃO.
+    Cada assunto distinto é tokenizado uma única vez e o resultado é
+    multiplicado pela quantidade de manifestações de cada combinação.
+    """
+    colunas = {str(c).upper(): c for c in df.columns}
+    col_data = colunas.get("DATA")
+    col_uf = colunas.get("UF")
+    col_orgao = colunas.get("ORGAO")
+
+    base = pd.DataFrame({
+        "MES": pd.to_datetime(df[col_data], errors="coerce").dt.strftime("%Y-%m") if col_data else "NI",
+        "UF": df[col_uf].astype(str) if col_uf else "NI",
+        "ORGAO": df[col_orgao].astype(str) if col_orgao else "NI",
+        "ASSUNTO": df[coluna_assunto].astype(str),
+    })
+    base["MES"] = base["MES"].fillna("NI")
+
+    # 1. Conta manifestações por combinação (bem menor que a base)
+    grupos = base.groupby(["MES", "UF", "ORGAO", "ASSUNTO"], observed=True).size().reset_index(name="QTD")
+
+    # 2. Tokeniza apenas os assuntos distintos
+    stopwords = set(stopwords)
+    assuntos = pd.Series(grupos["ASSUNTO"].unique())
+    termos = limpar_serie(assuntos).astype(str).str.split().explode().dropna()
+    termos = termos[(termos.str.len() >= tamanho_min) & (~termos.isin(stopwords))]
+    mapa_termos = pd.DataFrame({"ASSUNTO": assuntos.loc[termos.index].values, "TERMO": termos.values})
+
+    # 3. Distribui as contagens para os termos (só combinações não nulas)
+    freq = grupos.merge(mapa_termos, on="ASSUNTO", how="inner")
+    freq = freq.groupby(["MES", "UF", "ORGAO", "TERMO"], observed=True)["QTD"].sum().reset_index()
+    freq["ANO"] = freq["MES"].str[:4]
+    freq["QTD"] = freq["QTD"].astype("int32")
+
+    for col in ["ANO", "MES", "UF", "ORGAO", "TERMO"]:
+        freq[col] = freq[col].astype("category")
+    return freq[["ANO", "MES", "UF", "ORGAO", "TERMO", "QTD"]]
 
 
 def rodar_nlp():
@@ -76,56 +92,34 @@ def rodar_nlp():
     # Removemos linhas que são apenas "não informado" antes mesmo de limpar
     df = df[df[coluna_assunto].str.lower() != "não informado"].copy()
 
-    df = df.tail(50000).copy()
+    # Stopwords (NLTK + personalizadas + domínio) do pacote local, sem download
+    stopwords_pt = carregar_stopwords()
+
+    # 2. Frequência de Termos (substitui a nuvem de palavras estática)
+    print("   -> Calculando frequência de termos por Mês x UF x Órgão...")
+    df_freq = gerar_frequencia_termos(df, coluna_assunto, stopwords_pt)
+    os.makedirs(os.path.dirname(ARQUIVO_FREQ_TERMOS), exist_ok=True)
+    df_freq.to_parquet(ARQUIVO_FREQ_TERMOS, index=False, compression="zstd")
+    print(f"      ✅ {len(df_freq):,} combinações salvas em {ARQUIVO_FREQ_TERMOS}")
 
     print("   -> Limpando textos e removendo ruídos...")
-    textos = df[coluna_assunto].dropna().apply(limpar_texto)
-    # Remove strings vazias que sobraram após a limpeza
-    textos = textos[textos != ""]
-
-    # 2. Gerar WordCloud
-    print("   -> Gerando Nuvem de Palavras...")
-
-    # Unificamos as stopwords básicas com as nossas personalizadas
-    from nltk.corpus import stopwords
-    import nltk
-
-    nltk.download("stopwords", quiet=True)
-    stopwords_pt = stopwords.words("portuguese")
-    # Removemos acentos das stopwords para bater com o regex do limpar_texto
-    stopwords_pt = [re.sub(r"[^\w\s]", "", s) for s in stopwords_pt]
-    stopwords_pt.extend(STOPWORDS_PERSONALIZADAS)
-
-    texto_completo = " ".join(textos)
-
-    # A WordCloud precisa receber as stopwords para não mostrar "e", "do", "da"
-    wc = WordCloud(
-        width=1200,
-        height=600,
-        background_color="white",
-        colormap="viridis",
-        stopwords=set(stopwords_pt),
-        # --- ADICIONE/AJUSTE ESTES DOIS ---
-        collocations=True,  # Permite que o WordCloud agrupe pares como "Assédio Moral"
-        min_word_length=4,  # Ignora palavras muito curtas que sobraram
-        max_words=150,  # Limita para focar no que realmente importa
-    ).generate(texto_completo)
-
-    wc.to_file(IMG_WORDCLOUD)
-    print(f"      ✅ Salva em {IMG_WORDCLOUD}")
+    textos = preparar_textos(df, coluna_assunto)
 
     # 3. Modelagem de Tópicos (LDA)
     print("   -> Identificando Tópicos (LDA)...")
 
-    # O CountVectorizer também precisa das stopwords para o LDA ficar limpo
-    vectorizer = CountVectorizer(
-        stop_words=stopwords_pt,
-        max_features=1000,
-        ngram_range=(1, 2),  # <--- Isso faz o LDA entender "Assédio Moral" como um termo único
-        max_df=0.8,  # Ignora palavras que aparecem em mais de 80% dos textos (muito comuns)
-        min_df=105,
-    )
-    dtm = vectorizer.fit_transform(textos)
+    # Com vocabulário pré-ajustado no pacote evitamos a passada de fit do vetorizador
+    vocabulario = carregar_vocabulario()
+    if vocabulario:
+        # Mesmas stopwords do ajuste: os bigramas do vocabulário foram formados sem elas
+        vectorizer = CountVectorizer(
+            vocabulary=vocabulario, stop_words=sorted(stopwords_pt), ngram_range=PARAMS_LDA["ngram_range"]
+        )
+        dtm = vectorizer.transform(textos)
+    else:
+        # O CountVectorizer também precisa das stopwords para o LDA ficar limpo
+        vectorizer = CountVectorizer(stop_words=sorted(stopwords_pt), **PARAMS_LDA)
+        dtm = vectorizer.fit_transform(textos)
 
     lda = LatentDirichletAllocation(n_components=5, random_state=42)
     lda.fit(dtm)
@@ -1,17 +1,17 @@
 import pandas as pd
 import glob
 import os
-import unicodedata
+import sys
 import traceback
 
+# Permite rodar como "python scripts/etl_ouvidoria.py" a partir da raiz do projeto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.texto import COLUNAS_TEXTO_LIVRE, normalizar
+
 # CONFIGURAÇÃO
 PASTA_RAW = "data/raw/**"
 ARQUIVO_SAIDA = "data/processed/ouvidoria.parquet"
 
-def normalizar(texto):
-    if not isinstance(texto, str): return str(texto)
-    return "".join([c for c in unicodedata.normalize('NFKD', texto) if not unicodedata.combining(c)]).lower().strip()
-
 def rodar_ouvidoria():
     print("🚀 [OUVIDORIA] Iniciando processamento BLINDADO...")
     
@@ -24,7 +24,8 @@ def rodar_ouvidoria():
             print(f"   ⚠️ Não foi possível remover o arquivo antigo (pode estar aberto): {e}")
             print("   ⚠️ Tente apagar manualmente o arquivo 'data/processed/ouvidoria.parquet' se der erro.")
 
-    arquivos = glob.glob(os.path.join(PASTA_RAW, "*.csv"), recursive=True)
+    # Ordem estável entre execuções (o glob não garante nenhuma)
+    arquivos = sorted(glob.glob(os.path.join(PASTA_RAW, "*.csv"), recursive=True))
     total_processado = 0
 
     for f in arquivos:
@@ -62,6 +63,12 @@ def rodar_ouvidoria():
                     elif c_norm == 'dias para resolucao': mapa_renomear[c_orig] = 'DIAS_RESOLUCAO'
                     elif c_norm == 'dias de atraso': mapa_renomear[c_orig] = 'DIAS_ATRASO'
                     elif c_norm == 'situacao': mapa_renomear[c_orig] = 'SITUACAO'
+                    # Texto livre (usado pelo etl_duplicados para achar campanhas)
+                    elif c_norm == 'texto': mapa_renomear[c_orig] = 'TEXTO'
+                    elif c_norm in ('texto manifestacao', 'texto da manifestacao'): mapa_renomear[c_orig] = 'TEXTO_MANIFESTACAO'
+                    elif c_norm in ('teor', 'teor da manifestacao'): mapa_renomear[c_orig] = 'TEOR'
+                    elif c_norm == 'descricao': mapa_renomear[c_orig] = 'DESCRICAO'
+                    elif c_norm == 'resumo': mapa_renomear[c_orig] = 'RESUMO'
 
                 df = df.rename(columns=mapa_renomear)
                 
@@ -69,7 +76,7 @@ def rodar_ouvidoria():
                 cols_desejadas = [
                     'DATA', 'UF', 'MUNICIPIO', 'ORGAO', 'ASSUNTO', 'TIPO', 'SERVICO',
                     'SATISFACAO', 'GENERO', 'RACA', 'FAIXA_ETARIA', 
-                    'DIAS_RESOLUCAO', 'DIAS_ATRASO', 'SITUACAO'
+                    'DIAS_RESOLUCAO', 'DIAS_ATRASO', 'SITUACAO', *COLUNAS_TEXTO_LIVRE
                 ]
                 
                 cols_finais = [c for c in cols_desejadas if c in df.columns]
@@ -84,7 +91,8 @@ def rodar_ouvidoria():
                 # --- CORREÇÃO DO ERRO DE TIPO (FORÇA TEXTO) ---
                 # Força todas as colunas de texto a serem string (mesmo que estejam vazias/NaN)
                 cols_texto = ['UF', 'MUNICIPIO', 'ORGAO', 'ASSUNTO', 'TIPO', 'SERVICO', 
-                              'SATISFACAO', 'GENERO', 'RACA', 'FAIXA_ETARIA', 'SITUACAO', 'RESULTADO']
+                              'SATISFACAO', 'GENERO', 'RACA', 'FAIXA_ETARIA', 'SITUACAO', 'RESULTADO',
+                              *COLUNAS_TEXTO_LIVRE]
                 
                 for col in cols_texto:
                     if col in df.columns:
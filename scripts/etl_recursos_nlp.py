@@ -0,0 +1,136 @@
+import pandas as pd
+import json
+import os
+import sys
+from datetime import date
+from sklearn.feature_extraction.text import CountVectorizer
+
+# Permite rodar como "python scripts/etl_recursos_nlp.py" a partir da raiz do projeto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.recursos_nlp import ARQUIVO_RECURSOS, VERSAO_RECURSOS
+from utils.texto import normalizar
+
+# Caminhos
+ARQUIVO_DADOS = "data/processed/ouvidoria.parquet"
+
+
+# --- 1. RUÍDOS GENÉRICOS DA OUVIDORIA (antes em etl_nlp.py) ---
+# Palavras que dominam a nuvem mas não informam nada útil
+STOPWORDS_PERSONALIZADAS = [
+    "nao", "informado", "servico", "servicos", "assunto", "outros", "geral",
+    "sobre", "portal", "outras", "informada", "brasil", "sistema", "federal",
+    "unidade", "brasileira", "beneficios", "sociais", "programa", "programas",
+    "governo", "nacional", "partir", "referente", "area", "municipio", "informacao",
+]
+
+# --- 2. STOPWORDS DE DOMÍNIO (antes em llm_lai.py) ---
+STOPWORDS_DOMINIO = [
+    # termos administrativos
+    "informacao", "informacoes", "servico", "servicos", "publico", "publica",
+    "programa", "programas", "administracao", "gestao", "sistema", "sistemas",
+    "acesso", "cadastro", "processo", "processos",
+    # termos de ouvidoria
+    "manifestacao", "solicitacao", "solicitacoes", "pedido", "pedidos", "demanda",
+    "encaminhamento", "encaminhar", "informar", "resposta", "retorno", "atendimento",
+    # pessoas
+    "usuario", "usuarios", "cidadao", "cidadaos", "senhor", "senhora",
+    # estrutura institucional
+    "orgao", "setor", "departamento", "unidade",
+    # burocracia
+    "registro", "protocolo", "documento", "documentos",
+    # verbos genéricos
+    "realizar", "fazer", "existir", "possuir",
+    # genéricos
+    "geral", "outro", "outra", "outros", "outras",
+    # geografia
+    "municipio", "nacional", "federal", "brasil", "brasileiro",
+    # ruídos de campos vazios
+    "informado", "nformado", "nao_informado",
+    # meta-palavras
+    "assunto", "area", "tipo", "sobre",
+    # se forem muito genéricos no seu contexto
+    "meir", "metrologia",
+    # ruídos de arquivos
+    "doc", "pdf", "anexo",
+]
+
+
+def limpar_lista(palavras):
+    """Minúsculas, sem espaços e nas duas formas (com e sem acento)."""
+    limpas = set()
+    for p in palavras:
+        p = str(p).lower().strip()
+        if p:
+            limpas.update({p, normalizar(p)})
+    return sorted(limpas)
+
+
+def ler_pacote_atual():
+    if not os.path.exists(ARQUIVO_RECURSOS): return {}
+    with open(ARQUIVO_RECURSOS, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def stopwords_nltk(pacote_atual):
+    """
+    Usa o corpus do NLTK se já estiver instalado localmente (sem download);
+    caso contrário mantém a lista do pacote atual.
+    """
+    try:
+        from nltk.corpus import stopwords
+        return stopwords.words("portuguese")
+    except (ImportError, LookupError):
+        anterior = pacote_atual.get("stopwords", {}).get("nltk")
+        if not anterior:
+            raise RuntimeError("Corpus 'stopwords' do NLTK indisponível e não há pacote anterior para reaproveitar.")
+        print("   ⚠️ Corpus do NLTK não instalado: mantendo a lista do pacote atual.")
+        return anterior
+
+
+def ajustar_vocabulario(stopwords, pacote_atual):
+    """Ajusta o vocabulário do LDA sobre a base atual (ou mantém o anterior se não houver base)."""
+    if not os.path.exists(ARQUIVO_DADOS):
+        print(f"   ⚠️ {ARQUIVO_DADOS} não encontrado: mantendo o vocabulário do pacote atual.")
+        return pacote_atual.get("vocabulario", [])
+
+    from etl_nlp import PARAMS_LDA, preparar_textos
+
+    df = pd.read_parquet(ARQUIVO_DADOS)
+    coluna_assunto = "assunto" if "assunto" in df.columns else "ASSUNTO"
+    df = df[df[coluna_assunto].str.lower() != "não informado"]
+    textos = preparar_textos(df, coluna_assunto)
+
+    vectorizer = CountVectorizer(stop_words=sorted(stopwords), **PARAMS_LDA)
+    vectorizer.fit(textos)
+    return vectorizer.get_feature_names_out().tolist()
+
+
+def rodar_recursos():
+    print("📦 [RECURSOS NLP] Gerando pacote de stopwords e vocabulário...")
+    pacote_atual = ler_pacote_atual()
+
+    stopwords = {
+        "nltk": limpar_lista(stopwords_nltk(pacote_atual)),
+        "personalizadas": limpar_lista(STOPWORDS_PERSONALIZADAS),
+        "dominio": limpar_lista(STOPWORDS_DOMINIO),
+    }
+    todas = set().union(*stopwords.values())
+    print(f"   -> {len(todas)} stopwords distintas.")
+
+    vocabulario = ajustar_vocabulario(todas, pacote_atual)
+    print(f"   -> Vocabulário com {len(vocabulario)} termos.")
+
+    pacote = {
+        "versao": VERSAO_RECURSOS,
+        "gerado_em": date.today().isoformat(),
+        "stopwords": stopwords,
+        "vocabulario": vocabulario,
+    }
+    os.makedirs(os.path.dirname(ARQUIVO_RECURSOS), exist_ok=True)
+    with open(ARQUIVO_RECURSOS, "w", encoding="utf-8") as f:
+        json.dump(pacote, f, ensure_ascii=False, indent=1)
+    print(f"🏁 [RECURSOS NLP] Pacote salvo em {ARQUIVO_RECURSOS}")
+
+
+if __name__ == "__main__":
+    rodar_recursos()
@@ -0,0 +1,102 @@
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import os
+import sys
+import time
+import copy
+from joblib import Parallel, delayed, effective_n_jobs
+
+# Permite rodar como "python scripts/etl_risco.py" a partir da raiz do projeto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.modelos import obter_modelo
+
+# Caminhos
+ARQUIVO_DADOS = "data/processed/ouvidoria.parquet"
+ARQUIVO_RISCO = "data/processed/risco.parquet"
+
+# Linhas lidas por vez do parquet (memória constante mesmo com a base inteira)
+TAMANHO_LOTE = 500_000
+# Mínimo de textos distintos por tarefa paralela (cada tarefa recebe uma cópia do modelo)
+TAMANHO_BLOCO = 2_000
+# Tarefas por processo: equilibra a carga sem reenviar o modelo a cada bloco pequeno
+BLOCOS_POR_PROCESSO = 4
+N_JOBS = -1
+
+
+def pontuar_bloco(modelo, vetorizador, textos):
+    """Probabilidade de atraso (classe 1) de um bloco de textos."""
+    return modelo.predict_proba(vetorizador.transform(textos))[:, 1]
+
+
+def pontuar_textos(modelo, vetorizador, textos, n_jobs=N_JOBS):
+    """
+    Divide os textos em blocos e pontua em processos (backend loky do joblib): a
+    vetorização e o predict_proba seguram o GIL, então threads não escalam.
+    """
+    if not textos:
+        return np.empty(0, dtype=np.float32)
+    processos = effective_n_jobs(n_jobs)
+    tamanho = max(TAMANHO_BLOCO, -(-len(textos) // (processos * BLOCOS_POR_PROCESSO)))
+    blocos = [textos[i:i + tamanho] for i in range(0, len(textos), tamanho)]
+    if len(blocos) == 1:
+        return pontuar_bloco(modelo, vetorizador, blocos[0]).astype(np.float32)
+    resultados = Parallel(n_jobs=min(processos, len(blocos)))(
+        delayed(pontuar_bloco)(modelo, vetorizador, b) for b in blocos
+    )
+    return np.concatenate(resultados).astype(np.float32)
+
+
+def rodar_risco():
+    print("🎯 [RISCO] Pontuando a base da Ouvidoria com o modelo de atraso...")
+
+    if not os.path.exists(ARQUIVO_DADOS):
+        print(f"❌ Arquivo {ARQUIVO_DADOS} não encontrado.")
+        return
+
+    artefatos = obter_modelo()
+    if artefatos is None:
+        print("❌ Modelo não encontrado. Execute scripts/train_ml.py.")
+        return
+
+    arquivo = pq.ParquetFile(ARQUIVO_DADOS)
+    coluna = next((c for c in arquivo.schema_arrow.names if c.upper() == "ASSUNTO"), None)
+    if coluna is None:
+        print("❌ Coluna ASSUNTO não encontrada.")
+        return
+
+    # O paralelismo fica nos blocos; o modelo roda single-thread (sem disputa de núcleos)
+    modelo = copy.copy(artefatos["modelo"])
+    if hasattr(modelo, "n_jobs"):
+        modelo.n_jobs = 1
+    vetorizador = artefatos["vetorizador"]
+    print(f"   -> Modelo {artefatos['versao']}, {effective_n_jobs(N_JOBS)} processos.")
+
+    inicio = time.time()
+    pontuados = {}  # assunto -> risco (cada texto distinto é pontuado uma única vez)
+    schema = pa.schema([("RISCO", pa.float16())]).with_metadata({"versao_modelo": artefatos["versao"]})
+    temporario = f"{ARQUIVO_RISCO}.tmp"
+    total = 0
+
+    with pq.ParquetWriter(temporario, schema, compression="zstd") as escritor:
+        for lote in arquivo.iter_batches(batch_size=TAMANHO_LOTE, columns=[coluna]):
+            assuntos = lote.column(0).to_pandas().fillna("").astype(str)
+            codigos, distintos = pd.factorize(assuntos)
+
+            novos = [t for t in distintos if t not in pontuados]
+            pontuados.update(zip(novos, pontuar_textos(modelo, vetorizador, novos)))
+
+            risco_distintos = np.array([pontuados[t] for t in distintos], dtype=np.float32)
+            risco = risco_distintos[codigos].astype(np.float16)
+            escritor.write_table(pa.table({"RISCO": pa.array(risco, type=pa.float16())}, schema=schema))
+
+            total += len(risco)
+            print(f"   -> {total:,} linhas ({len(pontuados):,} assuntos distintos pontuados)")
+
+    os.replace(temporario, ARQUIVO_RISCO)
+    print(f"🏁 [RISCO] {total:,} linhas em {round(time.time() - inicio, 2)}s. Salvo em {ARQUIVO_RISCO}")
+
+
+if __name__ == "__main__":
+    rodar_risco()
@@ -0,0 +1,49 @@
+import pyarrow as pa
+import pyarrow.parquet as pq
+import os
+import sys
+import time
+
+# Permite rodar como "python scripts/etl_sentimento.py" a partir da raiz do projeto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.sentimento import VERSAO_LEXICO, pontuar_serie
+
+# Caminhos
+ARQUIVO_DADOS = "data/processed/ouvidoria.parquet"
+ARQUIVO_SENTIMENTO = "data/processed/sentimento.parquet"
+
+# Linhas lidas por vez do parquet (memória constante mesmo com a base inteira)
+TAMANHO_LOTE = 500_000
+
+
+def rodar_sentimento():
+    print("🙂 [SENTIMENTO] Pontuando a satisfação de cada manifestação (léxico)...")
+
+    if not os.path.exists(ARQUIVO_DADOS):
+        print(f"❌ Arquivo {ARQUIVO_DADOS} não encontrado.")
+        return
+
+    arquivo = pq.ParquetFile(ARQUIVO_DADOS)
+    coluna = next((c for c in arquivo.schema_arrow.names if c.upper() == "ASSUNTO"), None)
+    if coluna is None:
+        print("❌ Coluna ASSUNTO não encontrada.")
+        return
+
+    inicio = time.time()
+    schema = pa.schema([("SENTIMENTO", pa.float32())]).with_metadata({"versao_lexico": str(VERSAO_LEXICO)})
+    temporario = f"{ARQUIVO_SENTIMENTO}.tmp"
+    total = 0
+
+    with pq.ParquetWriter(temporario, schema, compression="zstd") as escritor:
+        for lote in arquivo.iter_batches(batch_size=TAMANHO_LOTE, columns=[coluna]):
+            scores = pontuar_serie(lote.column(0).to_pandas())
+            escritor.write_table(pa.table({"SENTIMENTO": pa.array(scores.to_numpy(), type=pa.float32())}, schema=schema))
+            total += len(scores)
+            print(f"   -> {total:,} linhas")
+
+    os.replace(temporario, ARQUIVO_SENTIMENTO)
+    print(f"🏁 [SENTIMENTO] {total:,} linhas em {round(time.time() - inicio, 2)}s. Salvo em {ARQUIVO_SENTIMENTO}")
+
+
+if __name__ == "__main__":
+    rodar_sentimento()
@@ -0,0 +1,332 @@
+import pandas as pd
+import numpy as np
+import argparse
+import os
+import time
+
+# Gera CSVs sintéticos no formato dos dados abertos da CGU (Fala.BR e LAI)
+# para testar ETL e painéis em escala (1M, 10M, 50M linhas) sem os dados reais.
+# Mesma semente + mesmos parâmetros = mesmos arquivos, byte a byte.
+
+# Caminhos
+PASTA_DESTINO = "data/raw/sintetico"
+
+# --- CONFIGURAÇÃO PADRÃO ---
+LINHAS_OUVIDORIA = 1_000_000
+FATOR_PEDIDOS_LAI = 0.4      # pedidos LAI por manifestação da Ouvidoria
+FATOR_RECURSOS_LAI = 0.08    # recursos por pedido
+FRACAO_SOLICITANTES = 0.9    # pedidos com perfil de solicitante
+ANOS = (2021, 2025)
+TAMANHO_BLOCO = 500_000      # linhas geradas e gravadas por vez (memória constante)
+SEED = 42
+
+# Formatos dos arquivos originais
+ENCODING_OUVIDORIA = "latin1"
+ENCODING_LAI = "utf-16"
+SEPARADOR = ";"
+
+# --- VOCABULÁRIO ---
+UFS = ["SP", "MG", "RJ", "BA", "PR", "RS", "PE", "CE", "PA", "SC", "MA", "GO", "AM", "ES",
+       "PB", "RN", "MT", "AL", "PI", "DF", "MS", "SE", "RO", "TO", "AC", "AP", "RR"]
+# Aproximadamente proporcional à população
+PESOS_UF = np.array([44, 21, 17, 15, 11, 11, 9.5, 9.2, 8.7, 7.6, 7, 7.1, 4.2, 4.1,
+                     4, 3.5, 3.6, 3.3, 3.3, 3, 2.8, 2.3, 1.8, 1.6, 0.9, 0.9, 0.6])
+
+ORGAOS_BASE = [
+    "INSS - Instituto Nacional do Seguro Social", "Ministério da Saúde", "Ministério da Educação",
+    "Caixa Econômica Federal", "Banco do Brasil", "Ministério do Trabalho e Emprego",
+    "Receita Federal do Brasil", "Polícia Federal", "ANATEL - Agência Nacional de Telecomunicações",
+    "ANS - Agência Nacional de Saúde Suplementar", "Correios", "Ministério da Economia",
+    "ANVISA - Agência Nacional de Vigilância Sanitária", "IBAMA", "Ministério da Cidadania",
+    "CGU - Controladoria-Geral da União", "DNIT", "ANAC - Agência Nacional de Aviação Civil",
+    "Ministério da Justiça e Segurança Pública", "Universidade Federal",
+]
+TEMAS = [
+    "Benefício previdenciário", "Aposentadoria", "Auxílio emergencial", "Bolsa Família",
+    "Seguro-desemprego", "FGTS", "Imposto de Renda", "Passaporte", "Vacinação", "SUS",
+    "Telefonia", "Plano de saúde", "Financiamento estudantil", "ENEM", "Concurso público",
+    "Licitação", "Servidor público", "Rodovia federal", "Entrega de encomenda", "Medicamento",
+    "Perícia médica", "Pensão por morte", "CNH", "CPF", "Meio ambiente", "Voo", "Bagagem",
+]
+ASPECTOS = [
+    "demora na análise", "atendimento", "informação", "agendamento", "cobrança indevida",
+    "indeferimento", "pagamento", "cadastro", "recurso", "irregularidade", "falta de resposta",
+    "sistema indisponível", "elogio ao atendimento", "erro no cálculo", "documentação",
+]
+# Aspectos que costumam levar mais tempo (o modelo de risco tem o que aprender)
+ASPECTOS_LENTOS = {"demora na análise", "indeferimento", "recurso", "perícia", "irregularidade", "falta de resposta"}
+
+TIPOS_MANIFESTACAO = ["Reclamação", "Solicitação", "Denúncia", "Comunicação", "Sugestão", "Elogio", "Simplifique"]
+PESOS_TIPO = np.array([45, 25, 12, 8, 4, 4, 2])
+SITUACOES_OUV = ["Concluída", "Arquivada", "Encaminhada por outro órgão", "Cadastrada", "Complementação Solicitada"]
+PESOS_SITUACAO_OUV = np.array([78, 8, 6, 5, 3])
+SATISFACAO = ["1 - Muito insatisfeito", "2 - Insatisfeito", "3 - Regular", "4 - Satisfeito", "5 - Muito satisfeito", "Não avaliado"]
+PESOS_SATISFACAO = np.array([18, 8, 7, 9, 13, 45])
+GENEROS = ["Masculino", "Feminino", "Não Informado", "Outro"]
+PESOS_GENERO = np.array([44, 42, 13, 1])
+RACAS = ["Branca", "Parda", "Preta", "Amarela", "Indígena", "Não Informado"]
+PESOS_RACA = np.array([30, 33, 9, 1, 0.5, 26.5])
+FAIXAS_ETARIAS = ["Até 19 anos", "20 a 29 anos", "30 a 39 anos", "40 a 49 anos", "50 a 59 anos", "60 anos ou mais", "Não Informado"]
+PESOS_FAIXA = np.array([3, 17, 24, 21, 15, 12, 8])
+
+DECISOES_LAI = ["Acesso Concedido", "Acesso Negado", "Acesso Parcialmente Concedido", "Não se trata de solicitação de informação",
+                "Informação Inexistente", "Órgão não tem competência para responder sobre o assunto", "Pergunta Duplicada/Repetida"]
+PESOS_DECISAO_LAI = np.array([60, 8, 7, 10, 6, 6, 3])
+SITUACOES_LAI = ["Respondido", "Em Tramitação", "Reencaminhado"]
+PESOS_SITUACAO_LAI = np.array([92, 5, 3])
+TIPOS_DEMANDANTE = ["Pessoa Física", "Pessoa Jurídica"]
+ESCOLARIDADES = ["Ensino Superior", "Pós-graduação", "Ensino Médio", "Mestrado/Doutorado", "Ensino Fundamental", "Sem instrução formal", "Não Informado"]
+PESOS_ESCOLARIDADE = np.array([30, 18, 20, 8, 4, 1, 19])
+PROFISSOES = ["Servidor público federal", "Estudante", "Professor", "Jornalista", "Empregado - setor privado",
+              "Profissional liberal/autônomo", "Pesquisador", "Advogado", "Aposentado", "Outra", "Não Informado"]
+PESOS_PROFISSAO = np.array([12, 14, 8, 3, 14, 10, 5, 6, 4, 10, 14])
+INSTANCIAS = ["Primeira Instância", "Segunda Instância", "CGU", "CMRI", "Pedido de Revisão"]
+PESOS_INSTANCIA = np.array([55, 25, 14, 2, 4])
+TIPOS_RECURSO = ["Informação recebida não corresponde à solicitada", "Informação incompleta", "Ausência de justificativa legal para classificação",
+                 "Justificativa para o sigilo insatisfatória/não informada", "Outros"]
+PESOS_TIPO_RECURSO = np.array([40, 30, 8, 7, 15])
+SITUACOES_RECURSO = ["Respondido", "Em Tramitação"]
+DECISOES_RECURSO = ["Deferido", "Indeferido", "Parcialmente deferido", "Não conhecimento", "Perda de objeto"]
+PESOS_DECISAO_RECURSO = np.array([25, 35, 12, 20, 8])
+
+
+def pesos_zipf(n, expoente=1.1):
+    """Popularidade de cauda longa: o k-ésimo item tem peso 1/k^expoente."""
+    p = 1.0 / np.arange(1, n + 1) ** expoente
+    return p / p.sum()
+
+
+def normalizar_pesos(p):
+    p = np.asarray(p, dtype=float)
+    return p / p.sum()
+
+
+class Vocabulario:
+    """Categorias (órgãos, assuntos, municípios...) e popularidades, derivadas só da semente."""
+
+    def __init__(self, seed=SEED, n_assuntos=1200, n_orgaos=300, n_municipios=5570, n_servicos=800):
+        rng = np.random.default_rng([seed, 0])
+
+        # Órgãos: os conhecidos no topo + unidades descentralizadas na cauda
+        cauda = [f"{ORGAOS_BASE[i % len(ORGAOS_BASE)]} - Unidade {i:03d}" for i in range(n_orgaos - len(ORGAOS_BASE))]
+        self.orgaos = np.array(ORGAOS_BASE + cauda, dtype=object)
+        self.p_orgaos = pesos_zipf(len(self.orgaos), 1.2)
+
+        # Assuntos: tema + aspecto (+ detalhe na cauda), com fator de demora por assunto
+        combinacoes = [f"{t} - {a}" for t in TEMAS for a in ASPECTOS]
+        rng.shuffle(combinacoes)
+        extras = [f"{combinacoes[i % len(combinacoes)]} ({i})" for i in range(max(0, n_assuntos - len(combinacoes)))]
+        self.assuntos = np.array((combinacoes + extras)[:n_assuntos], dtype=object)
+        self.p_assuntos = pesos_zipf(len(self.assuntos), 1.05)
+        lentos = np.array([any(a in s.lower() for a in ASPECTOS_LENTOS) for s in self.assuntos])
+        self.demora_assunto = np.where(lentos, 2.2, 0.8) * rng.lognormal(0, 0.25, len(self.assuntos))
+
+        self.servicos = np.array([f"Serviço {TEMAS[i % len(TEMAS)]} {i:04d}" for i in range(n_servicos)], dtype=object)
+        self.p_servicos = pesos_zipf(n_servicos, 1.0)
+
+        # Municípios: cada um pertence a uma UF (mais municípios nas UFs maiores)
+        self.uf_municipio = rng.choice(len(UFS), n_municipios, p=normalizar_pesos(PESOS_UF))
+        self.municipios = np.array([f"Município {i:04d}" for i in range(n_municipios)], dtype=object)
+        self.p_municipios = pesos_zipf(n_municipios, 0.9)
+
+
+def datas_texto(anos, formato):
+    """Todas as datas do período já formatadas (o sorteio vira um índice neste vetor)."""
+    dias = pd.date_range(f"{anos[0]}-01-01", f"{anos[1]}-12-31", freq="D")
+    return dias, np.array(dias.strftime(formato), dtype=object)
+
+
+def sortear_dias(rng, n, dias):
+    """Dias com tendência de crescimento no período e menos registros no fim de semana."""
+    dia = (np.sqrt(rng.random(n)) * len(dias)).astype(np.int64)
+    dia_semana = dias.dayofweek.to_numpy()[dia]
+    # Parte dos registros de sábado/domingo vai para um dia útil da mesma semana
+    mover = (dia_semana >= 5) & (rng.random(n) < 0.6)
+    dia[mover] += rng.integers(0, 5, mover.sum()) - dia_semana[mover]
+    return np.clip(dia, 0, len(dias) - 1)
+
+
+def categorias(rng, valores, pesos, n, nulos=0.0):
+    escolha = np.asarray(valores, dtype=object)[rng.choice(len(valores), n, p=normalizar_pesos(pesos))]
+    if nulos:
+        escolha[rng.random(n) < nulos] = ""
+    return escolha
+
+
+def bloco_ouvidoria(vocab, rng, inicio, n, dias, datas_br):
+    i_assunto = rng.choice(len(vocab.assuntos), n, p=vocab.p_assuntos)
+    i_municipio = rng.choice(len(vocab.municipios), n, p=vocab.p_municipios)
+    dia = sortear_dias(rng, n, dias)
+
+    # Dias para resolução: lognormal escalada pelo assunto (cauda longa, ~20% acima de 20 dias)
+    resolucao = np.round(rng.lognormal(2.1, 0.6, n) * vocab.demora_assunto[i_assunto]).astype(np.int64)
+    situacao = categorias(rng, SITUACOES_OUV, PESOS_SITUACAO_OUV, n)
+    em_aberto = (situacao == "Cadastrada") | (situacao == "Complementação Solicitada")
+    resolucao_txt = resolucao.astype(str).astype(object)
+    resolucao_txt[em_aberto] = ""
+    atraso = np.maximum(resolucao - 30, 0).astype(str).astype(object)
+    atraso[em_aberto] = ""
+    fim = np.minimum(dia + resolucao, len(dias) - 1)
+    data_resposta = datas_br[fim].copy()
+    data_resposta[em_aberto] = ""
+
+    df = pd.DataFrame({
+        "Id Manifestação": np.arange(inicio, inicio + n) + 1_000_000,
+        "Nome Órgão": vocab.orgaos[rng.choice(len(vocab.orgaos), n, p=vocab.p_orgaos)],
+        "Tipo Manifestação": categorias(rng, TIPOS_MANIFESTACAO, PESOS_TIPO, n),
+        "Assunto": vocab.assuntos[i_assunto],
+        "Data Registro": datas_br[dia],
+        "Situação": situacao,
+        "Data Resposta": data_resposta,
+        "Serviço": categorias(rng, vocab.servicos, vocab.p_servicos, n, nulos=0.35),
+        "Município Manifestante": vocab.municipios[i_municipio],
+        "UF do Município Manifestante": np.asarray(UFS, dtype=object)[vocab.uf_municipio[i_municipio]],
+        "Gênero": categorias(rng, GENEROS, PESOS_GENERO, n),
+        "Raça/Cor": categorias(rng, RACAS, PESOS_RACA, n),
+        "Faixa Etária": categorias(rng, FAIXAS_ETARIAS, PESOS_FAIXA, n),
+        "Satisfação": categorias(rng, SATISFACAO, PESOS_SATISFACAO, n),
+        "Dias para Resolução": resolucao_txt,
+        "Dias de Atraso": atraso,
+    })
+    return df, dia
+
+
+def bloco_pedidos(vocab, rng, inicio, n, dias, datas_br):
+    dia = sortear_dias(rng, n, dias)
+    i_assunto = rng.choice(len(TEMAS), n, p=pesos_zipf(len(TEMAS), 0.8))
+    prazo = np.minimum(dia + 20 + 10 * (rng.random(n) < 0.15), len(dias) - 1)
+    df = pd.DataFrame({
+        "IdPedido": np.arange(inicio, inicio + n) + 1,
+        "ProtocoloPedido": pd.Series(np.arange(inicio, inicio + n) + 10 ** 15).astype(str).str.zfill(17).to_numpy(dtype=object),
+        "Esfera": "Federal",
+        "Uf": np.asarray(UFS, dtype=object)[rng.choice(len(UFS), n, p=normalizar_pesos(PESOS_UF))],
+        "OrgaoDestinatario": vocab.orgaos[rng.choice(len(vocab.orgaos), n, p=vocab.p_orgaos)],
+        "Situacao": categorias(rng, SITUACOES_LAI, PESOS_SITUACAO_LAI, n),
+        "DataRegistro": datas_br[dia],
+        "PrazoAtendimento": datas_br[prazo],
+        "FoiProrrogado": np.where(rng.random(n) < 0.15, "Sim", "Não"),
+        "FoiReencaminhado": np.where(rng.random(n) < 0.05, "Sim", "Não"),
+        "FormaResposta": categorias(rng, ["Pelo sistema (com avisos por email)", "Correspondência física"], [97, 3], n),
+        "AssuntoPedido": np.asarray(TEMAS, dtype=object)[i_assunto],
+        "SubAssuntoPedido": np.asarray(ASPECTOS, dtype=object)[rng.choice(len(ASPECTOS), n)],
+        "Decisao": categorias(rng, DECISOES_LAI, PESOS_DECISAO_LAI, n),
+    })
+    return df, dia
+
+
+def bloco_solicitantes(vocab, rng, pedidos):
+    n = len(pedidos)
+    nascimento = pd.Timestamp("1945-01-01") + pd.to_timedelta(rng.integers(0, 365 * 60, n), unit="D")
+    i_municipio = rng.choice(len(vocab.municipios), n, p=vocab.p_municipios)
+    return pd.DataFrame({
+        "ProtocoloPedido": pedidos,
+        "TipoDemandante": categorias(rng, TIPOS_DEMANDANTE, [92, 8], n),
+        "DataNascimento": np.asarray(nascimento.strftime("%d/%m/%Y"), dtype=object),
+        "Genero": categorias(rng, GENEROS[:3], [52, 38, 10], n),
+        "Escolaridade": categorias(rng, ESCOLARIDADES, PESOS_ESCOLARIDADE, n),
+        "Profissao": categorias(rng, PROFISSOES, PESOS_PROFISSAO, n),
+        "Pais": "Brasil",
+        "UF": np.asarray(UFS, dtype=object)[vocab.uf_municipio[i_municipio]],
+        "Municipio": vocab.municipios[i_municipio],
+    })
+
+
+def bloco_recursos(rng, inicio, pedidos, dia_pedido, dias, datas_br):
+    n = len(pedidos)
+    dia = np.minimum(dia_pedido + rng.integers(20, 60, n), len(dias) - 1)
+    df = pd.DataFrame({
+        "IdRecurso": np.arange(inicio, inicio + n) + 1,
+        "ProtocoloPedido": pedidos,
+        "DataRecurso": datas_br[dia],
+        "Instancia": categorias(rng, INSTANCIAS, PESOS_INSTANCIA, n),
+        "TipoRecurso": categorias(rng, TIPOS_RECURSO, PESOS_TIPO_RECURSO, n),
+        "Situacao": categorias(rng, SITUACOES_RECURSO, [90, 10], n),
+        "TipoDecisao": categorias(rng, DECISOES_RECURSO, PESOS_DECISAO_RECURSO, n),
+    })
+    return df, dia
+
+
+class Escritor:
+    """Um CSV por ano (como os arquivos da CGU), aberto uma vez e preenchido bloco a bloco."""
+
+    def __init__(self, pasta, padrao_nome, encoding):
+        self.pasta, self.padrao_nome, self.encoding = pasta, padrao_nome, encoding
+        self.arquivos = {}
+
+    def escrever(self, df, anos):
+        for ano in np.unique(anos):
+            if ano not in self.arquivos:
+                caminho = os.path.join(self.pasta, self.padrao_nome.format(ano=ano))
+                # O codec utf-16 grava o BOM só uma vez por arquivo aberto
+                self.arquivos[ano] = [open(caminho, "w", encoding=self.encoding, errors="replace", newline=""), True]
+            f, cabecalho = self.arquivos[ano]
+            df[anos == ano].to_csv(f, sep=SEPARADOR, index=False, header=cabecalho, lineterminator="\r\n")
+            self.arquivos[ano][1] = False
+
+    def fechar(self):
+        for f, _ in self.arquivos.values():
+            f.close()
+        return sorted(f.name for f, _ in self.arquivos.values())
+
+
+def _blocos(total, tamanho):
+    for inicio in range(0, total, tamanho):
+        yield inicio, min(tamanho, total - inicio)
+
+
+def rodar_geracao(linhas=LINHAS_OUVIDORIA, seed=SEED, destino=PASTA_DESTINO, anos=ANOS,
+                  fator_pedidos=FATOR_PEDIDOS_LAI, tamanho_bloco=TAMANHO_BLOCO):
+    print(f"🧪 [SINTÉTICO] Gerando {linhas:,} manifestações (semente {seed}) em {destino}...")
+    inicio_total = time.time()
+    os.makedirs(destino, exist_ok=True)
+
+    vocab = Vocabulario(seed)
+    dias, datas_br = datas_texto(anos, "%d/%m/%Y")
+    ano_do_dia = dias.year.to_numpy()
+    gerados = []
+
+    # 1. Ouvidoria (Fala.BR): latin1, ';', um arquivo por ano
+    escritor = Escritor(destino, "Manifestacoes_Ouvidoria_{ano}.csv", ENCODING_OUVIDORIA)
+    for k, (inicio, n) in enumerate(_blocos(linhas, tamanho_bloco)):
+        rng = np.random.default_rng([seed, 1, k])
+        df, dia = bloco_ouvidoria(vocab, rng, inicio, n, dias, datas_br)
+        escritor.escrever(df, ano_do_dia[dia])
+        print(f"   -> Ouvidoria: {inicio + n:,} linhas")
+    gerados += escritor.fechar()
+
+    # 2. LAI: Pedidos + Solicitantes + Recursos (utf-16, ';'), ligados pelo ProtocoloPedido
+    n_pedidos = int(linhas * fator_pedidos)
+    pedidos = Escritor(destino, "{ano}_Pedidos_csv_{ano}.csv", ENCODING_LAI)
+    solicitantes = Escritor(destino, "{ano}_SolicitantesPedidos_csv_{ano}.csv", ENCODING_LAI)
+    recursos = Escritor(destino, "{ano}_Recursos_Reclamacoes_csv_{ano}.csv", ENCODING_LAI)
+    inicio_recurso = 0
+    for k, (inicio, n) in enumerate(_blocos(n_pedidos, tamanho_bloco)):
+        rng = np.random.default_rng([seed, 2, k])
+        df, dia = bloco_pedidos(vocab, rng, inicio, n, dias, datas_br)
+        anos_linha = ano_do_dia[dia]
+        pedidos.escrever(df, anos_linha)
+        protocolos = df["ProtocoloPedido"].to_numpy()
+
+        com_perfil = rng.random(n) < FRACAO_SOLICITANTES
+        solicitantes.escrever(bloco_solicitantes(vocab, rng, protocolos[com_perfil]), anos_linha[com_perfil])
+
+        com_recurso = rng.random(n) < FATOR_RECURSOS_LAI
+        df_rec, dia_recurso = bloco_recursos(rng, inicio_recurso, protocolos[com_recurso], dia[com_recurso], dias, datas_br)
+        recursos.escrever(df_rec, ano_do_dia[dia_recurso])
+        inicio_recurso += len(df_rec)
+        print(f"   -> LAI: {inicio + n:,} pedidos, {inicio_recurso:,} recursos")
+    gerados += pedidos.fechar() + solicitantes.fechar() + recursos.fechar()
+
+    print(f"🏁 [SINTÉTICO] {len(gerados)} arquivos em {round(time.time() - inicio_total, 1)}s.")
+    return gerados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gera CSVs sintéticos no formato da CGU (Ouvidoria e LAI).")
+    parser.add_argument("--linhas", type=int, default=LINHAS_OUVIDORIA, help="manifestações da Ouvidoria")
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--destino", default=PASTA_DESTINO)
+    parser.add_argument("--anos", type=int, nargs=2, default=ANOS, metavar=("INICIO", "FIM"))
+    parser.add_argument("--fator-pedidos", type=float, default=FATOR_PEDIDOS_LAI, help="pedidos LAI por manifestação")
+    args = parser.parse_args()
+    rodar_geracao(args.linhas, args.seed, args.destino, tuple(args.anos), args.fator_pedidos)
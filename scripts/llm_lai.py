@@ -3,29 +3,27 @@
 # =============================================================================
 
 import os
-import re
+import sys
 import time
 import pandas as pd
 import spacy
-from collections import Counter
-
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
 
 from sklearn.feature_extraction.text import CountVectorizer
 from sklearn.decomposition import LatentDirichletAllocation
 
 from gensim.models.phrases import Phrases, Phraser
 
+# Permite rodar como "python scripts/llm_lai.py" a partir da raiz do projeto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.recursos_nlp import carregar_stopwords
+from utils.texto import limpar_serie, por_categoria
+
 
 # =============================================================================
 # 2. CAMINHOS
 # =============================================================================
 
 ARQUIVO_DADOS = "data/processed/ouvidoria.parquet"
-IMG_WORDCLOUD = "assets/wordcloud_assuntos.png"
-IMG_WORDCLOUD_TOPICOS = "assets/wordcloud_topicos_lda.png"
-IMG_PARETO = "assets/pareto_palavras.png"
 ARQUIVO_TOPICOS = "data/processed/topicos_nlp.parquet"
 
 
@@ -42,41 +40,8 @@ nlp = spacy.load("pt_core_news_sm", disable=["parser","ner"])
 # 4. STOPWORDS DE DOMÍNIO
 # =============================================================================
 
-STOPWORDS_DOMINIO = {
-
-# termos administrativos
-"informacao","informacoes","servico","servicos","publico","publica",
-"programa","programas","administracao","gestao","sistema","sistemas",
-"acesso","cadastro","processo","processos",
-
-# termos de ouvidoria
-"manifestacao","solicitacao","solicitacoes","pedido","pedidos","demanda",
-"encaminhamento","encaminhar","informar","resposta","retorno","atendimento",
-
-# pessoas
-"usuario","usuarios","cidadao","cidadaos","senhor","senhora",
-
-# estrutura institucional
-"orgao","setor","departamento","unidade",
-
-# burocracia
-"registro","protocolo","documento","documentos",
-
-# verbos genéricos
-"realizar","fazer","existir","possuir",
-
-# genéricos
-"geral","outros","outras",
-
-# geografia
-"municipio","nacional","federal","brasil","brasileiro"
-
-"outro", "outra", "outros", "outras", 
-"informado", "nformado", "nao_informado", # ruídos de campos vazios
-"assunto", "area", "tipo", "sobre",       # meta-palavras
-"meir", "metrologia",                     # se forem muito genéricos no seu contexto
-"doc", "pdf", "anexo"                     # ruídos de arquivos
-}
+# Lista versionada em data/resources (gerada por scripts/etl_recursos_nlp.py)
+STOPWORDS_DOMINIO = carregar_stopwords("dominio")
 
 
 # =============================================================================
@@ -141,9 +106,8 @@ if len(df) > limite_amostra:
 print("Processando textos...")
 inicio = time.time()
 
-# 2. Preparação inicial e remoção de ruídos de "vazio"
-textos_raw = df[coluna_texto].fillna("").astype(str).str.lower().tolist()
-textos_sem_ruido = [re.sub(r"não informado|nao informado|sem informação|vazio", "", t) for t in textos_raw]
+# 2. Preparação inicial e remoção de ruídos de "vazio" (uma vez por texto distinto)
+textos = limpar_serie(df[coluna_texto].fillna(""), remover_pontuacao=False)
 
 # 3. UNIÃO MANUAL (O pulo do gato: deve ser feito ANTES ou DEPOIS da limpeza)
 # Vamos fazer antes para o spaCy entender como uma unidade só
@@ -156,11 +120,17 @@ substituicoes = {
     "certidao de nascimento": "certidao_nascimento"
 }
 
-for original, substituto in substituicoes.items():
-    textos_sem_ruido = [t.replace(original, substituto) for t in textos_sem_ruido]
+def unir_termos(s):
+    for original, substituto in substituicoes.items():
+        s = s.str.replace(original, substituto, regex=False)
+    return s
+
+textos = por_categoria(textos, unir_termos)
 
-# 4. Limpeza via spaCy (Batch)
-df["texto_limpo"] = limpar_textos_batch(textos_sem_ruido)
+# 4. Limpeza via spaCy (Batch), também só nos textos distintos
+df["texto_limpo"] = por_categoria(
+    textos, lambda s: pd.Series(limpar_textos_batch(s.tolist()), index=s.index)
+).astype(str)
 
 # 5. REMOVE VAZIOS E GERA CORPUS
 df = df[df["texto_limpo"].str.strip() != ""].copy()
@@ -189,112 +159,7 @@ print("Bigramas gerados (ex: microempreendedor_individual).")
 
 
 # =============================================================================
-# 9. FREQUÊNCIA DE PALAVRAS
-# =============================================================================
-
-counter = Counter()
-
-for doc in corpus:
-    counter.update(doc.split())
-
-frequencias = {
-
-    k:v
-    for k,v in counter.items()
-    if v >= 5
-
-}
-
-
-# =============================================================================
-# 10. WORDCLOUD (TEMA CÉU)
-# =============================================================================
-
-os.makedirs("assets", exist_ok=True)
-
-wordcloud = WordCloud(
-
-    width=1600,
-    height=900,
-
-    background_color="#65347B",
-
-    colormap="Purples",
-
-    max_words=120,
-
-    prefer_horizontal=0.9,
-
-    collocations=False
-
-).generate_from_frequencies(frequencias)
-
-
-plt.figure(figsize=(16,9))
-plt.imshow(wordcloud, interpolation="bilinear")
-plt.axis("off")
-
-plt.savefig(IMG_WORDCLOUD, dpi=300, bbox_inches="tight")
-
-plt.close()
-
-print("Nuvem de palavras salva.")
-
-
-# =============================================================================
-# 11. PARETO HORIZONTAL EQUILIBRADO (RIGOR 80% COM LEITURA LIMPA)
-# =============================================================================
-
-# 1. Preparar DataFrame e Acumulado
-pareto_completo = pd.DataFrame(
-    sorted(frequencias.items(), key=lambda x: x[1], reverse=True),
-    columns=["palavra", "frequencia"]
-)
-total_base = pareto_completo["frequencia"].sum()
-pareto_completo["acumulado"] = pareto_completo["frequencia"].cumsum() / total_base
-
-# 2. DEFINIR CORTE LIMPO: Pegamos as top 25 palavras
-# Isso garante que os labels no eixo Y não fiquem minúsculos
-n_limite = 25
-df_top = pareto_completo.head(n_limite).copy()
-
-# 3. CALCULAR O "RESTO DOS 80%":
-# Pegamos as palavras da posição 26 até onde atinge 80%
-df_meio = pareto_completo.iloc[n_limite:]
-df_meio_80 = df_meio[df_meio["acumulado"] <= 0.81]
-
-soma_relevantes_80 = df_meio_80["frequencia"].sum()
-soma_cauda_longa = pareto_completo.iloc[len(df_top) + len(df_meio_80):]["frequencia"].sum()
-
-# 4. Criar as linhas de agrupamento
-row_relevantes = pd.DataFrame([{"palavra": f"Outros {len(df_meio_80)} termos (até 80%)", "frequencia": soma_relevantes_80}])
-row_cauda = pd.DataFrame([{"palavra": "Demais termos (100%)", "frequencia": soma_cauda_longa}])
-
-# 5. Consolidar e Inverter
-top_pareto = pd.concat([df_top[["palavra", "frequencia"]], row_relevantes, row_cauda], ignore_index=True)
-top_pareto = top_pareto.iloc[::-1].reset_index(drop=True)
-
-# Recalcular acumulado para a linha
-top_pareto["acumulado_grafico"] = (top_pareto["frequencia"][::-1].cumsum()[::-1]) / total_base
-
-# 6. Gerar Gráfico
-fig, ax1 = plt.subplots(figsize=(12, 10)) # Altura fixa confortável para 27 linhas
-
-bars = ax1.barh(top_pareto["palavra"], top_pareto["frequencia"], color="#9370DB", alpha=0.7)
-ax2 = ax1.twiny()
-ax2.plot(top_pareto["acumulado_grafico"], top_pareto["palavra"], marker="o", color="#6A0DAD")
-ax2.axvline(x=0.8, color='red', linestyle='--', label="Corte 80%")
-
-ax1.set_xlabel("Frequência Absoluta")
-ax2.set_xlabel("Percentual Acumulado (%)")
-plt.title("Análise de Pareto: Top 25 + Agrupamento de Relevância (Rigor 80%)")
-
-plt.tight_layout()
-plt.savefig(IMG_PARETO, dpi=300)
-plt.close()
-
-# =============================================================================
-# 12. MODELAGEM DE TÓPICOS (LDA)
+# 9. MODELAGEM DE TÓPICOS (LDA)
 # =============================================================================
 
 vectorizer = CountVectorizer(
@@ -328,7 +193,7 @@ lda.fit(dtm)
 
 
 # =============================================================================
-# 13. EXTRAIR PALAVRAS DOS TÓPICOS
+# 10. EXTRAIR PALAVRAS DOS TÓPICOS
 # =============================================================================
 
 topicos = []
@@ -352,7 +217,7 @@ df_topicos = pd.DataFrame(topicos)
 
 
 # =============================================================================
-# 14. SALVAR TÓPICOS
+# 11. SALVAR TÓPICOS
 # =============================================================================
 
 os.makedirs("data/processed", exist_ok=True)
@@ -362,50 +227,6 @@ df_topicos.to_parquet(ARQUIVO_TOPICOS, index=False)
 print("Tópicos salvos.")
 
 
-# =============================================================================
-# 15. WORDCLOUD DOS TÓPICOS
-# =============================================================================
-
-pesos = {}
-
-for _,row in df_topicos.iterrows():
-
-    palavras = row["palavras"].split(",")
-
-    peso = row["peso"] / len(palavras)
-
-    for p in palavras:
-
-        p = p.strip()
-
-        pesos[p] = pesos.get(p,0) + peso
-
-
-wc_topicos = WordCloud(
-
-    width=1600,
-    height=900,
-
-    background_color="#65347B",
-
-    colormap="Purples"
-
-).generate_from_frequencies(pesos)
-
-
-plt.figure(figsize=(16,9))
-
-plt.imshow(wc_topicos, interpolation="bilinear")
-
-plt.axis("off")
-
-plt.savefig(IMG_WORDCLOUD_TOPICOS, dpi=300, bbox_inches="tight")
-
-plt.close()
-
-print("Nuvem de tópicos salva.")
-
-
 # =============================================================================
 # FIM
 # =============================================================================
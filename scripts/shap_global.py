@@ -0,0 +1,138 @@
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+import argparse
+import os
+import sys
+import time
+from joblib import Parallel, delayed
+
+# Permite rodar como "python scripts/shap_global.py" a partir da raiz do projeto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.explicacao import montar_explicador, shap_linha
+from utils.modelos import obter_modelo
+
+# Caminhos
+PATH_DATA = "data/processed/ouvidoria.parquet"
+PATH_SHAP_GLOBAL = "data/processed/explica_shap.parquet"
+
+# --- CONFIGURAÇÃO PADRÃO ---
+TAMANHO_AMOSTRA = 5000   # linhas reais (sem SMOTE), estratificadas pelo alvo
+ORCAMENTO_S = 300        # tempo máximo; blocos não concluídos ficam de fora
+TAMANHO_BLOCO = 250      # linhas por tarefa paralela
+N_JOBS = -1
+Z_95 = 1.96
+
+
+def shap_bloco(explicador, X):
+    """Somas de |SHAP| e de SHAP² por termo num bloco de linhas (para média e IC)."""
+    soma = np.zeros(X.shape[1])
+    soma_quad = np.zeros(X.shape[1])
+    for i in range(X.shape[0]):
+        for c, v in shap_linha(explicador, X[i]).items():
+            soma[c] += abs(v)
+            soma_quad[c] += v * v
+    return soma, soma_quad, X.shape[0]
+
+
+def amostra_estratificada(y, tamanho, seed=42):
+    """Índices com a mesma proporção de cada classe de `y`."""
+    rng = np.random.default_rng(seed)
+    fracao = min(1.0, tamanho / max(len(y), 1))
+    indices = [rng.choice(np.flatnonzero(y == c), size=int(round(fracao * (y == c).sum())), replace=False)
+               for c in np.unique(y)]
+    indices = np.concatenate(indices) if indices else np.empty(0, dtype=int)
+    return rng.permutation(indices)
+
+
+def calcular_shap_global(modelo, X, termos, orcamento_s=ORCAMENTO_S, n_jobs=N_JOBS):
+    """
+    Média de |SHAP| por termo sobre as linhas de X (já amostradas), em blocos paralelos
+    entre processos, com intervalo de confiança de 95% (aproximação normal).
+    """
+    explicador = montar_explicador(modelo)
+    if explicador is None:
+        raise ValueError("O SHAP global exige um modelo de árvores (Random Forest).")
+
+    X = X.tocsr()
+    blocos = [X[i:i + TAMANHO_BLOCO] for i in range(0, X.shape[0], TAMANHO_BLOCO)]
+    soma = np.zeros(X.shape[1])
+    soma_quad = np.zeros(X.shape[1])
+    n = 0
+
+    inicio = time.time()
+    tarefas = Parallel(n_jobs=n_jobs, return_as="generator")(delayed(shap_bloco)(explicador, b) for b in blocos)
+    for s, sq, qtd in tarefas:
+        soma += s
+        soma_quad += sq
+        n += qtd
+        if time.time() - inicio > orcamento_s:
+            print(f"   ⏱️ Orçamento de {orcamento_s}s esgotado após {n:,} linhas.")
+            break
+    if n == 0:
+        raise ValueError("Nenhuma linha processada.")
+
+    media = soma / n
+    # Termo ausente do texto tem SHAP exatamente 0, que também entra na média
+    desvio = np.sqrt(np.maximum(soma_quad / n - media ** 2, 0))
+    margem = Z_95 * desvio / np.sqrt(n)
+
+    df_shap = pd.DataFrame({
+        'Termo': termos,
+        'Impacto': media,
+        'IC_Inferior': np.maximum(media - margem, 0),
+        'IC_Superior': media + margem,
+    })
+    df_shap = df_shap.sort_values('Impacto', ascending=False).reset_index(drop=True)
+    print(f"   -> SHAP de {n:,} linhas em {round(time.time() - inicio, 2)}s.")
+    return df_shap, n
+
+
+def salvar_shap_global(df_shap, n, versao=""):
+    tabela = pa.Table.from_pandas(df_shap, preserve_index=False)
+    tabela = tabela.replace_schema_metadata({
+        **(tabela.schema.metadata or {}),
+        b"n_amostra": str(n).encode(),
+        b"versao_modelo": str(versao).encode(),
+    })
+    os.makedirs(os.path.dirname(PATH_SHAP_GLOBAL), exist_ok=True)
+    pq.write_table(tabela, PATH_SHAP_GLOBAL)
+    print(f"   -> SHAP global salvo em {PATH_SHAP_GLOBAL}")
+
+
+def rodar_shap_global(tamanho_amostra=TAMANHO_AMOSTRA, orcamento_s=ORCAMENTO_S):
+    print(f"🔬 [SHAP] Importância global sobre {tamanho_amostra:,} manifestações reais...")
+
+    if not os.path.exists(PATH_DATA):
+        print(f"❌ Arquivo {PATH_DATA} não encontrado.")
+        return
+
+    artefatos = obter_modelo()
+    if artefatos is None:
+        print("❌ Modelo não encontrado. Execute scripts/train_ml.py.")
+        return
+
+    from train_ml import ler_lotes
+
+    # Amostra estratificada lote a lote (mesma fração em cada lote e em cada classe)
+    total = pq.ParquetFile(PATH_DATA).metadata.num_rows
+    textos = []
+    for k, (lote, y, _) in enumerate(ler_lotes()):
+        indices = amostra_estratificada(y, round(tamanho_amostra * len(y) / total), seed=42 + k)
+        textos.append(lote.iloc[indices].astype(str))
+    textos = pd.concat(textos) if textos else pd.Series(dtype=str)
+    print(f"   -> {len(textos):,} linhas sorteadas.")
+
+    X = artefatos["vetorizador"].transform(textos)
+    df_shap, n = calcular_shap_global(artefatos["modelo"], X, artefatos["termos"], orcamento_s)
+    salvar_shap_global(df_shap, n, artefatos["versao"])
+    print("🏁 [SHAP] Concluído!")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SHAP global do modelo de risco.")
+    parser.add_argument("--amostra", type=int, default=TAMANHO_AMOSTRA, help="linhas reais na amostra")
+    parser.add_argument("--orcamento", type=int, default=ORCAMENTO_S, help="tempo máximo em segundos")
+    args = parser.parse_args()
+    rodar_shap_global(args.amostra, args.orcamento)
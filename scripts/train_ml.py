@@ -1,18 +1,135 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, GridSearchCV
-from sklearn.feature_extraction.text import TfidfVectorizer
+import pyarrow.parquet as pq
+from sklearn.model_selection import train_test_split, cross_val_score, ParameterGrid
+from sklearn.feature_extraction.text import TfidfVectorizer, HashingVectorizer
 from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import SGDClassifier
 from imblearn.over_sampling import SMOTE 
-import shap
-import pickle
 import os
+import sys
+import pickle
+import time
+import json
+import hashlib
+import joblib
+from datetime import datetime
+
+# Permite rodar como "python scripts/train_ml.py" a partir da raiz do projeto
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.recursos_nlp import carregar_stopwords
+from utils.texto import PADRAO_TOKEN_ML
+from utils.modelos import publicar_modelo
+from shap_global import TAMANHO_AMOSTRA as TAMANHO_AMOSTRA_SHAP, amostra_estratificada, calcular_shap_global, salvar_shap_global
 
 # Caminhos
 PATH_DATA = "data/processed/ouvidoria.parquet"
-PATH_MODEL = "data/processed/modelo_ia.pkl"
-PATH_VECTORIZER = "data/processed/vectorizer.pkl"
-PATH_SHAP_GLOBAL = "data/processed/explica_shap.parquet"
+PATH_MODELO_INCREMENTAL = "data/processed/modelo_ia_incremental.pkl"
+
+# Lista de descartes manuais para o seu contexto (CGU/Ouvidoria)
+DESCARTE_EXTRA = ['outros', 'pelo', 'pela', 'esta', 'este', 'qual', 'fala', 'cgu', 'ouvidoria']
+LIMITE_PRAZO = 20  # dias: acima disso a manifestação conta como atrasada
+
+# --- MODO COMPLETO (amostra + SMOTE + Random Forest) ---
+MAX_ROWS = 30000
+PARAMS_TFIDF = {"max_features": 300}
+GRADE_PARAMETROS = {
+    'n_estimators': [50, 100, 200],
+    'max_depth': [10, 20, None],
+    'max_features': ['sqrt', 'log2'],
+}
+ORCAMENTO_BUSCA_S = 600   # tempo máximo (s) da busca de hiperparâmetros
+FATOR_HALVING = 3         # a cada rodada fica 1/3 dos candidatos com 3x mais amostras
+MIN_AMOSTRAS_HALVING = 2000
+
+# Matrizes TF-IDF e SMOTE reaproveitadas entre execuções (chave: dados + configuração)
+PASTA_CACHE_TREINO = "cache/treino"
+
+# --- MODO INCREMENTAL (base inteira em lotes, sem SMOTE) ---
+N_FEATURES_HASH = 2 ** 12   # 4096 colunas -> coeficientes de ~32 KB
+TAMANHO_LOTE = 200_000
+EPOCAS = 2
+CLASSES = np.array([0, 1])
+
+
+def stopwords_modelo():
+    # Stopwords do NLTK a partir do pacote local (sem download) + descartes manuais
+    return sorted(carregar_stopwords("nltk").union(DESCARTE_EXTRA))
+
+
+def chave_cache(**config):
+    """Hash dos dados (tamanho + data de modificação do parquet) e da configuração do treino."""
+    info = os.stat(PATH_DATA)
+    base = {"dados": [info.st_size, info.st_mtime_ns], **config}
+    return hashlib.sha1(json.dumps(base, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def em_cache(nome, chave, calcular):
+    """Carrega `nome` do cache em disco ou calcula e salva (escrita atômica)."""
+    caminho = os.path.join(PASTA_CACHE_TREINO, f"{nome}_{chave}.joblib")
+    if os.path.exists(caminho):
+        print(f"   📦 {nome}: usando cache ({caminho})")
+        return joblib.load(caminho)
+
+    resultado = calcular()
+    os.makedirs(PASTA_CACHE_TREINO, exist_ok=True)
+    joblib.dump(resultado, f"{caminho}.tmp")
+    os.replace(f"{caminho}.tmp", caminho)
+    return resultado
+
+
+def busca_halving(X, y, grade=GRADE_PARAMETROS, orcamento_s=ORCAMENTO_BUSCA_S,
+                  fator=FATOR_HALVING, min_amostras=MIN_AMOSTRAS_HALVING, seed=42):
+    """
+    Successive halving com orçamento de tempo: todos os candidatos começam numa amostra
+    pequena, só o melhor 1/fator segue para uma amostra `fator` vezes maior.
+    Estourado o orçamento, fica o melhor candidato avaliado até ali.
+    """
+    candidatos = list(ParameterGrid(grade))
+    n = X.shape[0]
+    recurso = min(min_amostras, n)
+    melhor = candidatos[0]
+    inicio = time.time()
+
+    while True:
+        if recurso < n:
+            indices, _ = train_test_split(np.arange(n), train_size=recurso, stratify=y, random_state=seed)
+        else:
+            indices = np.arange(n)
+
+        notas = []
+        for params in candidatos:
+            if time.time() - inicio > orcamento_s: break
+            rf = RandomForestClassifier(random_state=42, n_jobs=-1, **params)
+            notas.append((cross_val_score(rf, X[indices], y[indices], cv=2).mean(), params))
+        if not notas: break
+
+        notas.sort(key=lambda t: t[0], reverse=True)
+        melhor = notas[0][1]
+        print(f"      Rodada com {recurso:,} amostras: {len(notas)} candidatos, melhor {notas[0][0]:.3f} {melhor}")
+
+        estourou = len(notas) < len(candidatos)
+        if estourou: print(f"      ⏱️ Orçamento de {orcamento_s}s esgotado.")
+        if estourou or len(candidatos) == 1 or recurso >= n: break
+        candidatos = [p for _, p in notas[:max(1, len(notas) // fator)]]
+        if len(candidatos) == 1: break  # sobrou um só: o refit final já usa a base inteira
+        recurso = min(n, recurso * fator)
+
+    return melhor
+
+
+def calcular_prazo(df):
+    """Dias até a resposta (colunas em minúsculas) ou None se a base não permitir o cálculo."""
+    if 'prazo_calc' in df.columns:
+        return pd.to_numeric(df['prazo_calc'], errors='coerce').fillna(0)
+    col_res = next((c for c in df.columns if 'data' in c and 'respos' in c), None)
+    col_reg = next((c for c in df.columns if 'data' in c and 'regist' in c), None)
+    if col_res and col_reg:
+        return (pd.to_datetime(df[col_res], errors='coerce') - pd.to_datetime(df[col_reg], errors='coerce')).dt.days.fillna(0)
+    if 'dias_resolucao' in df.columns:
+        return pd.to_numeric(df['dias_resolucao'].astype(str).str.replace(",", "."), errors='coerce').fillna(0)
+    return None
+
 
 def treinar_modelo_completo():
     print("🚀 [IA] Iniciando Pipeline de Alta Performance...")
@@ -21,46 +138,37 @@ def treinar_modelo_completo():
         print(f"❌ Arquivo {PATH_DATA} não encontrado.")
         return
 
-    df = pd.read_parquet(PATH_DATA)
-    df.columns = [str(c).lower().strip() for c in df.columns]
-
-    # 1. AMOSTRAGEM PARA VELOCIDADE
-    MAX_ROWS = 30000 
-    if len(df) > MAX_ROWS:
-        print(f"   -> Base reduzida para {MAX_ROWS} linhas para agilizar o SMOTE...")
-        df = df.sample(MAX_ROWS, random_state=42)
-
-    # 2. CÁLCULO DE PRAZO
-    if 'prazo_calc' not in df.columns:
-        col_res = next((c for c in df.columns if 'data' in c and 'respos' in c), None)
-        col_reg = next((c for c in df.columns if 'data' in c and 'regist' in c), None)
-        if col_res and col_reg:
-            df[col_res] = pd.to_datetime(df[col_res], errors='coerce')
-            df[col_reg] = pd.to_datetime(df[col_reg], errors='coerce')
-            df['prazo_calc'] = (df[col_res] - df[col_reg]).dt.days.fillna(0)
-        else:
-            df['prazo_calc'] = np.random.randint(0, 30, size=len(df))
+    chave = chave_cache(max_rows=MAX_ROWS, limite_prazo=LIMITE_PRAZO, tfidf=PARAMS_TFIDF,
+                        stopwords=stopwords_modelo(), token_pattern=PADRAO_TOKEN_ML)
 
-    df['alvo'] = (df['prazo_calc'] > 20).astype(int)
-    
-    # --- 3. VETORIZAÇÃO REFINADA (Fim dos Ruídos) ---
-    print("   -> Vetorizando e filtrando ruídos gramaticais...")
-    
-    # Lista de descartes manuais para o seu contexto (CGU/Ouvidoria)
-    descarte_extra = ['outros', 'pelo', 'pela', 'esta', 'este', 'qual', 'fala', 'cgu', 'ouvidoria']
-    
-    # Pegamos as stopwords do NLTK ou de uma lista robusta
-    stopwords_pt = ["a", "o", "de", "do", "da", "em", "um", "para", "com", "não", "uma", "os", "as"] # Adicione mais se necessário
-
-    tfidf = TfidfVectorizer(
-        max_features=300, 
-        stop_words=stopwords_pt + descarte_extra,
-        # O Regex abaixo aceita apenas LETRAS e palavras com 3 ou mais caracteres
-        token_pattern=r"(?u)\b[a-zA-Záéíóúâêîôûãõç]{3,}\b" 
-    )
-    
-    X = tfidf.fit_transform(df['assunto'].astype(str))
-    y = df['alvo']
+    def vetorizar():
+        df = pd.read_parquet(PATH_DATA)
+        df.columns = [str(c).lower().strip() for c in df.columns]
+
+        # 1. AMOSTRAGEM PARA VELOCIDADE
+        if len(df) > MAX_ROWS:
+            print(f"   -> Base reduzida para {MAX_ROWS} linhas para agilizar o SMOTE...")
+            df = df.sample(MAX_ROWS, random_state=42)
+
+        # 2. CÁLCULO DE PRAZO
+        prazo = calcular_prazo(df)
+        df['prazo_calc'] = prazo if prazo is not None else np.random.randint(0, 30, size=len(df))
+
+        df['alvo'] = (df['prazo_calc'] > LIMITE_PRAZO).astype(int)
+
+        # --- 3. VETORIZAÇÃO REFINADA (Fim dos Ruídos) ---
+        print("   -> Vetorizando e filtrando ruídos gramaticais...")
+
+        tfidf = TfidfVectorizer(
+            **PARAMS_TFIDF,
+            stop_words=stopwords_modelo(),
+            # O Regex abaixo aceita apenas LETRAS e palavras com 3 ou mais caracteres
+            token_pattern=PADRAO_TOKEN_ML
+        )
+        return {"X": tfidf.fit_transform(df['assunto'].astype(str)), "y": df['alvo'].to_numpy(), "tfidf": tfidf}
+
+    matriz = em_cache("tfidf", chave, vetorizar)
+    X, y, tfidf = matriz["X"], pd.Series(matriz["y"]), matriz["tfidf"]
     
     # Adicione isso temporariamente para ver a porcentagem real
     print((y.map({0: 'Dentro do prazo', 1: 'Atrasado'})
@@ -69,52 +177,224 @@ def treinar_modelo_completo():
         .astype(str) + "%")
 
     # 4. BALANCEAMENTO (SMOTE)
-    print("   -> Aplicando SMOTE...")
-    smote = SMOTE(random_state=42)
-    X_res, y_res = smote.fit_resample(X, y)
-
-    # 5. TUNING (GridSearch)
-    print("   -> Otimizando Modelo...")
-    param_grid = {'n_estimators': [50, 100], 'max_depth': [10, None]}
-    rf = RandomForestClassifier(random_state=42, n_jobs=-1)
-    grid = GridSearchCV(rf, param_grid, cv=2, n_jobs=-1)
-    grid.fit(X_res, y_res)
-    best_model = grid.best_estimator_
-
-    # 6. EXPORTAÇÃO
-    os.makedirs("data/processed", exist_ok=True)
-    with open(PATH_MODEL, 'wb') as f: pickle.dump(best_model, f)
-    with open(PATH_VECTORIZER, 'wb') as f: pickle.dump(tfidf, f)
-
-    # 7. SHAP GLOBAL (CORRIGIDO)
-    print("   -> Calculando SHAP Global (Amostra de 50)...")
-    
-    # DEFINIÇÃO DA AMOSTRA (Resolve o NameError)
-    X_sample = X_res[:50].toarray() 
-    
-    # Configuração robusta para evitar o ExplainerError
-    explainer = shap.TreeExplainer(best_model, feature_perturbation='interventional', data=X_sample)
-    
-    # Geração dos valores ignorando erros de soma (check_additivity=False)
-    shap_values = explainer.shap_values(X_sample, check_additivity=False)
-    
-    # Tratamento de dimensões para o DataFrame
-    if isinstance(shap_values, list):
-        s_val = shap_values[1] # Classe Atraso
-    elif len(shap_values.shape) == 3:
-        s_val = shap_values[:, :, 1]
-    else:
-        s_val = shap_values
+    def reamostrar():
+        print("   -> Aplicando SMOTE...")
+        X_res, y_res = SMOTE(random_state=42).fit_resample(X, y)
+        return {"X": X_res, "y": np.asarray(y_res)}
+
+    reamostrado = em_cache("smote", chave, reamostrar)
+    X_res, y_res = reamostrado["X"], reamostrado["y"]
+
+    # 5. TUNING (Successive Halving com orçamento de tempo)
+    print(f"   -> Otimizando Modelo (halving, orçamento de {ORCAMENTO_BUSCA_S}s)...")
+    melhores_params = busca_halving(X_res, y_res)
+    best_model = RandomForestClassifier(random_state=42, n_jobs=-1, **melhores_params)
+    best_model.fit(X_res, y_res)
 
-    imp = np.abs(s_val).mean(axis=0).flatten()
-    termos = tfidf.get_feature_names_out()
+    # 6. EXPORTAÇÃO (nova versão + manifesto: o painel troca de modelo sem reiniciar)
+    versao = publicar_modelo(best_model, tfidf)
+    print(f"   -> Modelo publicado (versão {versao}).")
 
-    df_shap = pd.DataFrame({'Termo': termos, 'Impacto': imp})
-    df_shap = df_shap.sort_values('Impacto', ascending=False).head(15)
-    df_shap.to_parquet(PATH_SHAP_GLOBAL)
+    # 7. SHAP GLOBAL (amostra estratificada de linhas reais, sem as sintéticas do SMOTE)
+    print(f"   -> Calculando SHAP Global (amostra de {TAMANHO_AMOSTRA_SHAP:,} linhas reais)...")
+    indices = amostra_estratificada(y.to_numpy(), TAMANHO_AMOSTRA_SHAP)
+    df_shap, n = calcular_shap_global(best_model, X[indices], tfidf.get_feature_names_out())
+    salvar_shap_global(df_shap, n, versao)
 
     print("🏁 [IA] Sucesso!")
-    
+
+
+# =============================================================================
+# MODO INCREMENTAL: HashingVectorizer (sem estado) + SGD com partial_fit
+# =============================================================================
+
+def chaves_registros(df, col_data, prazo):
+    """
+    Hash (uint64) de cada manifestação: data, órgão, assunto e prazo. São os campos que o
+    modelo vê (texto e alvo), então registros com a mesma chave são intercambiáveis.
+    """
+    campos = pd.DataFrame({
+        "data": df[col_data].astype(str) if col_data else "",
+        "orgao": df['orgao'].astype(str) if 'orgao' in df.columns else "",
+        "assunto": df['assunto'].astype(str),
+        "prazo": prazo.to_numpy(),
+    }, index=df.index)
+    return pd.util.hash_pandas_object(campos, index=False).to_numpy()
+
+
+def ler_lotes(vistas=None):
+    """
+    Lê a base em lotes só com as colunas necessárias e devolve (textos, alvo, registros),
+    onde registros tem o mês (MES) e a chave (CHAVE, ver chaves_registros) de cada linha.
+    Com `vistas` (Series chave -> ocorrências já treinadas) pula, em cada chave, as
+    ocorrências já treinadas: as que chegaram depois entram, em qualquer ordem de arquivo.
+    """
+    arquivo = pq.ParquetFile(PATH_DATA)
+    colunas = [c for c in arquivo.schema_arrow.names
+               if str(c).lower().strip() in ('assunto', 'orgao', 'prazo_calc', 'dias_resolucao') or 'data' in str(c).lower()]
+    lidas = contar_chaves([])  # ocorrências de cada chave já percorridas nos lotes anteriores
+
+    for lote in arquivo.iter_batches(batch_size=TAMANHO_LOTE, columns=colunas):
+        df = lote.to_pandas()
+        df.columns = [str(c).lower().strip() for c in df.columns]
+
+        prazo = calcular_prazo(df)
+        if prazo is None or 'assunto' not in df.columns:
+            raise ValueError("Base sem ASSUNTO ou sem colunas para calcular o prazo (DIAS_RESOLUCAO / datas).")
+
+        col_data = 'data' if 'data' in df.columns else next((c for c in df.columns if 'data' in c and 'regist' in c), None)
+        meses = pd.to_datetime(df[col_data], errors='coerce').dt.strftime("%Y-%m") if col_data else pd.Series("", index=df.index)
+        registros = pd.DataFrame({"MES": meses.fillna(""), "CHAVE": chaves_registros(df, col_data, prazo)}, index=df.index)
+
+        if vistas is not None and len(vistas):
+            chaves = registros["CHAVE"]
+            ocorrencia = chaves.groupby(chaves).cumcount() + chaves.map(lidas).fillna(0).astype(np.int64)
+            manter = (ocorrencia >= chaves.map(vistas).fillna(0)).to_numpy()
+            lidas = lidas.add(chaves.value_counts(), fill_value=0).astype(np.int64)
+        else:
+            manter = np.ones(len(df), dtype=bool)
+        if not manter.any(): continue
+        yield df.loc[manter, 'assunto'], (prazo[manter] > LIMITE_PRAZO).astype(int).to_numpy(), registros[manter]
+
+
+def marca_legada(artefato):
+    """
+    Marca por chave para modelos salvos com a marca antiga: linhas por mês na ordem do
+    arquivo (`linhas_por_mes`) ou, antes dela, tudo até `ultimo_mes`.
+    """
+    por_mes = artefato.get("linhas_por_mes")
+    lidas = pd.Series(0, dtype=np.int64)
+    vistas = []
+    for _, _, registros in ler_lotes():
+        meses = registros["MES"]
+        if por_mes is None:
+            treinadas = (meses <= artefato["ultimo_mes"]).to_numpy()
+        else:
+            posicao = meses.groupby(meses).cumcount() + meses.map(lidas).fillna(0).astype(np.int64)
+            treinadas = (posicao < meses.map(por_mes).fillna(0)).to_numpy()
+            lidas = lidas.add(meses.value_counts(), fill_value=0).astype(np.int64)
+        vistas.append(registros["CHAVE"].to_numpy()[treinadas])
+    return contar_chaves(vistas)
+
+
+def contar_chaves(chaves):
+    """Series chave -> ocorrências a partir de uma lista de arrays de chaves."""
+    # Índice sempre uint64: somar com um índice vazio de outro tipo converteria os hashes
+    if not chaves: return pd.Series(dtype=np.int64, index=pd.Index([], dtype=np.uint64))
+    return pd.Series(np.concatenate(chaves)).value_counts().astype(np.int64)
+
+
+def vetorizar_lote(vetorizador, textos):
+    """Vetoriza cada assunto distinto uma única vez e replica para as linhas."""
+    codigos, distintos = pd.factorize(textos.fillna("").astype(str))
+    return vetorizador.transform(distintos)[codigos]
+
+
+def novo_modelo_incremental():
+    vetorizador = HashingVectorizer(
+        n_features=N_FEATURES_HASH,
+        alternate_sign=False,
+        stop_words=stopwords_modelo(),
+        token_pattern=PADRAO_TOKEN_ML,
+    )
+    modelo = SGDClassifier(loss="log_loss", alpha=1e-5, random_state=42)
+    return {
+        "modelo": modelo,
+        "vetorizador": vetorizador,
+        "contagem_classes": np.zeros(2, dtype=np.int64),
+        "linhas_vistas": 0,
+        "ultimo_mes": "",
+        "marca_registros": contar_chaves([]),  # marca d'água: chave -> ocorrências treinadas
+    }
+
+
+def treinar_lotes(artefato, vistas=None, epocas=1):
+    """
+    Passa os lotes pelo partial_fit. O desbalanceamento é tratado por peso de classe
+    ("balanced" sobre a contagem acumulada), no lugar do SMOTE.
+    Na primeira época cada lote é avaliado antes de treinar (validação progressiva).
+    """
+    modelo, vetorizador = artefato["modelo"], artefato["vetorizador"]
+    contagem = artefato["contagem_classes"]
+    confusao = np.zeros((2, 2), dtype=np.int64)  # [real, previsto]
+    novas_linhas = 0
+    treinadas = []  # chaves das linhas novas, somadas à marca no fim
+
+    for epoca in range(epocas):
+        for textos, y, registros in ler_lotes(vistas):
+            X = vetorizar_lote(vetorizador, textos)
+            if epoca == 0:
+                if hasattr(modelo, "coef_"):
+                    np.add.at(confusao, (y, modelo.predict(X)), 1)
+                contagem += np.bincount(y, minlength=2)
+                novas_linhas += len(y)
+                artefato["ultimo_mes"] = max(artefato["ultimo_mes"], registros["MES"].max())
+                treinadas.append(registros["CHAVE"].to_numpy())
+
+            pesos_classe = contagem.sum() / (2 * np.maximum(contagem, 1))
+            modelo.partial_fit(X, y, classes=CLASSES, sample_weight=pesos_classe[y])
+        print(f"   -> Época {epoca + 1}/{epocas}: {novas_linhas:,} linhas.")
+
+    artefato["linhas_vistas"] += novas_linhas
+    artefato["marca_registros"] = artefato["marca_registros"].add(
+        contar_chaves(treinadas), fill_value=0).astype(np.int64)
+    artefato["atualizado_em"] = datetime.now().isoformat(timespec="seconds")
+
+    if confusao.sum():
+        recall = confusao.diagonal() / np.maximum(confusao.sum(axis=1), 1)
+        print(f"   -> Acurácia balanceada (progressiva): {recall.mean() * 100:.1f}%")
+    return novas_linhas
+
+
+def salvar_modelo_incremental(artefato):
+    temporario = f"{PATH_MODELO_INCREMENTAL}.tmp"
+    with open(temporario, 'wb') as f: pickle.dump(artefato, f)
+    os.replace(temporario, PATH_MODELO_INCREMENTAL)
+    tamanho_kb = os.path.getsize(PATH_MODELO_INCREMENTAL) / 1024
+    print(f"   -> Salvo em {PATH_MODELO_INCREMENTAL} ({tamanho_kb:.0f} KB, até {artefato['ultimo_mes']}).")
+
+
+def treinar_modelo_incremental():
+    """Treino do zero sobre a base inteira, lida em lotes (memória constante)."""
+    print("🚀 [IA] Treino incremental (Hashing + SGD) sobre a base completa...")
+    if not os.path.exists(PATH_DATA):
+        print(f"❌ Arquivo {PATH_DATA} não encontrado.")
+        return
+
+    artefato = novo_modelo_incremental()
+    treinar_lotes(artefato, epocas=EPOCAS)
+    salvar_modelo_incremental(artefato)
+    print("🏁 [IA] Sucesso!")
+
+
+def atualizar_modelo_incremental():
+    """
+    Atualização mensal: treina só as manifestações que ainda não passaram pelo modelo.
+    A marca d'água conta as ocorrências treinadas de cada chave de registro, então as que
+    chegam atrasadas (em qualquer mês) entram e a ordem dos CSVs no ETL não importa.
+    """
+    print("🔄 [IA] Atualizando modelo incremental com os meses novos...")
+    if not os.path.exists(PATH_MODELO_INCREMENTAL):
+        print("   ⚠️ Modelo incremental não encontrado: treinando do zero.")
+        return treinar_modelo_incremental()
+
+    with open(PATH_MODELO_INCREMENTAL, 'rb') as f: artefato = pickle.load(f)
+    if "marca_registros" not in artefato:
+        print("   ⚠️ Modelo com a marca antiga: convertendo para a marca por registro.")
+        artefato["marca_registros"] = marca_legada(artefato)
+        artefato.pop("linhas_por_mes", None)
+    if not treinar_lotes(artefato, vistas=artefato["marca_registros"]):
+        print("   -> Nenhuma manifestação nova desde a última atualização.")
+        return
+    salvar_modelo_incremental(artefato)
+    print("🏁 [IA] Sucesso!")
+
 
 if __name__ == "__main__":
-    treinar_modelo_completo()
\ No newline at end of file
+    # python scripts/train_ml.py [--incremental | --atualizar]
+    if "--incremental" in sys.argv:
+        treinar_modelo_incremental()
+    elif "--atualizar" in sys.argv:
+        atualizar_modelo_incremental()
+    else:
+        treinar_modelo_completo()
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+API JSON de predição em lote do risco de atraso (SLA), registrada no servidor Flask do Dash.
+
+POST /api/risco            {"textos": ["...", "..."], "top_termos": 5}
+GET  /api/risco/metricas   limites e latência dos últimos lotes
+"""
+import threading
+import time
+from collections import deque
+
+import numpy as np
+from flask import jsonify, request
+
+from utils.modelos import obter_modelo
+
+LIMITE_LOTE = 1000      # textos por requisição
+LIMITE_TOP_TERMOS = 20
+LIMIAR_RISCO = 0.5      # mesmo corte da página de IA
+HISTORICO_LOTES = 500   # lotes guardados para as métricas
+
+_lotes = deque(maxlen=HISTORICO_LOTES)
+_lock_metricas = threading.Lock()
+_totais = {"lotes": 0, "textos": 0, "rejeitados": 0}
+
+
+def termos_principais(matriz, importancias, termos, top):
+    """
+    Termos que mais contribuem em cada texto: peso TF-IDF x importância do termo no modelo.
+    Percorre só os valores não nulos de cada linha da matriz esparsa (CSR).
+    """
+    contrib = matriz.multiply(importancias).tocsr()
+    resultado = []
+    for i in range(contrib.shape[0]):
+        inicio, fim = contrib.indptr[i], contrib.indptr[i + 1]
+        colunas, valores = contrib.indices[inicio:fim], contrib.data[inicio:fim]
+        ordem = np.argsort(valores)[::-1][:top]
+        resultado.append([{"termo": termos[colunas[j]], "peso": round(float(valores[j]), 6)} for j in ordem])
+    return resultado
+
+
+def _erro(mensagem, status):
+    with _lock_metricas:
+        _totais["rejeitados"] += 1
+    return jsonify({"erro": mensagem}), status
+
+
+def prever_lote(textos, top=5):
+    """Uma única passada de transform + predict_proba para todo o lote."""
+    artefatos = obter_modelo()
+    if artefatos is None:
+        return None
+
+    inicio = time.perf_counter()
+    matriz = artefatos["vetorizador"].transform(textos)
+    t_vetorizar = time.perf_counter()
+    probabilidades = artefatos["modelo"].predict_proba(matriz)[:, 1]
+    t_prever = time.perf_counter()
+    termos = termos_principais(matriz, artefatos["modelo"].feature_importances_, artefatos["termos"], top) if top else None
+    t_fim = time.perf_counter()
+
+    latencia = {
+        "vetorizar": round((t_vetorizar - inicio) * 1000, 2),
+        "prever": round((t_prever - t_vetorizar) * 1000, 2),
+        "termos": round((t_fim - t_prever) * 1000, 2),
+        "total": round((t_fim - inicio) * 1000, 2),
+    }
+    with _lock_metricas:
+        _lotes.append((len(textos), latencia["total"]))
+        _totais["lotes"] += 1
+        _totais["textos"] += len(textos)
+
+    resultados = []
+    for i, p in enumerate(probabilidades):
+        item = {"probabilidade": round(float(p), 4), "alto_risco": bool(p > LIMIAR_RISCO)}
+        if termos is not None:
+            item["termos"] = termos[i]
+        resultados.append(item)
+    return {"versao_modelo": artefatos["versao"], "n": len(textos), "latencia_ms": latencia, "resultados": resultados}
+
+
+def metricas():
+    with _lock_metricas:
+        lotes = list(_lotes)
+        totais = dict(_totais)
+    resumo = {"limite_lote": LIMITE_LOTE, "limite_top_termos": LIMITE_TOP_TERMOS, **totais}
+    if lotes:
+        tamanhos, latencias = np.array(lotes).T
+        resumo["ultimos_lotes"] = {
+            "n": len(lotes),
+            "tamanho_medio": round(float(tamanhos.mean()), 1),
+            "latencia_ms_p50": round(float(np.percentile(latencias, 50)), 2),
+            "latencia_ms_p95": round(float(np.percentile(latencias, 95)), 2),
+            "latencia_ms_max": round(float(latencias.max()), 2),
+            "ms_por_texto": round(float(latencias.sum() / tamanhos.sum()), 4),
+        }
+    return resumo
+
+
+def registrar_api(server):
+    """Registra as rotas da API no Flask (app.server)."""
+
+    @server.route("/api/risco", methods=["POST"])
+    def api_risco():
+        corpo = request.get_json(silent=True)
+        if not isinstance(corpo, dict) or not isinstance(corpo.get("textos"), list):
+            return _erro('Envie um JSON no formato {"textos": ["...", ...]}.', 400)
+
+        textos = corpo["textos"]
+        if not textos:
+            return _erro("A lista de textos está vazia.", 400)
+        if len(textos) > LIMITE_LOTE:
+            return _erro(f"Lote com {len(textos)} textos excede o limite de {LIMITE_LOTE}.", 413)
+        if not all(isinstance(t, str) for t in textos):
+            return _erro("Todos os itens de 'textos' devem ser strings.", 400)
+
+        top = corpo.get("top_termos", 5)
+        # bool é subclasse de int: "top_termos": true não pode virar 1
+        if isinstance(top, bool) or not isinstance(top, int) or not 0 <= top <= LIMITE_TOP_TERMOS:
+            return _erro(f"'top_termos' deve ser um inteiro entre 0 e {LIMITE_TOP_TERMOS}.", 400)
+
+        resposta = prever_lote(textos, top)
+        if resposta is None:
+            return _erro("Modelo de IA não encontrado. Execute scripts/train_ml.py.", 503)
+        return jsonify(resposta)
+
+    @server.route("/api/risco/metricas", methods=["GET"])
+    def api_risco_metricas():
+        return jsonify(metricas())
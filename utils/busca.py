@@ -0,0 +1,113 @@
+"""
+Índice invertido (termo -> linhas) para busca textual na Ouvidoria.
+O índice é gerado pelo scripts/etl_indice.py e consultado pelas páginas.
+"""
+import os
+import re
+from functools import lru_cache
+
+import numpy as np
+
+from utils.preprocessamento import carregar_dados_ouvidoria
+from utils.texto import tokenizar
+
+ARQUIVO_INDICE = "data/processed/indice_textos.parquet"
+
+# Palavras que aparecem em quase tudo: não viram termo isolado, só bigrama
+STOPWORDS_BUSCA = {
+    "a", "o", "e", "de", "da", "do", "das", "dos", "em", "na", "no", "nas", "nos",
+    "para", "por", "com", "um", "uma", "ao", "aos", "as", "os", "ou",
+}
+
+_cache_indice = None
+
+
+def termos_indexaveis(tokens):
+    """Unigramas (sem stopwords) + bigramas adjacentes (para busca por frase)."""
+    termos = {t for t in tokens if t not in STOPWORDS_BUSCA and len(t) > 1}
+    termos.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return termos
+
+
+def interpretar_consulta(consulta):
+    """
+    Converte a consulta em termos do índice (todos obrigatórios).
+    Ex: 'aposentadoria "auxilio emergencial"' -> ['aposentadoria', 'auxilio emergencial']
+    """
+    termos = []
+    for frase, palavra in re.findall(r'"([^"]+)"|(\S+)', consulta or ""):
+        tokens = tokenizar(frase or palavra)
+        if len(tokens) == 1:
+            termos.append(tokens[0])
+        else:
+            termos.extend(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return list(dict.fromkeys(termos))
+
+
+def carregar_indice():
+    """
+    Carrega o índice (termo -> posição da lista de postings). Retorna None se ele não
+    existir ou estiver desatualizado (gerado sobre outra quantidade de linhas da Ouvidoria):
+    os ids de linha não batem mais com o DataFrame.
+    """
+    global _cache_indice
+    if _cache_indice is not None: return _cache_indice or None
+    if not os.path.exists(ARQUIVO_INDICE): return None
+
+    try:
+        import pyarrow.parquet as pq
+        tabela = pq.read_table(ARQUIVO_INDICE)
+        meta = tabela.schema.metadata or {}
+        n_linhas = int(meta.get(b"n_linhas", b"0"))
+        n_dados = len(carregar_dados_ouvidoria())
+        if n_linhas and n_linhas != n_dados:
+            print(f"⚠️ Índice de busca desatualizado ({n_linhas:,} linhas, dados com {n_dados:,}). "
+                  "Execute o etl_indice.py.")
+            _cache_indice = {}
+            return None
+
+        postings = tabela.column("POSTINGS").combine_chunks()
+        _cache_indice = {
+            "posicao": {t: i for i, t in enumerate(tabela.column("TERMO").to_pylist())},
+            "offsets": postings.offsets.to_numpy(),
+            "deltas": postings.values.to_numpy(),
+            "n_linhas": n_linhas,
+        }
+        return _cache_indice
+    except Exception as e:
+        print(f"❌ Erro Índice: {e}")
+        return None
+
+
+@lru_cache(maxsize=256)
+def linhas_do_termo(termo):
+    """Decodifica a lista de postings (ids de linha em delta) de um termo."""
+    indice = carregar_indice()
+    i = indice["posicao"].get(termo) if indice else None
+    if i is None: return np.empty(0, dtype=np.int64)
+    ini, fim = indice["offsets"][i], indice["offsets"][i + 1]
+    return np.cumsum(indice["deltas"][ini:fim], dtype=np.int64)
+
+
+def buscar(consulta):
+    """
+    Retorna os ids de linha (ordenados) que contêm todos os termos/frases da consulta,
+    ou None se não houver consulta ou índice.
+    """
+    termos = interpretar_consulta(consulta)
+    if not termos or carregar_indice() is None: return None
+
+    # Começa pela lista mais curta para a interseção encolher rápido
+    listas = sorted((linhas_do_termo(t) for t in termos), key=len)
+    resultado = listas[0]
+    for linhas in listas[1:]:
+        if resultado.size == 0: break
+        resultado = np.intersect1d(resultado, linhas, assume_unique=True)
+    return resultado
+
+
+def mascara_busca(df, consulta):
+    """Máscara booleana das linhas do DataFrame que atendem à busca, ou None sem consulta/índice."""
+    linhas = buscar(consulta)
+    if linhas is None: return None
+    return df.index.isin(linhas)
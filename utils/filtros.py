@@ -0,0 +1,51 @@
+"""
+Filtros das páginas num dcc.Store e linhas filtradas em cache por processo.
+
+Cada página grava os filtros normalizados num dcc.Store (callback leve) e cada KPI ou
+gráfico é um callback próprio com o Store como Input. Assim os indicadores baratos não
+esperam o gráfico mais lento e, num servidor com threads ou vários workers, os callbacks
+rodam em paralelo. As linhas de cada combinação de filtros vêm de uma função `linhas_*`
+da página decorada com lru_cache(TAMANHO_CACHE_RECORTES): o primeiro callback calcula
+as máscaras, os demais reaproveitam.
+
+O cache guarda só as posições das linhas (int32, 4 bytes por linha selecionada; None
+quando nenhum filtro restringe), não cópias do DataFrame: cada callback monta o próprio
+recorte com recortar(df, linhas), que é liberado ao fim da chamada.
+"""
+import numpy as np
+
+TAMANHO_CACHE_RECORTES = 16  # combinações de filtro guardadas por página e processo
+
+
+def normalizar_filtros(**valores):
+    """
+    Valores dos componentes de filtro em forma canônica (serializável para o Store):
+    listas ordenadas e sem repetição, texto sem espaços nas pontas, vazio vira None.
+    """
+    filtros = {}
+    for nome, valor in valores.items():
+        if isinstance(valor, str):
+            valor = valor.strip() or None
+        elif valor is not None:
+            lista = valor if isinstance(valor, list) else [valor]
+            valor = sorted(set(lista), key=str) or None
+        filtros[nome] = valor
+    return filtros
+
+
+def chave(filtros, nome):
+    """Valor de um filtro do Store pronto para argumento de função em lru_cache (lista -> tupla)."""
+    valor = (filtros or {}).get(nome)
+    return tuple(valor) if isinstance(valor, list) else valor
+
+
+def posicoes(mascara):
+    """Posições das linhas True de uma máscara booleana (int32 enquanto couber)."""
+    mascara = np.asarray(mascara, dtype=bool)
+    tipo = np.int32 if mascara.size < np.iinfo(np.int32).max else np.int64
+    return np.flatnonzero(mascara).astype(tipo, copy=False)
+
+
+def recortar(df, linhas):
+    """Recorte de `df` pelas posições em cache (None = base inteira, sem cópia)."""
+    return df if linhas is None else df.iloc[linhas]
@@ -0,0 +1,315 @@
+"""
+Instrumentação dos callbacks do Dash e endpoint /metrics (formato texto do Prometheus).
+
+Toda requisição a /_dash-update-component é medida automaticamente: tempo total,
+tempo dentro da função do callback (o restante é o Dash decodificando as entradas e
+serializando a resposta), bytes recebidos/enviados e status. Dentro de um callback,
+marcar_etapa("filtro") / etapa("figura") separam o tempo por etapa e
+registrar_linhas(n) conta as linhas processadas.
+
+Callbacks mais lentos que LIMITE_LENTO_S vão para LOG_LENTOS (JSON por linha),
+com os valores de entrada.
+
+Callbacks em segundo plano (utils/segundo_plano.py) rodam fora da requisição, num
+processo filho: o job é medido por medir_job e o registro volta ao worker por uma
+coleta (registrar_coleta) lida a cada /metrics. As consultas do navegador a esses jobs
+aparecem como "<callback>:consulta".
+"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+
+from dash.exceptions import PreventUpdate
+from flask import Response, g, has_request_context, request
+
+ROTA_CALLBACK = "/_dash-update-component"
+LIMITE_LENTO_S = float(os.environ.get("OUVIDORIA_LIMITE_LENTO_S", 1.0))
+LOG_LENTOS = "logs/callbacks_lentos.jsonl"
+TAMANHO_MAX_VALOR = 500  # caracteres de cada entrada guardados no log de lentos
+
+# Limites dos buckets do histograma de duração (segundos)
+BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_lock = threading.Lock()
+_callbacks = {}         # nome -> estatísticas acumuladas
+_nomes = {}             # id de saída do Dash -> nome da função
+_segundo_plano = set()  # ids de saída dos callbacks em segundo plano
+_coletas = []           # funções que devolvem registros de medições feitas fora do worker
+
+# Medição do job em segundo plano (tem prioridade: o processo filho herda do fork o
+# contexto da requisição que criou o job, cujo `g` não volta para o worker)
+_medicao_job = ContextVar("medicao_job", default=None)
+
+
+def _novas_estatisticas():
+    return {
+        "buckets": [0] * (len(BUCKETS) + 1),
+        "soma_s": 0.0,
+        "contagem": 0,
+        "erros": 0,
+        "funcao_s": 0.0,
+        "etapas": {},  # etapa -> [soma_s, contagem]
+        "bytes_entrada": 0,
+        "bytes_saida": 0,
+        "linhas": 0,
+    }
+
+
+# --- API USADA DENTRO DOS CALLBACKS (sem efeito fora de uma requisição) ---
+
+def _medicao():
+    medicao = _medicao_job.get()
+    if medicao is not None:
+        return medicao
+    return g.get("_medicao_callback") if has_request_context() else None
+
+
+def _nova_medicao():
+    agora = time.perf_counter()
+    return {"inicio": agora, "marca": agora, "funcao_s": 0.0, "etapas": {}, "linhas": 0}
+
+
+def marcar_etapa(nome):
+    """Atribui à etapa `nome` o tempo desde a marca anterior (ou desde o início do callback)."""
+    medicao = _medicao()
+    if medicao is None:
+        return
+    agora = time.perf_counter()
+    medicao["etapas"][nome] = medicao["etapas"].get(nome, 0.0) + agora - medicao["marca"]
+    medicao["marca"] = agora
+
+
+@contextmanager
+def etapa(nome):
+    """Mede um bloco como a etapa `nome`."""
+    medicao = _medicao()
+    if medicao is not None:
+        medicao["marca"] = time.perf_counter()
+    try:
+        yield
+    finally:
+        marcar_etapa(nome)
+
+
+def registrar_linhas(n):
+    """Soma `n` às linhas processadas pelo callback atual."""
+    medicao = _medicao()
+    if medicao is not None:
+        medicao["linhas"] += int(n)
+
+
+@contextmanager
+def medir_job(nome, entradas, publicar):
+    """
+    Mede um callback executado fora da requisição (job em segundo plano). marcar_etapa e
+    registrar_linhas valem dentro do bloco; no fim, publicar(registro) entrega a medição
+    (o worker a soma com acumular_registro) e jobs lentos vão para LOG_LENTOS.
+    `entradas` segue o formato do corpo do Dash: [{"id", "property", "value"}].
+    """
+    medicao = _nova_medicao()
+    token = _medicao_job.set(medicao)
+    erro = False
+    try:
+        yield medicao
+    except PreventUpdate:
+        raise
+    except Exception:
+        erro = True
+        raise
+    finally:
+        _medicao_job.reset(token)
+        duracao = time.perf_counter() - medicao["inicio"]
+        medicao["funcao_s"] = duracao
+        publicar({"callback": nome, "duracao_s": duracao, "funcao_s": duracao, "etapas": medicao["etapas"],
+                  "linhas": medicao["linhas"], "bytes_entrada": 0, "bytes_saida": 0, "erro": erro})
+        if duracao > LIMITE_LENTO_S:
+            _registrar_lento(nome, duracao, medicao, entradas, 0)
+
+
+def registrar_coleta(funcao):
+    """funcao() -> lista de registros de medir_job, somados às métricas a cada /metrics."""
+    _coletas.append(funcao)
+
+
+def acumular_registro(registro):
+    nome, duracao = registro["callback"], registro["duracao_s"]
+    with _lock:
+        est = _callbacks.setdefault(nome, _novas_estatisticas())
+        est["buckets"][next((i for i, b in enumerate(BUCKETS) if duracao <= b), len(BUCKETS))] += 1
+        est["soma_s"] += duracao
+        est["contagem"] += 1
+        est["erros"] += registro["erro"]
+        est["funcao_s"] += registro["funcao_s"]
+        for etapa_nome, segundos in registro["etapas"].items():
+            acumulado = est["etapas"].setdefault(etapa_nome, [0.0, 0])
+            acumulado[0] += segundos
+            acumulado[1] += 1
+        est["bytes_entrada"] += registro["bytes_entrada"]
+        est["bytes_saida"] += registro["bytes_saida"]
+        est["linhas"] += registro["linhas"]
+
+
+# --- HOOKS DO FLASK ---
+
+def _instrumentar_dash():
+    """
+    Cronometra só a função do usuário envolvendo dash._callback._invoke_callback
+    (chamada pelo Dash para executar cada callback). Se a função não existir nesta
+    versão do Dash, fica apenas o tempo total da requisição.
+    """
+    import dash._callback as dash_callback
+
+    original = getattr(dash_callback, "_invoke_callback", None)
+    if original is None or getattr(original, "_medido", False):
+        return
+
+    def invocar(func, *args, **kwargs):
+        medicao = _medicao()
+        if medicao is None:
+            return original(func, *args, **kwargs)
+        inicio = medicao["marca"] = time.perf_counter()
+        try:
+            return original(func, *args, **kwargs)
+        finally:
+            medicao["funcao_s"] += time.perf_counter() - inicio
+
+    invocar._medido = True
+    dash_callback._invoke_callback = invocar
+
+
+def _antes():
+    if request.path != ROTA_CALLBACK:
+        return
+    g._medicao_callback = _nova_medicao()
+
+
+def _depois(resposta):
+    medicao = _medicao()
+    if medicao is None:
+        return resposta
+
+    duracao = time.perf_counter() - medicao["inicio"]
+    corpo = request.get_json(silent=True) or {}
+    saida = corpo.get("output")
+    nome = _nomes.get(saida, saida or "desconhecido")
+    if saida in _segundo_plano:
+        nome = f"{nome}:consulta"  # criação do job e consultas; o job em si vem de medir_job
+    bytes_saida = resposta.calculate_content_length() or 0
+
+    acumular_registro({"callback": nome, "duracao_s": duracao, "funcao_s": medicao["funcao_s"],
+                       "etapas": medicao["etapas"], "linhas": medicao["linhas"],
+                       "bytes_entrada": request.content_length or 0, "bytes_saida": bytes_saida,
+                       "erro": resposta.status_code >= 400})
+
+    if duracao > LIMITE_LENTO_S:
+        entradas = (corpo.get("inputs") or []) + (corpo.get("state") or [])
+        _registrar_lento(nome, duracao, medicao, entradas, bytes_saida)
+    return resposta
+
+
+def _resumir_valor(valor):
+    texto = json.dumps(valor, ensure_ascii=False, default=str)
+    return valor if len(texto) <= TAMANHO_MAX_VALOR else texto[:TAMANHO_MAX_VALOR] + "..."
+
+
+def _registrar_lento(nome, duracao, medicao, entradas, bytes_saida):
+    entradas = [
+        {"id": e.get("id"), "propriedade": e.get("property"), "valor": _resumir_valor(e.get("value"))}
+        for e in entradas
+        if isinstance(e, dict)  # entradas com padrão (ALL/MATCH) chegam como listas
+    ]
+    registro = {
+        "quando": datetime.now().isoformat(timespec="seconds"),
+        "callback": nome,
+        "duracao_s": round(duracao, 4),
+        "funcao_s": round(medicao["funcao_s"], 4),
+        "etapas_s": {k: round(v, 4) for k, v in medicao["etapas"].items()},
+        "linhas": medicao["linhas"],
+        "bytes_saida": bytes_saida,
+        "entradas": entradas,
+    }
+    print(f"🐢 Callback lento: {nome} em {registro['duracao_s']}s")
+    try:
+        os.makedirs(os.path.dirname(LOG_LENTOS), exist_ok=True)
+        with _lock, open(LOG_LENTOS, "a", encoding="utf-8") as f:
+            f.write(json.dumps(registro, ensure_ascii=False, default=str) + "\n")
+    except OSError as e:
+        print(f"⚠️ Não foi possível gravar {LOG_LENTOS}: {e}")
+
+
+# --- EXPOSIÇÃO ---
+
+def _rotulo(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def texto_prometheus():
+    """Métricas acumuladas no formato de exposição texto do Prometheus."""
+    for coletar in _coletas:
+        for registro in coletar():
+            acumular_registro(registro)
+    with _lock:
+        estatisticas = {nome: {**est, "buckets": list(est["buckets"]),
+                               "etapas": {k: list(v) for k, v in est["etapas"].items()}}
+                        for nome, est in _callbacks.items()}
+
+    linhas = [
+        "# HELP dash_callback_duracao_segundos Tempo total da requisição do callback.",
+        "# TYPE dash_callback_duracao_segundos histogram",
+    ]
+    for nome, est in estatisticas.items():
+        cb = _rotulo(nome)
+        acumulado = 0
+        for limite, qtd in zip(BUCKETS + ("+Inf",), est["buckets"]):
+            acumulado += qtd
+            linhas.append(f'dash_callback_duracao_segundos_bucket{{callback="{cb}",le="{limite}"}} {acumulado}')
+        linhas.append(f'dash_callback_duracao_segundos_sum{{callback="{cb}"}} {est["soma_s"]:.6f}')
+        linhas.append(f'dash_callback_duracao_segundos_count{{callback="{cb}"}} {est["contagem"]}')
+
+    contadores = [
+        ("dash_callback_erros_total", "Requisições com status >= 400.", "erros", "{}"),
+        ("dash_callback_funcao_segundos_total", "Tempo dentro da função do callback.", "funcao_s", "{:.6f}"),
+        ("dash_callback_bytes_entrada_total", "Bytes recebidos (entradas do callback).", "bytes_entrada", "{}"),
+        ("dash_callback_bytes_saida_total", "Bytes da resposta (figuras serializadas).", "bytes_saida", "{}"),
+        ("dash_callback_linhas_total", "Linhas processadas (registrar_linhas).", "linhas", "{}"),
+    ]
+    for metrica, ajuda, chave, formato in contadores:
+        linhas += [f"# HELP {metrica} {ajuda}", f"# TYPE {metrica} counter"]
+        linhas += [f'{metrica}{{callback="{_rotulo(n)}"}} {formato.format(e[chave])}' for n, e in estatisticas.items()]
+
+    # Tempo fora da função: decodificação das entradas + serialização da resposta pelo Dash
+    linhas += ["# HELP dash_callback_etapa_segundos Tempo por etapa do callback.",
+               "# TYPE dash_callback_etapa_segundos summary"]
+    for nome, est in estatisticas.items():
+        etapas = dict(est["etapas"])
+        if est["funcao_s"]:
+            etapas["serializacao"] = [max(est["soma_s"] - est["funcao_s"], 0.0), est["contagem"]]
+        for etapa_nome, (soma, contagem) in etapas.items():
+            rotulos = f'callback="{_rotulo(nome)}",etapa="{_rotulo(etapa_nome)}"'
+            linhas.append(f"dash_callback_etapa_segundos_sum{{{rotulos}}} {soma:.6f}")
+            linhas.append(f"dash_callback_etapa_segundos_count{{{rotulos}}} {contagem}")
+    return "\n".join(linhas) + "\n"
+
+
+def registrar_metricas(app):
+    """Liga a instrumentação dos callbacks e a rota /metrics no servidor do app Dash."""
+    _instrumentar_dash()
+    server = app.server
+    server.before_request(_antes)
+    server.after_request(_depois)
+
+    # Nome legível da função de cada callback (a chave do Dash é o id das saídas)
+    @server.before_request
+    def _mapear_nomes():
+        if not _nomes and request.path == ROTA_CALLBACK:
+            _segundo_plano.update(saida for saida, cb in app.callback_map.items() if cb.get("background"))
+            _nomes.update({saida: getattr(cb.get("callback"), "__name__", saida)
+                           for saida, cb in app.callback_map.items()})
+
+    @server.route("/metrics", methods=["GET"])
+    def metricas_prometheus():
+        return Response(texto_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,128 @@
+"""
+Registro em memória do modelo de risco (SLA) e do vetorizador TF-IDF.
+Os artefatos são carregados uma vez por processo, aquecidos com uma predição
+e trocados automaticamente quando o scripts/train_ml.py publica uma nova versão
+(manifesto data/processed/modelo_ia.json).
+"""
+import json
+import os
+import pickle
+import threading
+import time
+from datetime import datetime
+
+from utils.explicacao import montar_explicador
+
+PATH_MODEL = "data/processed/modelo_ia.pkl"
+PATH_VECTORIZER = "data/processed/vectorizer.pkl"
+ARQUIVO_MANIFESTO = "data/processed/modelo_ia.json"
+PASTA_VERSOES = "data/processed/modelos"
+
+# Versões antigas mantidas em disco (processos ainda podem estar lendo)
+MANTER_VERSOES = 3
+# Intervalo mínimo entre verificações do manifesto (segundos)
+INTERVALO_VERIFICACAO = 5
+
+_cache_modelo = None
+_ultima_verificacao = 0.0
+_lock = threading.Lock()
+
+
+def ler_manifesto():
+    """Versão publicada e caminhos dos artefatos (ou os caminhos fixos, sem manifesto)."""
+    if os.path.exists(ARQUIVO_MANIFESTO):
+        try:
+            with open(ARQUIVO_MANIFESTO, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"⚠️ Manifesto do modelo ilegível: {e}")
+
+    if not os.path.exists(PATH_MODEL) or not os.path.exists(PATH_VECTORIZER):
+        return None
+    # Sem manifesto a "versão" é a data de modificação dos arquivos
+    versao = f"{os.path.getmtime(PATH_MODEL):.0f}-{os.path.getmtime(PATH_VECTORIZER):.0f}"
+    return {"versao": versao, "modelo": PATH_MODEL, "vetorizador": PATH_VECTORIZER}
+
+
+def _carregar(manifesto):
+    inicio = time.time()
+    with open(manifesto["modelo"], "rb") as f: modelo = pickle.load(f)
+    with open(manifesto["vetorizador"], "rb") as f: vetorizador = pickle.load(f)
+
+    # Aquecimento: a primeira predição paga a inicialização (threads, caches do sklearn)
+    modelo.predict_proba(vetorizador.transform(["aquecimento do modelo"]))
+
+    termos = vetorizador.get_feature_names_out()
+    print(f"🤖 Modelo {manifesto['versao']} carregado em {round(time.time() - inicio, 2)}s.")
+    return {
+        "versao": manifesto["versao"],
+        "modelo": modelo,
+        "vetorizador": vetorizador,
+        "termos": termos,
+        # termo -> coluna da matriz TF-IDF (evita varrer feature_names a cada termo)
+        "vocabulario": {t: i for i, t in enumerate(termos)},
+        # Árvores pré-processadas para o TreeSHAP local (None se o modelo não for de árvores)
+        "explicador": montar_explicador(modelo),
+    }
+
+
+def obter_modelo():
+    """
+    Artefatos do modelo em memória (dict com modelo, vetorizador, termos, vocabulario e explicador)
+    ou None se ainda não houver modelo treinado. Recarrega se houver versão nova.
+    """
+    global _cache_modelo, _ultima_verificacao
+    agora = time.time()
+    if _cache_modelo is not None and agora - _ultima_verificacao < INTERVALO_VERIFICACAO:
+        return _cache_modelo
+
+    with _lock:
+        _ultima_verificacao = agora
+        manifesto = ler_manifesto()
+        if manifesto is None:
+            return _cache_modelo
+        if _cache_modelo is not None and _cache_modelo["versao"] == manifesto["versao"]:
+            return _cache_modelo
+        try:
+            # Troca a referência de uma vez: requisições em andamento terminam na versão antiga
+            _cache_modelo = _carregar(manifesto)
+        except Exception as e:
+            print(f"❌ Erro Modelo: {e}")
+    return _cache_modelo
+
+
+def _gravar_atomico(caminho, escrever, modo="wb"):
+    temporario = f"{caminho}.tmp"
+    with open(temporario, modo, **({} if "b" in modo else {"encoding": "utf-8"})) as f:
+        escrever(f)
+    os.replace(temporario, caminho)
+
+
+def publicar_modelo(modelo, vetorizador):
+    """
+    Salva uma nova versão dos artefatos e só então troca o manifesto (atômico),
+    para que os processos do painel nunca leiam um par modelo/vetorizador misturado.
+    """
+    versao = datetime.now().strftime("%Y%m%d%H%M%S")
+    os.makedirs(PASTA_VERSOES, exist_ok=True)
+    caminho_modelo = os.path.join(PASTA_VERSOES, f"modelo_ia_{versao}.pkl")
+    caminho_vetorizador = os.path.join(PASTA_VERSOES, f"vectorizer_{versao}.pkl")
+
+    for caminho, objeto in [(caminho_modelo, modelo), (caminho_vetorizador, vetorizador),
+                            (PATH_MODEL, modelo), (PATH_VECTORIZER, vetorizador)]:
+        _gravar_atomico(caminho, lambda f: pickle.dump(objeto, f))
+
+    manifesto = {
+        "versao": versao,
+        "modelo": caminho_modelo,
+        "vetorizador": caminho_vetorizador,
+        "publicado_em": datetime.now().isoformat(timespec="seconds"),
+    }
+    _gravar_atomico(ARQUIVO_MANIFESTO, lambda f: json.dump(manifesto, f, indent=1), modo="w")
+
+    # Limpa as versões mais antigas
+    for prefixo in ("modelo_ia_", "vectorizer_"):
+        antigos = sorted(a for a in os.listdir(PASTA_VERSOES) if a.startswith(prefixo))
+        for arquivo in antigos[:-MANTER_VERSOES]:
+            os.remove(os.path.join(PASTA_VERSOES, arquivo))
+    return versao
@@ -0,0 +1,222 @@
+"""
+Captura sob demanda de um perfil (cProfile) da próxima execução de um callback.
+
+1. Defina OUVIDORIA_TOKEN_PERFIL no ambiente do servidor (sem o token a rota não existe).
+2. Arme a captura:  curl -H "X-Perfil-Token: $TOKEN" "http://host/debug/perfilar?callback=update_kpis_ouvidoria"
+   O token só vale no cabeçalho: na URL ele iria parar no access log do gunicorn.
+3. Use o painel normalmente: a próxima execução desse callback roda sob o cProfile e gera em
+   PASTA_PERFIS um .pstats, um .folded (pilhas colapsadas para flamegraph) e um .json com as entradas.
+
+As capturas armadas ficam em ARQUIVO_ARMADOS (cache/), compartilhado pelos workers do gunicorn:
+a próxima execução em qualquer worker consome a captura. Com nada armado o arquivo não existe
+e o custo por callback é um os.path.exists (nenhum profiler ativo). Callbacks em segundo plano
+não passam pelo Dash no processo do job: utils/segundo_plano.py chama executar_perfilado lá dentro.
+"""
+import cProfile
+import hmac
+import json
+import os
+import pstats
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+from flask import has_request_context, jsonify, request
+
+try:
+    import fcntl  # trava entre processos (gunicorn só roda em Unix)
+except ImportError:
+    fcntl = None
+
+PASTA_PERFIS = "profiles"
+VARIAVEL_TOKEN = "OUVIDORIA_TOKEN_PERFIL"
+CABECALHO_TOKEN = "X-Perfil-Token"
+LIMITE_VEZES = 10  # capturas armadas de uma vez para o mesmo callback
+
+# Pilhas colapsadas: ramos abaixo de 0,1% do tempo total não são abertos
+PROFUNDIDADE_MAX_PILHA = 200
+FRACAO_MIN_PILHA = 0.001
+
+# JSON {nome da função do callback: capturas restantes}; removido quando nada está armado
+ARQUIVO_ARMADOS = os.path.join("cache", "perfilamento", "armados.json")
+_lock = threading.Lock()
+
+
+@contextmanager
+def _trava():
+    """Exclusão mútua entre threads (lock) e entre workers (flock no arquivo .lock)."""
+    os.makedirs(os.path.dirname(ARQUIVO_ARMADOS), exist_ok=True)
+    with _lock, open(f"{ARQUIVO_ARMADOS}.lock", "a") as trava:
+        if fcntl is not None:
+            fcntl.flock(trava, fcntl.LOCK_EX)
+        yield
+
+
+def _ler_armados():
+    try:
+        with open(ARQUIVO_ARMADOS, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _gravar_armados(armados):
+    if not armados:
+        if os.path.exists(ARQUIVO_ARMADOS):
+            os.remove(ARQUIVO_ARMADOS)
+        return
+    temporario = f"{ARQUIVO_ARMADOS}.{os.getpid()}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump(armados, f)
+    os.replace(temporario, ARQUIVO_ARMADOS)
+
+
+def armar(nome, vezes=1):
+    with _trava():
+        armados = _ler_armados()
+        armados[nome] = armados.get(nome, 0) + vezes
+        _gravar_armados(armados)
+        return armados
+
+
+def _desarmar(nome):
+    """True se havia captura armada para `nome` (e consome uma)."""
+    if not os.path.exists(ARQUIVO_ARMADOS):
+        return False
+    with _trava():
+        armados = _ler_armados()
+        restantes = armados.get(nome, 0)
+        if not restantes:
+            return False
+        if restantes == 1:
+            del armados[nome]
+        else:
+            armados[nome] = restantes - 1
+        _gravar_armados(armados)
+        return True
+
+
+def pilhas_colapsadas(estatisticas, profundidade_max=PROFUNDIDADE_MAX_PILHA, fracao_min=FRACAO_MIN_PILHA):
+    """
+    Pilhas no formato "a;b;c tempo_us" (flamegraph.pl / speedscope) a partir do grafo
+    chamador -> chamado do cProfile. O cProfile não guarda pilhas completas, então o
+    tempo de cada função é repartido entre os chamadores na proporção do tempo vindo de cada um.
+    É uma aproximação (recursões perdem parte do tempo); o .pstats continua sendo a
+    medida exata. Ramos com menos de `fracao_min` do tempo total (ou além de
+    `profundidade_max`) não são abertos: o tempo deles fica no próprio quadro.
+    """
+    funcoes = estatisticas.stats  # func -> (cc, nc, tt, ct, chamadores)
+    nome = lambda f: f"{os.path.basename(f[0])}:{f[1]}({f[2]})" if f[0] != "~" else f[2]
+
+    # Em funções recursivas o ct das arestas soma mais que o ct da função: as arestas
+    # viram proporções (parte do tempo da função que veio de cada chamador)
+    chamados = {}
+    for func, (_, _, _, ct_func, chamadores) in funcoes.items():
+        arestas = {c: v[3] for c, v in chamadores.items() if c != func}
+        soma = sum(arestas.values())
+        for chamador, ct in arestas.items():
+            chamados.setdefault(chamador, []).append((func, ct_func * ct / soma if soma else 0.0))
+
+    raizes = [f for f, (_, _, _, _, chamadores) in funcoes.items() if not chamadores]
+    minimo = fracao_min * sum(funcoes[f][3] for f in raizes)
+    linhas = {}
+
+    # (função, pilha de nomes, funções na pilha, tempo acumulado atribuído a este caminho)
+    pendentes = [(f, (nome(f),), frozenset([f]), funcoes[f][3]) for f in raizes]
+    while pendentes:
+        func, pilha, na_pilha, tempo = pendentes.pop()
+        ct_total = funcoes[func][3]
+        fracao = tempo / ct_total if ct_total else 0.0
+        proprio = funcoes[func][2] * fracao
+
+        for filho, ct_filho in chamados.get(func, []):
+            tempo_filho = ct_filho * fracao
+            if filho in na_pilha or tempo_filho < minimo or len(pilha) >= profundidade_max:
+                # Recursão ou ramo pequeno/profundo: o tempo fica neste quadro
+                proprio += tempo_filho
+                continue
+            pendentes.append((filho, pilha + (nome(filho),), na_pilha | {filho}, tempo_filho))
+
+        if proprio > 0:
+            chave = ";".join(pilha)
+            linhas[chave] = linhas.get(chave, 0.0) + proprio
+
+    return [f"{pilha} {round(t * 1e6)}" for pilha, t in sorted(linhas.items()) if round(t * 1e6) > 0]
+
+
+def _salvar(nome, perfil, entradas=None):
+    os.makedirs(PASTA_PERFIS, exist_ok=True)
+    base = os.path.join(PASTA_PERFIS, f"{nome}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}")
+
+    perfil.dump_stats(f"{base}.pstats")
+    estatisticas = pstats.Stats(perfil)
+    with open(f"{base}.folded", "w", encoding="utf-8") as f:
+        f.write("\n".join(pilhas_colapsadas(estatisticas)) + "\n")
+
+    # Entradas da requisição: reproduzir localmente a mesma combinação de filtros
+    # (jobs em segundo plano passam as próprias entradas: a requisição não é deles)
+    corpo = {"inputs": entradas} if entradas is not None else (
+        request.get_json(silent=True) if has_request_context() else None)
+    with open(f"{base}.json", "w", encoding="utf-8") as f:
+        json.dump({
+            "callback": nome,
+            "quando": datetime.now().isoformat(timespec="seconds"),
+            "tempo_total_s": round(estatisticas.total_tt, 4),
+            "entradas": (corpo or {}).get("inputs"),
+            "estado": (corpo or {}).get("state"),
+        }, f, ensure_ascii=False, indent=1, default=str)
+    print(f"🔬 Perfil de {nome} salvo em {base}.pstats")
+
+
+def executar_perfilado(nome, chamar, entradas=None):
+    """chamar() sob o cProfile se houver captura armada para `nome` (também nos jobs em segundo plano)."""
+    if not _desarmar(nome):
+        return chamar()
+    perfil = cProfile.Profile()
+    try:
+        return perfil.runcall(chamar)
+    finally:
+        try:
+            _salvar(nome, perfil, entradas)
+        except OSError as e:
+            print(f"⚠️ Não foi possível salvar o perfil: {e}")
+
+
+def _instrumentar_dash():
+    """Envolve dash._callback._invoke_callback (mesmo ponto usado por utils/metricas.py)."""
+    import dash._callback as dash_callback
+
+    original = getattr(dash_callback, "_invoke_callback", None)
+    if original is None or getattr(original, "_perfilado", False):
+        return
+
+    def invocar(func, *args, **kwargs):
+        return executar_perfilado(getattr(func, "__name__", ""), lambda: original(func, *args, **kwargs))
+
+    invocar._perfilado = True
+    dash_callback._invoke_callback = invocar
+
+
+def registrar_perfilamento(app):
+    """Rota /debug/perfilar protegida por token (só existe com OUVIDORIA_TOKEN_PERFIL definido)."""
+    token = os.environ.get(VARIAVEL_TOKEN)
+    if not token:
+        return
+    _instrumentar_dash()
+
+    @app.server.route("/debug/perfilar", methods=["GET", "POST"])
+    def perfilar_callback():
+        enviado = request.headers.get(CABECALHO_TOKEN) or ""
+        if not hmac.compare_digest(enviado.encode(), token.encode()):
+            return jsonify({"erro": "Token inválido."}), 403
+
+        nome = request.args.get("callback", "")
+        nomes = {getattr(cb.get("callback"), "__name__", None) for cb in app.callback_map.values()}
+        if nome not in nomes:
+            return jsonify({"erro": f"Callback '{nome}' não existe.", "callbacks": sorted(n for n in nomes if n)}), 400
+
+        vezes = request.args.get("vezes", "1")
+        if not vezes.isdigit() or not 1 <= int(vezes) <= LIMITE_VEZES:
+            return jsonify({"erro": f"'vezes' deve ser um inteiro entre 1 e {LIMITE_VEZES}."}), 400
+
+        return jsonify({"armados": armar(nome, int(vezes)), "pasta": PASTA_PERFIS})
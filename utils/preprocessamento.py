@@ -13,6 +13,8 @@ UFS_BRASIL = [
 _cache_ouv = None
 _cache_lai_pedidos = None
 _cache_lai_recursos = None
+_cache_termos = None
+_cache_duplicados = None
 
 def otimizar_memoria(df):
     """Reduz o tamanho do DataFrame na RAM convertendo objects para category."""
@@ -35,6 +37,32 @@ def tratar_ufs(df):
         df.loc[mask_invalido, 'UF'] = 'NI'
     return df
 
+def _anexar_coluna(df, arquivo, coluna, script):
+    """
+    Anexa `coluna` do parquet `arquivo` (gerado por `script`), alinhado linha a linha com
+    ouvidoria.parquet. Se o arquivo faltar ou tiver outro tamanho, devolve df sem ela.
+    """
+    path = f"data/processed/{arquivo}"
+    if not os.path.exists(path): return df
+
+    try:
+        extra = pd.read_parquet(path, columns=[coluna])
+        if len(extra) != len(df):
+            print(f"⚠️ {arquivo} desatualizado (tamanho diferente da base). Execute scripts/{script}.")
+            return df
+        df[coluna] = extra[coluna].to_numpy()
+    except Exception as e:
+        print(f"❌ Erro {coluna.title()}: {e}")
+    return df
+
+def anexar_risco(df):
+    """RISCO: probabilidade prevista de atraso (float16), do etl_risco.py."""
+    return _anexar_coluna(df, "risco.parquet", "RISCO", "etl_risco.py")
+
+def anexar_sentimento(df):
+    """SENTIMENTO: escore de satisfação 0-100 (float32), do etl_sentimento.py."""
+    return _anexar_coluna(df, "sentimento.parquet", "SENTIMENTO", "etl_sentimento.py")
+
 def carregar_dados_ouvidoria():
     global _cache_ouv
     if _cache_ouv is not None: return _cache_ouv
@@ -43,8 +71,13 @@ def carregar_dados_ouvidoria():
     if not os.path.exists(path): return pd.DataFrame()
 
     try:
-        try: df = pd.read_parquet(path)
-        except: df = pd.read_parquet(path, engine='fastparquet')
+        # O texto livre (teor) só serve ao etl_duplicados; no painel ocuparia RAM à toa
+        from utils.texto import COLUNAS_TEXTO_LIVRE
+        import pyarrow.parquet as pq
+        try: colunas = [c for c in pq.read_schema(path).names if c.upper() not in COLUNAS_TEXTO_LIVRE]
+        except: colunas = None
+        try: df = pd.read_parquet(path, columns=colunas)
+        except: df = pd.read_parquet(path, engine='fastparquet', columns=colunas)
         
         df = tratar_ufs(df)
         if 'DATA' in df.columns:
@@ -52,6 +85,8 @@ def carregar_dados_ouvidoria():
             df['ANO'] = df['DATA'].dt.year.fillna(0).astype(int).astype(str)
             
         df['Fonte'] = 'Ouvidoria'
+        df = anexar_risco(df)
+        df = anexar_sentimento(df)
         df = otimizar_memoria(df)
         _cache_ouv = df
         return df
@@ -97,4 +132,43 @@ def carregar_dados_lai(tipo="pedidos"):
 
     except Exception as e:
         print(f"❌ Erro LAI ({tipo}): {e}")
-        return pd.DataFrame()
\ No newline at end of file
+        return pd.DataFrame()
+
+def carregar_frequencia_termos():
+    """
+    Carrega a tabela de frequência de termos (ANO, MES, UF, ORGAO, TERMO, QTD)
+    gerada pelo etl_nlp.py.
+    """
+    global _cache_termos
+    if _cache_termos is not None: return _cache_termos
+
+    path = "data/processed/termos_freq.parquet"
+    if not os.path.exists(path): return pd.DataFrame()
+
+    try:
+        df = pd.read_parquet(path)
+        for c in ['ANO', 'MES', 'UF', 'ORGAO', 'TERMO']:
+            if c in df.columns: df[c] = df[c].astype('category')
+        _cache_termos = df
+        return df
+    except Exception as e:
+        print(f"❌ Erro Termos: {e}")
+        return pd.DataFrame()
+
+def carregar_duplicados():
+    """
+    Carrega os clusters de manifestações quase idênticas (CLUSTER_ID, CLUSTER_TAM),
+    alinhados linha a linha com ouvidoria.parquet (gerado pelo etl_duplicados.py).
+    """
+    global _cache_duplicados
+    if _cache_duplicados is not None: return _cache_duplicados
+
+    path = "data/processed/duplicados.parquet"
+    if not os.path.exists(path): return pd.DataFrame()
+
+    try:
+        _cache_duplicados = pd.read_parquet(path)
+        return _cache_duplicados
+    except Exception as e:
+        print(f"❌ Erro Duplicados: {e}")
+        return pd.DataFrame()
@@ -0,0 +1,46 @@
+"""
+Recursos de NLP versionados (stopwords + vocabulário) lidos do disco,
+sem depender do nltk.download() nem de rede.
+O pacote é gerado pelo scripts/etl_recursos_nlp.py.
+"""
+import json
+import os
+from functools import lru_cache
+
+VERSAO_RECURSOS = 1
+ARQUIVO_RECURSOS = f"data/resources/nlp_recursos_v{VERSAO_RECURSOS}.json"
+
+# Grupos de stopwords disponíveis no pacote
+GRUPOS_STOPWORDS = ("nltk", "personalizadas", "dominio")
+
+
+@lru_cache(maxsize=1)
+def carregar_recursos():
+    """Lê o pacote JSON uma única vez por processo."""
+    if not os.path.exists(ARQUIVO_RECURSOS):
+        raise FileNotFoundError(
+            f"Pacote de recursos {ARQUIVO_RECURSOS} não encontrado. Execute scripts/etl_recursos_nlp.py."
+        )
+    with open(ARQUIVO_RECURSOS, encoding="utf-8") as f:
+        recursos = json.load(f)
+    if recursos.get("versao") != VERSAO_RECURSOS:
+        raise ValueError(f"Versão do pacote ({recursos.get('versao')}) diferente da esperada ({VERSAO_RECURSOS}).")
+    return recursos
+
+
+@lru_cache(maxsize=None)
+def carregar_stopwords(*grupos):
+    """
+    Stopwords já limpas (com e sem acento) como frozenset.
+    Sem argumentos retorna a união de todos os grupos.
+    Ex: carregar_stopwords("nltk") -> só as do português do NLTK.
+    """
+    stopwords = carregar_recursos()["stopwords"]
+    return frozenset().union(*(stopwords[g] for g in (grupos or GRUPOS_STOPWORDS)))
+
+
+@lru_cache(maxsize=1)
+def carregar_vocabulario():
+    """Vocabulário ajustado (termo -> índice) ou None se o pacote não tiver um."""
+    vocabulario = carregar_recursos().get("vocabulario") or []
+    return {termo: i for i, termo in enumerate(vocabulario)} or None
@@ -0,0 +1,173 @@
+"""
+Callbacks pesados em segundo plano (background callbacks do Dash) com barra de progresso.
+
+Com diskcache, multiprocess e psutil instalados (`pip install "dash[diskcache]"`), cada
+execução de um callback_pesado roda num processo filho e o resultado volta por um cache
+em disco (PASTA_JOBS). A thread do servidor fica livre enquanto o navegador consulta o
+andamento a cada INTERVALO_MS. Trocar os filtros de novo encerra o processo anterior: o
+renderer manda o job antigo para ser terminado ao disparar o novo, e os Inputs em
+`cancelar` encerram o job assim que o usuário mexe no filtro.
+
+O resultado fica no cache por argumentos + versao_dados() (cache_by): sessões com os
+mesmos filtros recebem o mesmo resultado em vez de disputar uma única leitura, e rodar
+o ETL de novo muda a chave. Resultados sem leitura por EXPIRACAO_JOBS_S somem do disco.
+
+O job roda fora da requisição e não passa por dash._callback._invoke_callback no
+processo filho, então o callback_pesado faz lá dentro o que o worker faz nos demais:
+mede o job (utils.metricas.medir_job, devolvido ao /metrics pelo cache em disco) e
+atende às capturas armadas do utils.perfilamento. Todo o trabalho (inclusive filtrar)
+fica no filho; caches em memória preenchidos lá se perdem com ele. O lru_cache das linhas
+filtradas da página é preenchido no worker pelos callbacks comuns que leem os mesmos
+filtros, e o job herda o que já estiver pronto no momento do fork.
+
+Sem essas dependências o callback_pesado vira um @callback comum (sem progresso).
+
+Uso na página:
+    barra_progresso("ouv-progresso")             # no layout
+    @callback_pesado(Output(...), Input(...), barra="ouv-progresso", cancelar=[Input(...)])
+    def update_x(set_progress, filtros):
+        set_progress((50, "Agregando..."))
+"""
+import functools
+import os
+import threading
+
+import dash_bootstrap_components as dbc
+from dash import Input, Output, State, callback
+
+from utils.metricas import medir_job, registrar_coleta
+from utils.perfilamento import executar_perfilado
+
+try:
+    import diskcache
+    import multiprocess  # noqa: F401  (processo dos jobs)
+    import psutil  # noqa: F401  (encerramento dos jobs cancelados)
+    from dash import DiskcacheManager
+except ImportError:
+    diskcache = None
+
+PASTA_JOBS = os.environ.get("OUVIDORIA_PASTA_JOBS", os.path.join("cache", "jobs"))
+PASTA_DADOS = os.path.join("data", "processed")
+EXPIRACAO_JOBS_S = 600  # resultados, progresso e medições não lidos somem do disco depois disso
+PREFIXO_METRICAS = "metricas-jobs"  # fila de medições dos jobs no cache (lida a cada /metrics)
+INTERVALO_MS = 250      # intervalo de consulta do navegador ao job
+
+ESTILO_BARRA_VISIVEL = {"height": "18px", "visibility": "visible"}
+ESTILO_BARRA_OCULTA = {"height": "18px", "visibility": "hidden"}
+
+
+def versao_dados():
+    """Nome, tamanho e data de modificação dos arquivos de PASTA_DADOS (entra na chave do cache)."""
+    try:
+        with os.scandir(PASTA_DADOS) as itens:
+            return sorted((e.name, e.stat().st_size, e.stat().st_mtime_ns) for e in itens if e.is_file())
+    except OSError:
+        return []
+
+
+# Operações do diskcache no worker e o fork de cada job não se cruzam (ver GerenciadorJobs)
+_TRAVA_FORK = threading.RLock()
+
+
+def _travado(metodo):
+    @functools.wraps(metodo)
+    def envolvido(self, *args, **kwargs):
+        with _TRAVA_FORK:
+            return metodo(self, *args, **kwargs)
+    return envolvido
+
+
+if diskcache is not None:
+    class GerenciadorJobs(DiskcacheManager):
+        """
+        DiskcacheManager que não cria o processo do job no meio de uma transação do SQLite.
+
+        O job nasce de um fork do worker. Se outra thread estiver dentro de uma operação do
+        cache nesse instante (terminate_job segura uma transação enquanto encerra o job
+        antigo), o filho herda do SQLite uma trava que ninguém vai soltar e as gravações
+        dele esperam o timeout de 60s.
+        """
+        call_job_fn = _travado(DiskcacheManager.call_job_fn)
+        terminate_job = _travado(DiskcacheManager.terminate_job)
+        get_progress = _travado(DiskcacheManager.get_progress)
+        result_ready = _travado(DiskcacheManager.result_ready)
+        get_result = _travado(DiskcacheManager.get_result)
+        get_updated_props = _travado(DiskcacheManager.get_updated_props)
+        clear_cache_entry = _travado(DiskcacheManager.clear_cache_entry)
+
+    GERENCIADOR = GerenciadorJobs(diskcache.Cache(PASTA_JOBS), cache_by=[versao_dados], expire=EXPIRACAO_JOBS_S)
+else:
+    GERENCIADOR = None
+
+
+def _publicar_metricas(registro):
+    """No processo do job: enfileira a medição para o /metrics do worker."""
+    GERENCIADOR.handle.push(registro, prefix=PREFIXO_METRICAS, expire=EXPIRACAO_JOBS_S)
+
+
+def _coletar_metricas():
+    """No worker: medições dos jobs ainda não somadas (qualquer worker pode retirá-las)."""
+    registros = []
+    with _TRAVA_FORK:
+        while True:
+            _, registro = GERENCIADOR.handle.pull(prefix=PREFIXO_METRICAS)
+            if registro is None:
+                return registros
+            registros.append(registro)
+
+
+if GERENCIADOR is not None:
+    registrar_coleta(_coletar_metricas)
+
+
+def barra_progresso(id_barra):
+    """Barra de progresso (oculta fora da execução) para o callback_pesado com barra=id_barra."""
+    return dbc.Progress(id=id_barra, value=0, label="", striped=True, animated=True,
+                        className="mt-2", style=ESTILO_BARRA_OCULTA)
+
+
+def _sem_progresso(_):
+    pass
+
+
+def _ids_entradas(dependencias):
+    """(id, propriedade) dos Inputs e States na ordem em que o Dash passa os valores."""
+    planas = [d for grupo in dependencias for d in (grupo if isinstance(grupo, (list, tuple)) else [grupo])]
+    return [(d.component_id, d.component_property) for d in planas if isinstance(d, (Input, State))]
+
+
+def callback_pesado(*dependencias, barra=None, cancelar=None, **kwargs):
+    """
+    @callback executado em segundo plano. A função recebe set_progress como primeiro
+    argumento: set_progress((percentual, texto)) atualiza a barra `barra`.
+    """
+    if GERENCIADOR is None:
+        def decorador(funcao):
+            @functools.wraps(funcao)
+            def sincrono(*args):
+                return funcao(_sem_progresso, *args)
+            callback(*dependencias, **kwargs)(sincrono)
+            return funcao  # mesma assinatura nos dois modos (set_progress primeiro)
+        return decorador
+
+    opcoes = {"background": True, "manager": GERENCIADOR, "interval": INTERVALO_MS, "cancel": cancelar}
+    if barra:
+        opcoes.update(
+            progress=[Output(barra, "value"), Output(barra, "label")],
+            progress_default=[0, ""],
+            running=[(Output(barra, "style"), ESTILO_BARRA_VISIVEL, ESTILO_BARRA_OCULTA)],
+        )
+    ids_entradas = _ids_entradas(dependencias)
+
+    def decorador(funcao):
+        nome = funcao.__name__
+
+        @functools.wraps(funcao)
+        def job(set_progress, *valores):
+            entradas = [{"id": i, "property": p, "value": v} for (i, p), v in zip(ids_entradas, valores)]
+            with medir_job(nome, entradas, _publicar_metricas):
+                return executar_perfilado(nome, lambda: funcao(set_progress, *valores), entradas)
+
+        callback(*dependencias, **opcoes, **kwargs)(job)
+        return funcao  # chamada direta (benchmarks) sem medição nem perfil
+    return decorador
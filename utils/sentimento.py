@@ -0,0 +1,68 @@
+"""
+Escore de satisfação do cidadão (0 a 100) por léxico ponderado.
+Os pesos ficam em data/resources/lexico_sentimento_v1.json: cada ocorrência de um
+termo soma o seu peso ao escore neutro. A versão em lote conta os termos com uma
+matriz esparsa (CountVectorizer com vocabulário fixo) sobre os textos distintos.
+"""
+import json
+import os
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import CountVectorizer
+
+from utils.texto import tokenizar
+
+VERSAO_LEXICO = 1
+ARQUIVO_LEXICO = f"data/resources/lexico_sentimento_v{VERSAO_LEXICO}.json"
+
+# Mesma tokenização nas duas versões: minúsculas, com acento, \w+
+PADRAO_TOKEN_SENTIMENTO = r"(?u)\w+"
+
+
+@lru_cache(maxsize=1)
+def carregar_lexico():
+    """Lê o léxico uma única vez por processo."""
+    if not os.path.exists(ARQUIVO_LEXICO):
+        raise FileNotFoundError(f"Léxico {ARQUIVO_LEXICO} não encontrado.")
+    with open(ARQUIVO_LEXICO, encoding="utf-8") as f:
+        lexico = json.load(f)
+    if lexico.get("versao") != VERSAO_LEXICO:
+        raise ValueError(f"Versão do léxico ({lexico.get('versao')}) diferente da esperada ({VERSAO_LEXICO}).")
+    return lexico
+
+
+@lru_cache(maxsize=1)
+def _contador():
+    """Vetorizador de contagem restrito aos termos do léxico + vetor de pesos na mesma ordem."""
+    pesos = carregar_lexico()["pesos"]
+    termos = list(pesos)
+    contador = CountVectorizer(vocabulary=termos, token_pattern=PADRAO_TOKEN_SENTIMENTO, lowercase=True)
+    return contador, np.array([pesos[t] for t in termos], dtype=np.float32)
+
+
+def pontuar_sentimento(texto):
+    """Escore de um único texto (texto digitado na página de IA)."""
+    lexico = carregar_lexico()
+    pesos = lexico["pesos"]
+    score = lexico["neutro"] + sum(pesos.get(p, 0) for p in tokenizar(texto, PADRAO_TOKEN_SENTIMENTO, manter_acentos=True))
+    return max(lexico["minimo"], min(lexico["maximo"], score))
+
+
+def pontuar_serie(serie):
+    """
+    Versão vetorizada de pontuar_sentimento() para uma coluna inteira (float32).
+    Cada texto distinto é pontuado uma vez; nulos ficam no escore neutro.
+    """
+    lexico = carregar_lexico()
+    contador, pesos = _contador()
+
+    cat = serie.astype("category")
+    categorias = cat.cat.categories.astype(str)
+    scores = lexico["neutro"] + contador.transform(categorias) @ pesos if len(categorias) else np.empty(0, dtype=np.float32)
+    scores = np.clip(scores, lexico["minimo"], lexico["maximo"]).astype(np.float32)
+
+    # Código -1 (valor nulo) aponta para o neutro acrescentado no fim
+    scores = np.append(scores, np.float32(lexico["neutro"]))
+    return pd.Series(scores[cat.cat.codes.to_numpy()], index=serie.index, name="SENTIMENTO")
@@ -0,0 +1,91 @@
+"""
+Normalização de texto compartilhada por ETL, NLP, busca e ML.
+As versões *_serie são vetorizadas (métodos .str do pandas + tabela de tradução)
+e trabalham sobre o dicionário de categorias: cada texto distinto é limpo uma
+única vez e o resultado volta para as linhas pelos códigos.
+"""
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# Frases que indicam campo vazio ("não informado", "n/a"...)
+RUIDOS = r"não informado|nao informado|sem informação|sem informacao|n/a|vazio"
+
+# Tokens da busca (texto já sem acento) e do TF-IDF do modelo de risco (com acento)
+PADRAO_TOKEN = r"[a-z0-9]+"
+PADRAO_TOKEN_ML = r"(?u)\b[a-zA-Záéíóúâêîôûãõç]{3,}\b"
+
+# Campos de texto livre (teor da manifestação) que o ETL mantém quando o extrato traz.
+# Só o etl_duplicados lê; o painel carrega a base sem eles.
+COLUNAS_TEXTO_LIVRE = ("TEXTO", "TEXTO_MANIFESTACAO", "TEOR", "DESCRICAO", "RESUMO")
+
+
+def _montar_tabela_acentos():
+    """Letra acentuada -> letra base (NFKD sem marcas), para uso com str.translate."""
+    tabela = {}
+    for cp in range(0xA0, 0x250):
+        c = chr(cp)
+        base = "".join(x for x in unicodedata.normalize("NFKD", c) if not unicodedata.combining(x))
+        if base != c:
+            tabela[cp] = base
+    # Marcas combinantes soltas (texto que já chega decomposto)
+    for cp in range(0x300, 0x370):
+        tabela[cp] = None
+    return str.maketrans(tabela)
+
+
+TABELA_ACENTOS = _montar_tabela_acentos()
+
+
+# --- VERSÕES ESCALARES (cabeçalhos, consultas, texto digitado) ---
+
+def normalizar(texto):
+    """Remove acentos, coloca em minúsculas e tira espaços das pontas."""
+    return str(texto).translate(TABELA_ACENTOS).lower().strip()
+
+
+def tokenizar(texto, padrao=PADRAO_TOKEN, manter_acentos=False):
+    texto = str(texto).lower() if manter_acentos else normalizar(texto)
+    return re.findall(padrao, texto)
+
+
+# --- VERSÕES VETORIZADAS (colunas inteiras) ---
+
+def por_categoria(serie, funcao):
+    """
+    Aplica `funcao` (Series -> Series) só aos valores distintos de `serie`
+    e devolve uma Series categórica alinhada ao índice original.
+    """
+    cat = serie.astype("category")
+    resultado = funcao(pd.Series(cat.cat.categories.astype(str), dtype=object))
+
+    novos_codigos, valores = pd.factorize(resultado)
+    # Código -1 (valor nulo) aponta para o -1 acrescentado no fim
+    novos_codigos = np.append(novos_codigos, -1)
+    codigos = novos_codigos[cat.cat.codes.to_numpy()]
+    return pd.Series(pd.Categorical.from_codes(codigos, valores), index=serie.index, name=serie.name)
+
+
+def normalizar_serie(serie):
+    """Versão vetorizada de normalizar()."""
+    return por_categoria(serie, lambda s: s.str.translate(TABELA_ACENTOS).str.lower().str.strip())
+
+
+def limpar_serie(serie, remover_acentos=False, remover_pontuacao=True):
+    """
+    Minúsculas, sem frases de ruído (RUIDOS) e, por padrão, sem pontuação.
+    Os acentos são mantidos a menos que remover_acentos=True.
+    """
+    def limpar(s):
+        s = s.str.lower()
+        if remover_acentos:
+            s = s.str.translate(TABELA_ACENTOS)
+        s = s.str.replace(RUIDOS, "", regex=True)
+        if remover_pontuacao:
+            s = s.str.replace(r"[^\w\s]", "", regex=True)
+        return s.str.strip()
+
+    return por_categoria(serie, limpar)
+
@@ -0,0 +1,114 @@
+"""
+Entrada de produção do painel (WSGI).
+
+  gunicorn -c gunicorn.conf.py wsgi:server
+  python wsgi.py            # mesmo comando; sem gunicorn (Windows) cai no servidor do Flask sem debug
+
+Com preload_app (padrão no gunicorn.conf.py) este módulo é importado uma vez no processo
+mestre: os parquets, o modelo e o léxico são carregados e aquecidos antes do fork, e os
+workers compartilham essas páginas de memória (copy-on-write).
+
+GET /pronto responde 503 até o aquecimento terminar e 200 depois (sonda de readiness).
+"""
+import gc
+import os
+import runpy
+import threading
+import time
+
+from flask import jsonify
+
+_inicio = time.time()
+from app import app  # noqa: E402  (as páginas carregam os parquets na importação)
+
+server = app.server
+CONFIG_GUNICORN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gunicorn.conf.py")
+
+_pronto = threading.Event()
+_aquecimento = {"importacao_app_s": round(time.time() - _inicio, 2), "etapas": {}, "erros": {}}
+
+
+def _etapa(nome, funcao):
+    inicio = time.perf_counter()
+    try:
+        resultado = funcao()
+        _aquecimento["etapas"][nome] = {
+            "tempo_s": round(time.perf_counter() - inicio, 3),
+            **({"linhas": len(resultado)} if hasattr(resultado, "shape") else {}),
+        }
+    except Exception as e:
+        _aquecimento["erros"][nome] = f"{type(e).__name__}: {e}"
+
+
+def aquecer():
+    """Carrega dados, modelo e léxico e monta as rotas do Dash antes de atender (idempotente)."""
+    if _pronto.is_set():
+        return
+    from utils.modelos import obter_modelo
+    from utils.preprocessamento import (carregar_dados_lai, carregar_dados_ouvidoria, carregar_duplicados,
+                                        carregar_frequencia_termos)
+    from utils.sentimento import _contador
+
+    print("🔥 Aquecendo o painel antes de atender...")
+    _etapa("ouvidoria", carregar_dados_ouvidoria)
+    _etapa("lai_pedidos", lambda: carregar_dados_lai("pedidos"))
+    _etapa("lai_recursos", lambda: carregar_dados_lai("recursos"))
+    _etapa("termos", carregar_frequencia_termos)
+    _etapa("duplicados", carregar_duplicados)
+    _etapa("modelo", lambda: obter_modelo() or {})
+    _etapa("lexico", _contador)
+
+    # Primeira requisição: o Dash registra os callbacks e serializa o layout
+    cliente = server.test_client()
+    for rota in ("/", "/_dash-layout", "/_dash-dependencies"):
+        _etapa(rota, lambda r=rota: cliente.get(r).data)
+
+    _aquecimento["tempo_total_s"] = round(time.time() - _inicio, 2)
+    if _aquecimento["erros"]:
+        print(f"❌ Aquecimento com erros: {_aquecimento['erros']}")
+        return
+
+    # Objetos do aquecimento saem da coleta de lixo: o GC não toca neles nos workers
+    # e as páginas compartilhadas não são copiadas
+    gc.collect()
+    gc.freeze()
+    _pronto.set()
+    print(f"✅ Painel pronto em {_aquecimento['tempo_total_s']}s.")
+
+
+@server.route("/pronto", methods=["GET"])
+def prontidao():
+    corpo = {
+        "pronto": _pronto.is_set(),
+        "pid": os.getpid(),
+        "aquecimento": _aquecimento,
+    }
+    return jsonify(corpo), 200 if _pronto.is_set() else 503
+
+
+aquecer()
+
+
+if __name__ == "__main__":
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:  # Windows ou gunicorn não instalado
+        BaseApplication = None
+
+    if BaseApplication is None:
+        print("⚠️ gunicorn indisponível: usando o servidor do Flask (sem debug, multithread).")
+        app.run(host=os.environ.get("OUVIDORIA_HOST", "0.0.0.0"), port=int(os.environ.get("OUVIDORIA_PORTA", 8050)),
+                debug=False, threaded=True)
+    else:
+        class ServidorGunicorn(BaseApplication):
+            """gunicorn servindo o app já carregado e aquecido neste processo (o mestre)."""
+
+            def load_config(self):
+                for chave, valor in runpy.run_path(CONFIG_GUNICORN).items():
+                    if chave in self.cfg.settings:
+                        self.cfg.set(chave, valor)
+
+            def load(self):
+                return server
+
+        ServidorGunicorn().run()